@@ -0,0 +1,274 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Dict, List, Optional
+
+from app.ingestion.csv_loader import load_csv_table
+from app.application.engine import VendorLeakEngine, ENGINE_VERSION
+from app.application.result_cache import DiskResultCache
+from app.reporting.result_writer import write_result
+
+
+OUTPUT_EXTENSIONS = {
+    "pretty": ".json",
+    "compact": ".json",
+    "ndjson": ".ndjson",
+}
+
+REPORT_FILENAME = "batch_report.json"
+
+
+class BatchJob:
+    """
+    One ledger to analyze.
+
+    `engine_options` are VendorLeakEngine keyword arguments (e.g.
+    enforce_determinism, profile); `cache_directory` is accepted as a
+    shorthand for a DiskResultCache.
+    """
+
+    def __init__(
+        self,
+        tenant: str,
+        file_path: str,
+        timezone: str = "UTC",
+        engine_options: Optional[Dict[str, Any]] = None,
+    ):
+        self.tenant = tenant
+        self.file_path = file_path
+        self.timezone = timezone
+        self.engine_options = engine_options or {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tenant": self.tenant,
+            "file_path": self.file_path,
+            "timezone": self.timezone,
+            "engine_options": self.engine_options,
+        }
+
+
+def load_manifest(manifest_path: str) -> List[BatchJob]:
+    """
+    Reads a JSON manifest:
+
+        {
+          "defaults": {"timezone": "UTC", "engine_options": {...}},
+          "jobs": [{"tenant": "acme", "path": "acme.csv", "timezone": "..."}]
+        }
+
+    Relative paths resolve against the manifest's directory. Per-job
+    engine_options are merged over the defaults.
+    """
+
+    with open(manifest_path, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+
+    base_directory = os.path.dirname(os.path.abspath(manifest_path))
+    defaults = manifest.get("defaults", {})
+
+    jobs = []
+
+    for entry in manifest.get("jobs", []):
+        path = entry["path"]
+
+        jobs.append(BatchJob(
+            tenant=entry.get("tenant") or _tenant_name(path),
+            file_path=os.path.join(base_directory, path),
+            timezone=entry.get("timezone", defaults.get("timezone", "UTC")),
+            engine_options={
+                **defaults.get("engine_options", {}),
+                **entry.get("engine_options", {}),
+            },
+        ))
+
+    _validate_tenants(jobs)
+    return jobs
+
+
+def jobs_from_directory(
+    directory: str,
+    timezone: str = "UTC",
+    engine_options: Optional[Dict[str, Any]] = None,
+) -> List[BatchJob]:
+    """
+    One job per `*.csv` file in `directory`, tenant named after the file.
+    """
+
+    jobs = [
+        BatchJob(_tenant_name(name), os.path.join(directory, name), timezone, engine_options)
+        for name in sorted(os.listdir(directory))
+        if name.lower().endswith(".csv")
+    ]
+
+    _validate_tenants(jobs)
+    return jobs
+
+
+class BatchRunner:
+    """
+    Runs many ledgers over a bounded pool of long-lived worker processes.
+
+    Each worker imports the engine once and keeps one VendorLeakEngine per
+    distinct engine configuration, so startup cost is paid per worker, not
+    per file. Every tenant's result is written to its own file in
+    `output_directory`, followed by a consolidated batch report.
+    """
+
+    VERSION = "1.0.0"
+
+    def __init__(
+        self,
+        output_directory: str,
+        workers: int = 1,
+        output_format: str = "compact",
+    ):
+        if workers < 1:
+            raise ValueError("workers must be a positive integer.")
+
+        if output_format not in OUTPUT_EXTENSIONS:
+            raise ValueError(f"Unsupported output format '{output_format}'.")
+
+        self.output_directory = output_directory
+        self.workers = workers
+        self.output_format = output_format
+
+    def run(self, jobs: List[BatchJob]) -> Dict:
+
+        os.makedirs(self.output_directory, exist_ok=True)
+
+        started = time.perf_counter()
+
+        if self.workers == 1 or len(jobs) < 2:
+            outcomes = [
+                run_job(job.to_dict(), self.output_directory, self.output_format)
+                for job in jobs
+            ]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                outcomes = list(pool.map(
+                    run_job,
+                    (job.to_dict() for job in jobs),
+                    repeat(self.output_directory),
+                    repeat(self.output_format),
+                ))
+
+        report = self._report(outcomes, time.perf_counter() - started)
+
+        with open(os.path.join(self.output_directory, REPORT_FILENAME), "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+
+        return report
+
+    def _report(self, outcomes: List[Dict], wall_seconds: float) -> Dict:
+
+        succeeded = [outcome for outcome in outcomes if outcome["status"] == "ok"]
+        rows = sum(outcome["rows"] for outcome in outcomes)
+
+        return {
+            "batch_version": self.VERSION,
+            "engine_version": ENGINE_VERSION,
+            "workers": self.workers,
+            "output_format": self.output_format,
+            "jobs": len(outcomes),
+            "succeeded": len(succeeded),
+            "failed": len(outcomes) - len(succeeded),
+            "rows": rows,
+            "detections": sum(outcome["detections"] for outcome in succeeded),
+            "wall_seconds": round(wall_seconds, 6),
+            "rows_per_second": round(rows / wall_seconds, 3) if wall_seconds else None,
+            "files_per_second": round(len(outcomes) / wall_seconds, 3) if wall_seconds else None,
+            "failures": [
+                {"tenant": outcome["tenant"], "errors": outcome["errors"]}
+                for outcome in outcomes if outcome["status"] != "ok"
+            ],
+            "results": outcomes,
+        }
+
+
+_WORKER_ENGINES: Dict[str, VendorLeakEngine] = {}
+
+
+def run_job(job: Dict[str, Any], output_directory: str, output_format: str) -> Dict:
+    """
+    Worker entry point: analyzes one ledger and writes the tenant's result.
+    Never raises; failures are reported in the returned outcome.
+    """
+
+    started = time.perf_counter()
+
+    outcome = {
+        "tenant": job["tenant"],
+        "file_path": job["file_path"],
+        "status": "ok",
+        "rows": 0,
+        "detections": 0,
+        "errors": [],
+        "output_path": None,
+        "worker_pid": os.getpid(),
+    }
+
+    try:
+        engine = _worker_engine(job["engine_options"])
+
+        table = load_csv_table(job["file_path"], job["timezone"])
+        outcome["rows"] = len(table)
+
+        result = engine.run_table(table)
+
+        outcome["detections"] = len(result.get("detections", []))
+        outcome["errors"] = list(result["diagnostics"]["errors"])
+
+        output_path = os.path.join(
+            output_directory, job["tenant"] + OUTPUT_EXTENSIONS[output_format]
+        )
+
+        with open(output_path, "w", encoding="utf-8", buffering=1024 * 1024) as handle:
+            write_result(result, handle, output_format)
+
+        outcome["output_path"] = output_path
+
+    except Exception as e:
+        outcome["errors"].append(str(e))
+
+    if outcome["errors"]:
+        outcome["status"] = "error"
+
+    outcome["wall_seconds"] = round(time.perf_counter() - started, 6)
+    return outcome
+
+
+def _worker_engine(engine_options: Dict[str, Any]) -> VendorLeakEngine:
+    key = json.dumps(engine_options, sort_keys=True)
+
+    engine = _WORKER_ENGINES.get(key)
+
+    if engine is None:
+        options = dict(engine_options)
+        cache_directory = options.pop("cache_directory", None)
+
+        if cache_directory is not None:
+            options["cache"] = DiskResultCache(cache_directory)
+
+        engine = VendorLeakEngine(**options)
+        _WORKER_ENGINES[key] = engine
+
+    return engine
+
+
+def _tenant_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _validate_tenants(jobs: List[BatchJob]):
+    seen = set()
+
+    for job in jobs:
+        if not job.tenant or os.path.basename(job.tenant) != job.tenant or job.tenant.startswith("."):
+            raise ValueError(f"Invalid tenant name '{job.tenant}'.")
+        if job.tenant in seen:
+            raise ValueError(f"Duplicate tenant '{job.tenant}' in batch.")
+        seen.add(job.tenant)
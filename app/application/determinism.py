@@ -0,0 +1,195 @@
+from typing import Dict, List, Optional
+
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.models.detection_result import DetectionResult
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.diagnostics.engine_diagnostics import EngineDiagnostics
+from app.domain.diagnostics.stage_digest import digest_by_vendor, digest_items
+from app.application.sharding import vendor_shard
+
+
+SAMPLE_BUCKETS = 10_000
+
+OUTPUT_STAGES = (
+    "detections",
+    "vendor_totals",
+    "currency_totals",
+    "summary",
+    "vendor_ranking",
+    "executive_summary",
+)
+
+
+class DeterminismVerifier:
+    """
+    Verifies a run without executing it twice in full.
+
+    - Every output stage is summarized by a streamed canonical digest.
+    - Scoring, ranking and the executive summary are replayed from the
+      recorded stage inputs and their digests compared.
+    - Detectors and the behavior analyzer are re-executed only for a
+      deterministic sample of vendors (`sample_rate` of them, chosen by a
+      stable vendor hash) and compared per vendor. Detectors that are not
+      vendor-local are re-executed over the whole table.
+
+    Violations name the diverging stage (and vendor, where applicable).
+    """
+
+    VERSION = "1.0.0"
+
+    def __init__(self, engine, sample_rate: float = 1.0):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Determinism sample rate must be between 0 and 1.")
+
+        self.engine = engine
+        self.sample_rate = sample_rate
+
+    def verify(
+        self,
+        table: TransactionTable,
+        detector_results: List[Optional[List[DetectionResult]]],
+        vendor_behavior_profiles: Dict,
+        total_spend_by_currency: Dict,
+        core_output: Dict,
+        diagnostics: EngineDiagnostics,
+    ):
+        violations = []
+
+        sampled_vendors = self.verify_vendor_stages(
+            table, detector_results, vendor_behavior_profiles, violations
+        )
+
+        self.verify_output_stages(
+            detector_results,
+            vendor_behavior_profiles,
+            total_spend_by_currency,
+            core_output,
+            diagnostics,
+            violations,
+            sampled_vendors,
+        )
+
+    def verify_output_stages(
+        self,
+        detector_results: List[Optional[List[DetectionResult]]],
+        vendor_behavior_profiles: Dict,
+        total_spend_by_currency: Dict,
+        core_output: Dict,
+        diagnostics: EngineDiagnostics,
+        violations: List[str],
+        sampled_vendors: int,
+    ):
+        """
+        Replays scoring, ranking and the summary, then reports `violations`
+        (including those already found by `verify_vendor_stages`).
+        """
+
+        stage_digests = stage_output_digests(core_output)
+
+        all_detections = [
+            detection
+            for results in detector_results if results is not None
+            for detection in results
+        ]
+
+        replay = stage_output_digests(self.engine.assemble_output(
+            core_output["dataset_hash"],
+            all_detections,
+            vendor_behavior_profiles,
+            total_spend_by_currency,
+        ))
+
+        for stage in OUTPUT_STAGES:
+            if replay[stage] != stage_digests[stage]:
+                violations.append(f"stage '{stage}'")
+
+        for violation in violations:
+            diagnostics.add_error(f"Determinism violation detected in {violation}")
+
+        diagnostics.record_determinism({
+            "verifier_version": self.VERSION,
+            "sample_rate": self.sample_rate,
+            "verified_vendors": sampled_vendors,
+            "stage_digests": stage_digests,
+        })
+
+    def verify_vendor_stages(
+        self,
+        table: TransactionTable,
+        detector_results: List[Optional[List[DetectionResult]]],
+        vendor_behavior_profiles: Dict,
+        violations: List[str],
+    ) -> int:
+        """
+        Re-executes detectors and behavior analysis for the sampled vendors
+        of `table` and appends any mismatch to `violations`. Returns the
+        number of vendors verified. `table` may be any vendor-complete part
+        of the dataset, e.g. one out-of-core partition.
+        """
+
+        threshold = self.sample_rate * SAMPLE_BUCKETS
+
+        sampled_codes = {
+            vendor_code
+            for vendor_code, vendor in enumerate(table.vendors)
+            if vendor_shard(vendor, SAMPLE_BUCKETS) < threshold
+        }
+
+        rows = [
+            row for row, vendor_code in enumerate(table.vendor_codes)
+            if vendor_code in sampled_codes
+        ]
+
+        if not rows:
+            return 0
+
+        index = TransactionIndex.build(table.take(rows))
+        sampled = {table.vendors[vendor_code] for vendor_code in index.vendor_rows}
+
+        full_index = None
+
+        for detector, recorded in zip(self.engine.detectors, detector_results):
+            if recorded is None:
+                continue  # Detector failed in the run; already reported
+
+            name = detector.__class__.__name__
+
+            if not detector.VENDOR_LOCAL and full_index is None:
+                full_index = TransactionIndex.build(table)
+
+            try:
+                replayed = digest_by_vendor(detector.detect_index(
+                    index if detector.VENDOR_LOCAL else full_index
+                ))
+            except Exception:
+                violations.append(f"stage '{name}' (failed on re-execution)")
+                continue
+
+            expected = digest_by_vendor(
+                d for d in recorded
+                if not detector.VENDOR_LOCAL
+                or d.supporting_evidence.get("vendor", "unknown") in sampled
+            )
+
+            for vendor in sorted(set(expected) | set(replayed)):
+                if expected.get(vendor) != replayed.get(vendor):
+                    violations.append(f"stage '{name}' for vendor '{vendor}'")
+
+        replayed_profiles = self.engine.behavior_analyzer.analyze_index(index)
+
+        for vendor in sorted(sampled):
+            if digest_items([replayed_profiles.get(vendor)]) != \
+               digest_items([vendor_behavior_profiles.get(vendor)]):
+                violations.append(f"stage 'vendor_behavior_profiles' for vendor '{vendor}'")
+
+        return len(sampled)
+
+
+def stage_output_digests(core_output: Dict) -> Dict[str, str]:
+    digests = {"dataset_hash": core_output["dataset_hash"]}
+
+    for stage in OUTPUT_STAGES + ("vendor_behavior_profiles",):
+        value = core_output[stage]
+        digests[stage] = digest_items(value.items() if isinstance(value, dict) else value)
+
+    return digests
@@ -1,17 +1,33 @@
 from decimal import Decimal
-from typing import List, Dict
-import copy
-import json
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Dict, List, Optional, Tuple
 
 from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.models.detection_result import DetectionResult
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.detection.base_detector import BaseDetector
 from app.domain.detection.duplicate_detector import DuplicateDetector
 from app.domain.detection.recurring_detector import RecurringDetector
 from app.domain.scoring.risk_scoring import RiskScoringEngine
-from app.domain.utils.dataset_fingerprint import generate_dataset_hash
+from app.domain.utils.dataset_fingerprint import generate_table_hash
+from app.domain.utils.fixed_point import currency_total
 from app.domain.behavior.vendor_behavior_analyzer import VendorBehaviorAnalyzer
+from app.domain.normalization.vendor_resolver import VendorResolver
 from app.domain.ranking.vendor_risk_ranker import VendorRiskRanker
 from app.reporting.executive_summary import ExecutiveSummaryGenerator
 from app.domain.diagnostics.engine_diagnostics import EngineDiagnostics
+from app.domain.diagnostics.stage_span import BaseSpanHook
+from app.ingestion.snapshot import open_snapshot
+from app.application.result_cache import BaseResultCache
+from app.application.determinism import DeterminismVerifier
+from app.application.sharding import (
+    analyze_shard,
+    merge_shard_results,
+    shard_table_by_vendor,
+    vendor_first_occurrence,
+)
 
 
 ENGINE_VERSION = "0.6.0"
@@ -19,30 +35,109 @@ ENGINE_VERSION = "0.6.0"
 
 class VendorLeakEngine:
 
-    def __init__(self, enforce_determinism: bool = False):
+    def __init__(
+        self,
+        enforce_determinism: bool = False,
+        workers: int = 1,
+        cache: Optional[BaseResultCache] = None,
+        determinism_sample_rate: float = 1.0,
+        profile: bool = False,
+        span_hooks: Optional[List[BaseSpanHook]] = None,
+        behavior_backend: str = "decimal",
+        duplicate_mode: str = "pairwise",
+        recurring_mode: str = "consistent",
+        extra_detectors: Optional[List[BaseDetector]] = None,
+        vendor_resolver: Optional[VendorResolver] = None,
+    ):
+        """
+        `extra_detectors` are appended to the built-in detectors (e.g. the
+        opt-in NearDuplicateDetector) and become part of the configuration.
+        `vendor_resolver` rewrites vendors to canonical ids before
+        detection; the dataset hash still covers the input as loaded.
+        """
+        if workers < 1:
+            raise ValueError("workers must be a positive integer.")
+
         self.detectors = [
-            DuplicateDetector(),
-            RecurringDetector(),
+            DuplicateDetector(mode=duplicate_mode),
+            RecurringDetector(mode=recurring_mode),
+            *(extra_detectors or []),
         ]
         self.scoring_engine = RiskScoringEngine()
-        self.behavior_analyzer = VendorBehaviorAnalyzer()
+        self.behavior_analyzer = VendorBehaviorAnalyzer(backend=behavior_backend)
         self.vendor_ranker = VendorRiskRanker()
         self.summary_generator = ExecutiveSummaryGenerator()
         self.enforce_determinism = enforce_determinism
+        self.workers = workers
+        self.cache = cache
+        self.vendor_resolver = vendor_resolver
+        self.determinism_verifier = DeterminismVerifier(self, determinism_sample_rate)
+        self.profile = profile or bool(span_hooks)
+        self.span_hooks = span_hooks or []
 
     def run(self, transactions: List[Transaction]) -> Dict:
+        return self.run_table(TransactionTable.from_transactions(transactions))
+
+    def run_snapshot(self, path: str) -> Dict:
+        """
+        Runs over a snapshot written by `write_snapshot`, without parsing
+        or re-fingerprinting the dataset.
+        """
+
+        snapshot = open_snapshot(path)
+        return self.run_table(snapshot.table, snapshot.dataset_hash)
+
+    def run_table(self, table: TransactionTable, dataset_hash: Optional[str] = None) -> Dict:
+        """
+        `dataset_hash` may be passed when already known (e.g. stored in a
+        snapshot); it must equal `generate_table_hash(table)`.
+        """
 
-        diagnostics = EngineDiagnostics()
+        diagnostics = EngineDiagnostics(self.profile, self.span_hooks)
 
         try:
-            result = self._execute(transactions, diagnostics)
+            if dataset_hash is None:
+                with diagnostics.span("dataset_hash", len(table)):
+                    dataset_hash = generate_table_hash(table)
+
+            cache_key = None
+
+            if self.cache is not None:
+                with diagnostics.span("cache_lookup") as span:
+                    cache_key = self.cache.key(dataset_hash, self.configuration())
+                    cached = self.cache.get(cache_key)
+                    span.attributes["hit"] = cached is not None
+
+                if cached is not None:
+                    diagnostics.record_cache("hit", cache_key)
+                    cached["diagnostics"] = diagnostics.to_dict()
+                    return cached
+
+                diagnostics.record_cache("miss", cache_key)
+
+            if self.vendor_resolver is not None:
+                with diagnostics.span("vendor_resolution", len(table.vendors)) as span:
+                    table = self.vendor_resolver.resolve_table(table)
+                    span.output_size = len(table.vendors)
+
+            trace = {} if self.enforce_determinism else None
+
+            result = self._execute(table, diagnostics, dataset_hash, trace)
 
             if self.enforce_determinism:
-                verification = self._execute(copy.deepcopy(transactions), diagnostics)
+                with diagnostics.span("determinism_verification", len(table)):
+                    self.determinism_verifier.verify(
+                        table,
+                        trace["detector_results"],
+                        trace["vendor_behavior_profiles"],
+                        trace["total_spend_by_currency"],
+                        result,
+                        diagnostics,
+                    )
 
-                if json.dumps(result, sort_keys=True, default=str) != \
-                   json.dumps(verification, sort_keys=True, default=str):
-                    diagnostics.add_error("Determinism violation detected")
+            if cache_key is not None and not diagnostics.errors:
+                with diagnostics.span("cache_store"):
+                    self.cache.put(cache_key, result)
 
             result["diagnostics"] = diagnostics.to_dict()
             return result
@@ -54,44 +149,99 @@ class VendorLeakEngine:
                 "diagnostics": diagnostics.to_dict(),
             }
 
-    def _execute(self, transactions: List[Transaction], diagnostics: EngineDiagnostics) -> Dict:
+    def _execute(
+        self,
+        table: TransactionTable,
+        diagnostics: EngineDiagnostics,
+        dataset_hash: Optional[str] = None,
+        trace: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        Full pipeline over one table. When `trace` is given it receives the
+        stage inputs (per-detector results, behavior profiles, spend totals)
+        used for determinism verification.
+        """
 
-        dataset_hash = generate_dataset_hash(transactions)
+        if dataset_hash is None:
+            with diagnostics.span("dataset_hash", len(table)):
+                dataset_hash = generate_table_hash(table)
 
-        all_detections = []
+        shards = []
 
-        for detector in self.detectors:
-            try:
-                results = detector.detect(transactions)
-                all_detections.extend(results)
-            except Exception as e:
-                diagnostics.add_error(f"{detector.__class__.__name__} failed: {str(e)}")
+        if self.workers > 1:
+            with diagnostics.span("sharding", len(table)) as span:
+                shards = shard_table_by_vendor(table, self.workers)
+                span.output_size = len(shards)
 
-        total_spend_by_currency = self._calculate_total_spend(transactions)
+        if len(shards) > 1:
+            detector_results, vendor_behavior_profiles = self._analyze_parallel(
+                table, shards, diagnostics
+            )
+        else:
+            detector_results, vendor_behavior_profiles = self._analyze_serial(
+                table, diagnostics
+            )
 
-        scored_results = self.scoring_engine.score(
-            detections=all_detections,
-            total_spend_by_currency=total_spend_by_currency,
-        )
+        all_detections = [
+            detection
+            for results in detector_results if results is not None
+            for detection in results
+        ]
 
-        sorted_detections = sorted(
-            scored_results["updated_detections"],
-            key=lambda d: (
-                d.detection_type.value,
-                d.currency,
-                str(d.financial_impact_estimate),
-                sorted(d.related_transaction_ids),
-            )
-        )
+        with diagnostics.span("total_spend", len(table)) as span:
+            total_spend_by_currency = self._calculate_total_spend(table)
+            span.output_size = len(total_spend_by_currency)
 
-        vendor_behavior_profiles = self.behavior_analyzer.analyze(transactions)
+        if trace is not None:
+            trace["detector_results"] = detector_results
+            trace["vendor_behavior_profiles"] = vendor_behavior_profiles
+            trace["total_spend_by_currency"] = total_spend_by_currency
 
-        vendor_ranking = self.vendor_ranker.rank(
-            scored_results["vendor_totals"],
+        return self.assemble_output(
+            dataset_hash,
+            all_detections,
             vendor_behavior_profiles,
             total_spend_by_currency,
+            diagnostics,
         )
 
+    def assemble_output(
+        self,
+        dataset_hash: str,
+        all_detections: List[DetectionResult],
+        vendor_behavior_profiles: Dict,
+        total_spend_by_currency: Dict[str, Decimal],
+        diagnostics: Optional[EngineDiagnostics] = None,
+    ) -> Dict:
+        """
+        Scoring, ranking and summary over already computed per-vendor
+        results. Shared by the full pipeline and the incremental engine.
+        """
+
+        if diagnostics is None:
+            diagnostics = EngineDiagnostics()
+
+        with diagnostics.span("risk_scoring", len(all_detections)) as span:
+            scored_results = self.scoring_engine.score(
+                detections=all_detections,
+                total_spend_by_currency=total_spend_by_currency,
+            )
+            span.output_size = len(scored_results["updated_detections"])
+
+        with diagnostics.span("detection_sort", len(scored_results["updated_detections"])):
+            sorted_detections = sorted(
+                scored_results["updated_detections"],
+                key=lambda d: d.detection_id,
+            )
+
+        with diagnostics.span("vendor_ranking", len(vendor_behavior_profiles)) as span:
+            vendor_ranking = self.vendor_ranker.rank(
+                scored_results["vendor_totals"],
+                vendor_behavior_profiles,
+                total_spend_by_currency,
+            )
+            span.output_size = len(vendor_ranking)
+
         core_output = {
             "engine_version": ENGINE_VERSION,
             "dataset_hash": dataset_hash,
@@ -103,16 +253,158 @@ class VendorLeakEngine:
             "vendor_ranking": vendor_ranking,
         }
 
-        executive_summary = self.summary_generator.generate(core_output)
+        with diagnostics.span("executive_summary", len(sorted_detections)):
+            executive_summary = self.summary_generator.generate(core_output)
+
         core_output["executive_summary"] = executive_summary
 
         return core_output
 
-    def _calculate_total_spend(self, transactions: List[Transaction]) -> Dict[str, Decimal]:
-        totals: Dict[str, Decimal] = {}
+    def configuration(self) -> Dict:
+        """
+        Versions and parameters of every component that affects output.
+        """
+        configuration = {
+            "engine_version": ENGINE_VERSION,
+            "detectors": [
+                {
+                    **detector.detector_metadata(),
+                    "parameters": _component_parameters(detector),
+                }
+                for detector in self.detectors
+            ],
+            "behavior_version": self.behavior_analyzer.VERSION,
+            "behavior_parameters": _component_parameters(self.behavior_analyzer),
+            "scoring_version": self.scoring_engine.VERSION,
+            "scoring_parameters": _component_parameters(self.scoring_engine),
+            "ranking_version": self.vendor_ranker.VERSION,
+            "summary_version": self.summary_generator.VERSION,
+        }
+
+        if self.vendor_resolver is not None:
+            configuration["resolver_version"] = self.vendor_resolver.VERSION
+            configuration["resolver_parameters"] = _component_parameters(self.vendor_resolver)
+
+        return configuration
+
+    def _analyze_serial(
+        self,
+        table: TransactionTable,
+        diagnostics: EngineDiagnostics,
+    ) -> Tuple[List[Optional[List[DetectionResult]]], Dict]:
+        """
+        Returns per-detector results (None for a failed detector) and the
+        behavior profiles.
+        """
+
+        rows = len(table)
+
+        with diagnostics.span("transaction_index", rows) as span:
+            index = TransactionIndex.build(table)
+            span.output_size = len(index.vendor_rows)
+
+        detector_results = []
+
+        for detector in self.detectors:
+            try:
+                with diagnostics.span(f"detector:{detector.__class__.__name__}", rows) as span:
+                    results = detector.detect_index(index)
+                    span.output_size = len(results)
+                detector_results.append(results)
+            except Exception as e:
+                diagnostics.add_error(f"{detector.__class__.__name__} failed: {str(e)}")
+                detector_results.append(None)
+
+        with diagnostics.span("behavior_analysis", rows) as span:
+            vendor_behavior_profiles = self.behavior_analyzer.analyze_index(index)
+            span.output_size = len(vendor_behavior_profiles)
+
+        return detector_results, vendor_behavior_profiles
+
+    def _analyze_parallel(
+        self,
+        table: TransactionTable,
+        shards: List[TransactionTable],
+        diagnostics: EngineDiagnostics,
+    ) -> Tuple[List[Optional[List[DetectionResult]]], Dict]:
+        """
+        Runs detectors and behavior analysis per vendor shard in a process
+        pool, then merges in serial order: detector by detector, vendors by
+        first occurrence. A detector failing on any shard is dropped
+        entirely, as it would be in a serial run. Detectors that are not
+        vendor-local run here, over the whole table.
+        """
+
+        with diagnostics.span("parallel_analysis", len(table), shards=len(shards)):
+            with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+                shard_results = list(pool.map(
+                    analyze_shard,
+                    repeat(self.detectors),
+                    repeat(self.behavior_analyzer),
+                    shards,
+                    repeat(diagnostics.profile),
+                ))
+
+        for shard, (_, _, spans) in enumerate(shard_results):
+            for span in spans:
+                diagnostics.record_span({**span, "shard": shard})
+
+        if not all(detector.VENDOR_LOCAL for detector in self.detectors):
+            shard_results.append((self._run_global_detectors(table, diagnostics), {}, []))
+
+        return merge_shard_results(
+            self.detectors,
+            shard_results,
+            vendor_first_occurrence(table),
+            diagnostics,
+        )
+
+    def _run_global_detectors(
+        self,
+        table: TransactionTable,
+        diagnostics: EngineDiagnostics,
+    ) -> List[Tuple[Optional[List[DetectionResult]], Optional[str]]]:
+        """
+        Outcomes in the `analyze_shard` layout for the detectors that are
+        not vendor-local; vendor-local positions are left empty.
+        """
+
+        rows = len(table)
+
+        with diagnostics.span("transaction_index", rows) as span:
+            index = TransactionIndex.build(table)
+            span.output_size = len(index.vendor_rows)
+
+        outcomes = []
+
+        for detector in self.detectors:
+            if detector.VENDOR_LOCAL:
+                outcomes.append(([], None))
+                continue
+
+            try:
+                with diagnostics.span(f"detector:{detector.__class__.__name__}", rows) as span:
+                    results = detector.detect_index(index)
+                    span.output_size = len(results)
+                outcomes.append((results, None))
+            except Exception as e:
+                outcomes.append((None, str(e)))
+
+        return outcomes
+
+    def _calculate_total_spend(self, table: TransactionTable) -> Dict[str, Decimal]:
+        """
+        Per-currency totals in first-occurrence order, summed on integer
+        minor units and converted to Decimal once per currency.
+        """
+        return {
+            table.currencies[currency_code]: currency_total(table, currency_code)
+            for currency_code in dict.fromkeys(table.currency_codes)
+        }
 
-        for tx in transactions:
-            totals.setdefault(tx.currency, Decimal("0"))
-            totals[tx.currency] += tx.amount
 
-        return totals
+def _component_parameters(component) -> Dict[str, str]:
+    return {
+        name: str(value)
+        for name, value in sorted(vars(component).items())
+    }
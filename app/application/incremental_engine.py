@@ -0,0 +1,815 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable, TransactionTableBuilder
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.detection.streaming_detector import StreamingDetector
+from app.domain.models.detection_result import DetectionResult
+from app.domain.enums import DetectionType
+from app.domain.diagnostics.engine_diagnostics import EngineDiagnostics
+from app.domain.utils.merkle_fingerprint import DatasetFingerprint, FINGERPRINT_VERSION
+from app.application.engine import VendorLeakEngine, ENGINE_VERSION
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY,
+    transaction_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    vendor_raw_name TEXT NOT NULL,
+    vendor TEXT NOT NULL,
+    amount TEXT NOT NULL,
+    currency TEXT NOT NULL,
+    category TEXT,
+    description TEXT,
+    payment_method TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_by_vendor ON transactions (vendor, seq);
+CREATE INDEX IF NOT EXISTS transactions_by_id ON transactions (transaction_id, seq);
+CREATE TABLE IF NOT EXISTS vendors (
+    vendor TEXT PRIMARY KEY,
+    first_seq INTEGER NOT NULL,
+    profile BLOB
+);
+CREATE TABLE IF NOT EXISTS vendor_detections (
+    vendor TEXT NOT NULL,
+    detector_position INTEGER NOT NULL,
+    detections BLOB,
+    error TEXT,
+    PRIMARY KEY (vendor, detector_position)
+);
+CREATE TABLE IF NOT EXISTS detector_state (
+    vendor TEXT NOT NULL,
+    detector_position INTEGER NOT NULL,
+    state BLOB NOT NULL,
+    PRIMARY KEY (vendor, detector_position)
+);
+CREATE TABLE IF NOT EXISTS vendor_results (
+    vendor TEXT PRIMARY KEY,
+    detections BLOB NOT NULL,
+    flagged_totals TEXT NOT NULL,
+    recurring_exposure TEXT NOT NULL,
+    escalated INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS currency_totals (
+    currency TEXT PRIMARY KEY,
+    first_seq INTEGER NOT NULL,
+    total TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fingerprint_leaves (
+    vendor TEXT NOT NULL,
+    period TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    digest_sum TEXT NOT NULL,
+    PRIMARY KEY (vendor, period)
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class IncrementalVendorLeakEngine:
+    """
+    Stateful engine that re-analyzes only vendors touched by new transactions.
+
+    Transactions, per-vendor detections and behavior profiles, per-vendor
+    scored results (final-severity detections, flagged totals, recurring
+    exposure) and per-currency spend totals are persisted in a local SQLite
+    file, and held in memory after the first append. Each appended batch
+    re-runs the detectors and behavior analyzer for the affected vendors only
+    and rescores them, plus any vendor whose materiality escalation flipped;
+    scoring aggregates, ranking and the executive summary are then rebuilt
+    from the per-vendor totals. Output matches a full `VendorLeakEngine.run`
+    over the whole history, `dataset_hash` included: it is read from the
+    stored transactions in id order, so no sort is needed.
+
+    An instance assumes it is the only writer of its state file.
+
+    Detectors must be vendor-local (their findings for one vendor depend only
+    on that vendor's transactions), which holds for all built-in detectors.
+    A StreamingDetector's per-vendor state is persisted too and advanced with
+    the appended rows only; a vendor whose new rows predate its state is
+    replayed from its history.
+
+    The state also keeps a DatasetFingerprint, updated leaf by leaf on
+    every append (see `fingerprint`).
+    """
+
+    VERSION = "1.2.0"
+
+    def __init__(
+        self,
+        state_path: str,
+        engine: Optional[VendorLeakEngine] = None,
+        vendor_batch_size: int = 500,
+    ):
+        self.engine = engine or VendorLeakEngine()
+        self.vendor_batch_size = vendor_batch_size
+
+        if not all(detector.VENDOR_LOCAL for detector in self.engine.detectors):
+            raise ValueError("Incremental execution requires vendor-local detectors.")
+
+        if self.engine.vendor_resolver is not None:
+            raise ValueError("Incremental execution does not support vendor resolution.")
+
+        self._connection = sqlite3.connect(state_path)
+        self._connection.executescript(SCHEMA)
+
+        self._configuration = json.dumps(self.engine.configuration(), sort_keys=True)
+
+        # In-memory copy of the assembled state, loaded on first append
+        self._loaded = False
+        self._profiles: Dict = {}
+        self._results: Dict[str, _VendorResult] = {}
+        self._errors: Dict[int, Dict[str, str]] = {}
+        self._failed_positions: Set[int] = set()
+        self._detections: List[DetectionResult] = []
+
+    def close(self):
+        self._connection.close()
+
+    def fingerprint(self) -> DatasetFingerprint:
+        """
+        Fingerprint of the whole stored history, read from its leaves.
+        Diff two of them to see which vendors an append changed.
+        """
+
+        with self._connection:
+            self._ensure_fingerprint()
+
+        return self._read_fingerprint()
+
+    def append(self, transactions: Iterable[Transaction]) -> Dict:
+        return self.append_table(TransactionTable.from_transactions(transactions))
+
+    def append_table(self, delta: TransactionTable) -> Dict:
+
+        diagnostics = EngineDiagnostics(self.engine.profile, self.engine.span_hooks)
+
+        try:
+            with self._connection:
+                self._ensure_fingerprint()
+
+                if not self._loaded:
+                    with diagnostics.span("load_state") as span:
+                        self._load_state()
+                        span.output_size = len(self._profiles)
+
+                with diagnostics.span("ingest", len(delta)) as span:
+                    affected_vendors = self._ingest(delta)
+                    span.output_size = len(affected_vendors)
+
+                replay = self._load_metadata("configuration") != self._configuration
+
+                if replay:
+                    affected_vendors = self._all_vendors()
+                    self._store_metadata("configuration", self._configuration)
+
+                with diagnostics.span("recompute_vendors", len(affected_vendors)):
+                    detections_by_vendor = self._recompute_vendors(affected_vendors, delta, replay)
+
+                currency_totals = self._load_currency_totals()
+
+                with diagnostics.span("rescore_vendors", len(detections_by_vendor)) as span:
+                    changed_vendors = self._rescore_vendors(detections_by_vendor, currency_totals)
+                    span.output_size = len(changed_vendors)
+
+            with diagnostics.span("detection_merge", len(self._detections)):
+                self._merge_detections(changed_vendors)
+
+            with diagnostics.span("dataset_hash"):
+                dataset_hash = self._dataset_hash()
+
+            result = self._assemble_output(dataset_hash, currency_totals, diagnostics)
+
+            result["diagnostics"] = diagnostics.to_dict()
+            return result
+
+        except Exception as e:
+            # The file was rolled back; reload instead of trusting memory
+            self._loaded = False
+            diagnostics.add_error(str(e))
+            return {
+                "engine_version": ENGINE_VERSION,
+                "diagnostics": diagnostics.to_dict(),
+            }
+
+    def _ingest(self, delta: TransactionTable) -> List[str]:
+
+        cursor = self._connection.cursor()
+
+        next_seq = cursor.execute(
+            "SELECT COALESCE(MAX(seq), -1) + 1 FROM transactions"
+        ).fetchone()[0]
+
+        totals = {
+            currency: (first_seq, Decimal(total))
+            for currency, first_seq, total in cursor.execute(
+                "SELECT currency, first_seq, total FROM currency_totals"
+            )
+        }
+
+        affected_vendors: Dict[str, int] = {}
+        rows = []
+        fingerprint = DatasetFingerprint()
+
+        for row in range(len(delta)):
+            seq = next_seq + row
+            vendor = delta.vendor(row)
+            currency = delta.currency(row)
+            amount = delta.amount(row)
+            date = delta.date(row)
+
+            affected_vendors.setdefault(vendor, seq)
+
+            first_seq, total = totals.get(currency, (seq, Decimal("0")))
+            totals[currency] = (first_seq, total + amount)
+
+            fingerprint.add(delta.transaction_ids[row], date, vendor, amount, currency)
+
+            rows.append((
+                seq,
+                delta.transaction_ids[row],
+                date.isoformat(),
+                delta.raw_vendors[delta.raw_vendor_codes[row]],
+                vendor,
+                str(amount),
+                currency,
+                delta.categories[delta.category_codes[row]],
+                delta.descriptions[delta.description_codes[row]],
+                delta.payment_methods[delta.payment_method_codes[row]],
+            ))
+
+        cursor.executemany(
+            "INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+        cursor.executemany(
+            "INSERT OR IGNORE INTO vendors (vendor, first_seq) VALUES (?, ?)",
+            affected_vendors.items(),
+        )
+
+        cursor.executemany(
+            "INSERT OR REPLACE INTO currency_totals VALUES (?, ?, ?)",
+            (
+                (currency, first_seq, str(total))
+                for currency, (first_seq, total) in totals.items()
+            ),
+        )
+
+        self._add_fingerprint_leaves(fingerprint)
+
+        return list(affected_vendors)
+
+    def _add_fingerprint_leaves(self, fingerprint: DatasetFingerprint):
+
+        leaves = list(fingerprint.leaves())
+
+        if not leaves:
+            return
+
+        stored = DatasetFingerprint()
+
+        for vendor, period, count, digest_sum in leaves:
+            existing = self._connection.execute(
+                "SELECT row_count, digest_sum FROM fingerprint_leaves "
+                "WHERE vendor = ? AND period = ?",
+                (vendor, period),
+            ).fetchone()
+
+            if existing is not None:
+                stored.add_leaf(vendor, period, existing[0], int(existing[1], 16))
+
+        stored.merge(fingerprint)
+
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO fingerprint_leaves VALUES (?, ?, ?, ?)",
+            (
+                (vendor, period, count, f"{digest_sum:064x}")
+                for vendor, period, count, digest_sum in stored.leaves()
+            ),
+        )
+
+    def _ensure_fingerprint(self):
+        """
+        Builds the fingerprint leaves of state written before they existed
+        (or by another fingerprint version) from the stored transactions.
+        """
+
+        if self._load_metadata("fingerprint_version") == FINGERPRINT_VERSION:
+            return
+
+        fingerprint = DatasetFingerprint()
+
+        for transaction_id, date, vendor, amount, currency in self._connection.execute(
+            "SELECT transaction_id, date, vendor, amount, currency FROM transactions"
+        ):
+            fingerprint.add(
+                transaction_id, datetime.fromisoformat(date), vendor, Decimal(amount), currency
+            )
+
+        self._connection.execute("DELETE FROM fingerprint_leaves")
+        self._add_fingerprint_leaves(fingerprint)
+        self._store_metadata("fingerprint_version", FINGERPRINT_VERSION)
+
+    def _read_fingerprint(self) -> DatasetFingerprint:
+
+        fingerprint = DatasetFingerprint()
+
+        for vendor, period, count, digest_sum in self._connection.execute(
+            "SELECT vendor, period, row_count, digest_sum FROM fingerprint_leaves"
+        ):
+            fingerprint.add_leaf(vendor, period, count, int(digest_sum, 16))
+
+        return fingerprint
+
+    def _load_state(self):
+        """
+        Reads the assembled state into memory once per instance; later
+        appends only update the entries of vendors they change.
+        """
+
+        self._profiles = {
+            vendor: pickle.loads(profile)
+            for vendor, profile in self._connection.execute(
+                "SELECT vendor, profile FROM vendors ORDER BY first_seq"
+            )
+            if profile is not None
+        }
+
+        self._errors = {}
+
+        for vendor, position, error in self._connection.execute(
+            "SELECT vendor, detector_position, error FROM vendor_detections "
+            "WHERE error IS NOT NULL"
+        ):
+            self._errors.setdefault(position, {})[vendor] = error
+
+        self._failed_positions = set(self._errors)
+
+        self._results = {
+            vendor: _VendorResult(
+                pickle.loads(detections),
+                {currency: Decimal(total) for currency, total in json.loads(flagged_totals).items()},
+                Decimal(recurring_exposure),
+                bool(escalated),
+            )
+            for vendor, detections, flagged_totals, recurring_exposure, escalated
+            in self._connection.execute("SELECT * FROM vendor_results")
+        }
+
+        self._detections = sorted(
+            (detection for result in self._results.values() for detection in result.detections),
+            key=_detection_key,
+        )
+
+        self._loaded = True
+
+    def _recompute_vendors(
+        self,
+        vendors: List[str],
+        delta: TransactionTable,
+        replay: bool = False,
+    ) -> Dict[str, Dict[int, list]]:
+        """
+        Re-runs detection and behavior analysis for `vendors` and stores the
+        raw results. Streaming detectors advance their stored state with the
+        `delta` rows instead, unless `replay` is set. Returns each vendor's
+        detections by detector position, for detectors that did not fail.
+        """
+
+        cursor = self._connection.cursor()
+
+        detections_by_vendor: Dict[str, Dict[int, list]] = {vendor: {} for vendor in vendors}
+
+        delta_rows: Dict[str, List[int]] = {}
+
+        if not replay and any(isinstance(d, StreamingDetector) for d in self.engine.detectors):
+            delta_index = TransactionIndex.build(delta)
+            delta_rows = {
+                delta.vendors[vendor_code]: rows
+                for vendor_code, rows in delta_index.vendor_rows.items()
+            }
+
+        for start in range(0, len(vendors), self.vendor_batch_size):
+            batch = vendors[start:start + self.vendor_batch_size]
+
+            index = TransactionIndex.build(self._load_vendor_table(batch))
+
+            for position, detector in enumerate(self.engine.detectors):
+                by_vendor: Dict[str, list] = {vendor: [] for vendor in batch}
+                error = None
+
+                try:
+                    if isinstance(detector, StreamingDetector):
+                        detections = self._advance_streaming(
+                            position, detector, batch, index, delta, delta_rows
+                        )
+                    else:
+                        detections = detector.detect_index(index)
+
+                    for detection in detections:
+                        by_vendor[detection.supporting_evidence["vendor"]].append(detection)
+                except Exception as e:
+                    error = str(e)
+
+                if error is not None and isinstance(detector, StreamingDetector):
+                    # States may be partly advanced; replay these vendors next time
+                    cursor.executemany(
+                        "DELETE FROM detector_state WHERE vendor = ? AND detector_position = ?",
+                        ((vendor, position) for vendor in batch),
+                    )
+
+                errors = self._errors.setdefault(position, {})
+
+                for vendor, detections in by_vendor.items():
+                    if error is not None:
+                        errors[vendor] = error
+                    else:
+                        errors.pop(vendor, None)
+                        detections_by_vendor[vendor][position] = detections
+
+                if not errors:
+                    del self._errors[position]
+
+                cursor.executemany(
+                    "INSERT OR REPLACE INTO vendor_detections VALUES (?, ?, ?, ?)",
+                    (
+                        (
+                            vendor,
+                            position,
+                            None if error is not None else pickle.dumps(detections),
+                            error,
+                        )
+                        for vendor, detections in by_vendor.items()
+                    ),
+                )
+
+            profiles = self.engine.behavior_analyzer.analyze_index(index)
+
+            cursor.executemany(
+                "UPDATE vendors SET profile = ? WHERE vendor = ?",
+                ((pickle.dumps(profile), vendor) for vendor, profile in profiles.items()),
+            )
+
+            self._profiles.update(profiles)
+
+        return detections_by_vendor
+
+    def _advance_streaming(
+        self,
+        position: int,
+        detector: StreamingDetector,
+        vendors: List[str],
+        index: TransactionIndex,
+        delta: TransactionTable,
+        delta_rows: Dict[str, List[int]],
+    ) -> list:
+        """
+        Advances each vendor's stored state with its delta rows, or replays
+        the vendor's history (from `index`) into a fresh state when there
+        is no usable state. Stores the states and returns the findings.
+        """
+
+        placeholders = ", ".join("?" for _ in vendors)
+
+        stored = {
+            vendor: pickle.loads(state)
+            for vendor, state in self._connection.execute(
+                "SELECT vendor, state FROM detector_state "
+                f"WHERE detector_position = ? AND vendor IN ({placeholders})",
+                [position, *vendors],
+            )
+        } if delta_rows else {}
+
+        history = {
+            index.table.vendors[vendor_code]: rows
+            for vendor_code, rows in index.vendor_rows.items()
+        }
+
+        detections = []
+        states = []
+
+        for vendor in vendors:
+            state = stored.get(vendor)
+            rows = delta_rows.get(vendor)
+
+            if state is not None and rows is not None and detector.accepts(state, delta, rows):
+                detector.advance(state, delta, rows)
+            else:
+                state = detector.new_state()
+                detector.advance(state, index.table, history.get(vendor, []))
+
+            detections.extend(detector.results(state))
+            states.append((vendor, position, pickle.dumps(state)))
+
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO detector_state VALUES (?, ?, ?)", states
+        )
+
+        return detections
+
+    def _rescore_vendors(
+        self,
+        detections_by_vendor: Dict[str, Dict[int, list]],
+        currency_totals: Dict[str, Decimal],
+    ) -> Set[str]:
+        """
+        Rebuilds the scored results of the recomputed vendors, then rescores
+        every vendor whose materiality escalation changed with the new
+        totals. Returns the vendors whose stored results changed.
+        """
+
+        scoring_engine = self.engine.scoring_engine
+
+        rebuilt = dict(detections_by_vendor)
+
+        # A detector that starts or stops failing changes every vendor's
+        # results; state written before vendor_results existed has none
+        if self._failed_positions != set(self._errors):
+            stale = [vendor for vendor in self._profiles if vendor not in rebuilt]
+        else:
+            stale = [
+                vendor for vendor in self._profiles
+                if vendor not in rebuilt and vendor not in self._results
+            ]
+
+        rebuilt.update(self._load_raw_detections(stale))
+        self._failed_positions = set(self._errors)
+
+        for vendor, by_position in rebuilt.items():
+            self._results[vendor] = _VendorResult.from_detections([
+                detection
+                for position in sorted(by_position)
+                if position not in self._failed_positions
+                for detection in by_position[position]
+            ])
+
+        escalated = scoring_engine.escalated_vendors(
+            {
+                vendor: result.flagged_totals
+                for vendor, result in self._results.items()
+                if result.flagged_totals
+            },
+            currency_totals,
+        )
+
+        changed_vendors = set(rebuilt) | {
+            vendor for vendor, result in self._results.items()
+            if result.escalated != (vendor in escalated)
+        }
+
+        for vendor in changed_vendors:
+            result = self._results[vendor]
+            result.escalated = vendor in escalated
+            result.detections = scoring_engine.score_vendor(result.detections, result.escalated)
+
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO vendor_results VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    vendor,
+                    pickle.dumps(result.detections),
+                    json.dumps({currency: str(total) for currency, total in result.flagged_totals.items()}),
+                    str(result.recurring_exposure),
+                    int(result.escalated),
+                )
+                for vendor, result in (
+                    (vendor, self._results[vendor]) for vendor in changed_vendors
+                )
+            ),
+        )
+
+        return changed_vendors
+
+    def _load_raw_detections(self, vendors: List[str]) -> Dict[str, Dict[int, list]]:
+
+        detections_by_vendor: Dict[str, Dict[int, list]] = {vendor: {} for vendor in vendors}
+
+        for start in range(0, len(vendors), self.vendor_batch_size):
+            batch = vendors[start:start + self.vendor_batch_size]
+            placeholders = ", ".join("?" for _ in batch)
+
+            for vendor, position, payload in self._connection.execute(
+                "SELECT vendor, detector_position, detections FROM vendor_detections "
+                f"WHERE vendor IN ({placeholders}) AND detections IS NOT NULL",
+                batch,
+            ):
+                detections_by_vendor[vendor][position] = pickle.loads(payload)
+
+        return detections_by_vendor
+
+    def _merge_detections(self, changed_vendors: Set[str]):
+        """
+        Replaces the changed vendors' entries in the sorted detection list.
+        """
+
+        if not changed_vendors:
+            return
+
+        kept = [
+            detection for detection in self._detections
+            if detection.supporting_evidence["vendor"] not in changed_vendors
+        ]
+
+        updated = sorted(
+            (
+                detection
+                for vendor in changed_vendors
+                for detection in self._results[vendor].detections
+            ),
+            key=_detection_key,
+        )
+
+        # Two sorted runs: the sort only merges them, in linear time
+        self._detections = sorted(kept + updated, key=_detection_key)
+
+    def _assemble_output(
+        self,
+        dataset_hash: str,
+        currency_totals: Dict[str, Decimal],
+        diagnostics: EngineDiagnostics,
+    ) -> Dict:
+        """
+        The same output as `VendorLeakEngine.assemble_output`, built from the
+        per-vendor results instead of rescoring every detection.
+        """
+
+        for position in sorted(self._errors):
+            detector = self.engine.detectors[position]
+            error = next(iter(self._errors[position].values()))
+            diagnostics.add_error(f"{detector.__class__.__name__} failed: {error}")
+
+        vendor_totals = {
+            vendor: result.flagged_totals
+            for vendor, result in self._results.items()
+            if result.flagged_totals
+        }
+
+        with diagnostics.span("risk_scoring", len(vendor_totals)):
+            scored = self.engine.scoring_engine.summarize(vendor_totals, currency_totals)
+
+        with diagnostics.span("vendor_ranking", len(self._profiles)) as span:
+            vendor_ranking = self.engine.vendor_ranker.rank(
+                scored["vendor_totals"],
+                self._profiles,
+                currency_totals,
+            )
+            span.output_size = len(vendor_ranking)
+
+        total_flagged = sum(sum(totals.values()) for totals in vendor_totals.values())
+
+        total_annualized_exposure = sum(
+            (result.recurring_exposure for result in self._results.values()),
+            Decimal("0"),
+        )
+
+        with diagnostics.span("executive_summary", len(vendor_totals)):
+            executive_summary = self.engine.summary_generator.generate_from_totals(
+                total_flagged,
+                total_annualized_exposure,
+                vendor_ranking.get("ranked_vendors", {}),
+                scored["summary"],
+            )
+
+        return {
+            "engine_version": ENGINE_VERSION,
+            "dataset_hash": dataset_hash,
+            "detections": list(self._detections),
+            "vendor_totals": scored["vendor_totals"],
+            "currency_totals": scored["currency_totals"],
+            "summary": scored["summary"],
+            "vendor_behavior_profiles": dict(self._profiles),
+            "vendor_ranking": vendor_ranking,
+            "executive_summary": executive_summary,
+        }
+
+    def _load_vendor_table(self, vendors: List[str]) -> TransactionTable:
+
+        builder = TransactionTableBuilder()
+
+        placeholders = ", ".join("?" for _ in vendors)
+
+        for (
+            transaction_id, date, vendor_raw_name, vendor, amount,
+            currency, category, description, payment_method,
+        ) in self._connection.execute(
+            "SELECT transaction_id, date, vendor_raw_name, vendor, amount, currency, "
+            "category, description, payment_method FROM transactions "
+            f"WHERE vendor IN ({placeholders}) ORDER BY seq",
+            vendors,
+        ):
+            builder.append(
+                transaction_id=transaction_id,
+                date=datetime.fromisoformat(date),
+                vendor_raw_name=vendor_raw_name,
+                vendor_normalized_name=vendor,
+                amount=Decimal(amount),
+                currency=currency,
+                category=category,
+                description=description,
+                payment_method=payment_method,
+            )
+
+        return builder.build()
+
+    def _load_currency_totals(self) -> Dict[str, Decimal]:
+        return {
+            currency: Decimal(total)
+            for currency, total in self._connection.execute(
+                "SELECT currency, total FROM currency_totals ORDER BY first_seq"
+            )
+        }
+
+    def _all_vendors(self) -> List[str]:
+        return [
+            vendor for (vendor,) in self._connection.execute(
+                "SELECT vendor FROM vendors ORDER BY first_seq"
+            )
+        ]
+
+    def _dataset_hash(self) -> str:
+        """
+        Same digest as `generate_dataset_hash` over the whole history: the
+        transactions_by_id index yields rows in (transaction_id, seq)
+        order, i.e. a stable sort by id.
+        """
+
+        hasher = hashlib.sha256()
+
+        for transaction_id, date, vendor, amount, currency in self._connection.execute(
+            "SELECT transaction_id, date, vendor, amount, currency FROM transactions "
+            "ORDER BY transaction_id, seq"
+        ):
+            hasher.update(transaction_id.encode())
+            hasher.update(str(datetime.fromisoformat(date)).encode())
+            hasher.update(vendor.encode())
+            hasher.update(amount.encode())
+            hasher.update(currency.encode())
+
+        return hasher.hexdigest()
+
+    def _load_metadata(self, key: str) -> Optional[str]:
+        row = self._connection.execute(
+            "SELECT value FROM metadata WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _store_metadata(self, key: str, value: str):
+        self._connection.execute(
+            "INSERT OR REPLACE INTO metadata VALUES (?, ?)", (key, value)
+        )
+
+
+class _VendorResult:
+    """
+    Scored findings of one vendor: retained detections (final severities
+    once scored), flagged totals per currency, recurring exposure and
+    whether materiality escalation applies.
+    """
+
+    def __init__(
+        self,
+        detections: List[DetectionResult],
+        flagged_totals: Dict[str, Decimal],
+        recurring_exposure: Decimal,
+        escalated: bool,
+    ):
+        self.detections = detections
+        self.flagged_totals = flagged_totals
+        self.recurring_exposure = recurring_exposure
+        self.escalated = escalated
+
+    @classmethod
+    def from_detections(cls, detections: List[DetectionResult]) -> "_VendorResult":
+        retained = [
+            detection for detection in detections
+            if detection.financial_impact_estimate > Decimal("0")
+        ]
+
+        flagged_totals: Dict[str, Decimal] = {}
+        recurring_exposure = Decimal("0")
+
+        for detection in retained:
+            impact = detection.financial_impact_estimate
+            flagged_totals[detection.currency] = (
+                flagged_totals.get(detection.currency, Decimal("0")) + impact
+            )
+
+            if detection.detection_type == DetectionType.RECURRING:
+                recurring_exposure += impact
+
+        return cls(retained, flagged_totals, recurring_exposure, False)
+
+
+def _detection_key(detection: DetectionResult) -> str:
+    return detection.detection_id
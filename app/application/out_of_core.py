@@ -0,0 +1,491 @@
+import hashlib
+import heapq
+import math
+import os
+import pickle
+import tempfile
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable, TransactionTableBuilder
+from app.domain.diagnostics.engine_diagnostics import EngineDiagnostics
+from app.ingestion.csv_loader import iter_csv
+from app.application.engine import VendorLeakEngine, ENGINE_VERSION
+from app.application.sharding import analyze_shard, merge_shard_results, vendor_shard
+
+
+DEFAULT_MEMORY_BUDGET_BYTES = 512 * 1024 ** 2
+
+DEFAULT_PARTITIONS = 16
+MAX_PARTITIONS = 256
+MAX_SPLIT_DEPTH = 4
+MAX_MERGE_FANIN = 128
+
+# Footprint estimates used to size buffers and partitions
+ANALYSIS_BYTES_PER_ROW = 1_000
+BUFFERED_BYTES_PER_ROW = 600
+HASH_ENTRY_BYTES = 250
+CSV_BYTES_PER_ROW = 100
+
+_BLOCK_ROWS = 10_000
+
+
+class OutOfCoreVendorLeakEngine:
+    """
+    Runs the engine over datasets that do not fit in memory.
+
+    1. The input stream is hash-partitioned by vendor into spill files.
+       Per-currency spend totals and each vendor's first position are
+       accumulated on the way, and fingerprint entries are written as
+       sorted runs keyed by (transaction_id, position).
+    2. Partitions are loaded one at a time and run through the detectors
+       and behavior analyzer. A partition whose estimated footprint
+       exceeds the budget is split again with a salted (keyed) vendor
+       hash, up to MAX_SPLIT_DEPTH times.
+    3. Per-partition results are merged in serial order, then scored,
+       ranked and summarized once. The fingerprint is an external merge
+       of the sorted runs.
+
+    The wrapped engine's result cache is consulted once the dataset hash
+    is known, before any partition is analyzed. With
+    `enforce_determinism`, sampled vendors are re-executed while their
+    partition is loaded, and the output stages are replayed at the end.
+
+    Output equals `VendorLeakEngine.run` over the same transactions.
+    Working memory follows `memory_budget_bytes`. Detections and one
+    profile per vendor are still held for scoring. A single vendor
+    larger than the budget is processed whole, with a warning.
+    """
+
+    VERSION = "1.0.0"
+
+    def __init__(
+        self,
+        engine: Optional[VendorLeakEngine] = None,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_BYTES,
+        spill_directory: Optional[str] = None,
+        partitions: Optional[int] = None,
+    ):
+        if memory_budget_bytes < 1:
+            raise ValueError("memory_budget_bytes must be a positive integer.")
+
+        if partitions is not None and not 1 <= partitions <= MAX_PARTITIONS:
+            raise ValueError(f"partitions must be between 1 and {MAX_PARTITIONS}.")
+
+        self.engine = engine or VendorLeakEngine()
+
+        if not all(detector.VENDOR_LOCAL for detector in self.engine.detectors):
+            raise ValueError("Out-of-core execution requires vendor-local detectors.")
+
+        if self.engine.vendor_resolver is not None:
+            raise ValueError("Out-of-core execution does not support vendor resolution.")
+
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_directory = spill_directory
+        self.partitions = partitions
+
+        self._buffer_rows = max(1_000, memory_budget_bytes // (4 * BUFFERED_BYTES_PER_ROW))
+        self._run_rows = max(1_000, memory_budget_bytes // (4 * HASH_ENTRY_BYTES))
+        self._partition_rows = max(1_000, memory_budget_bytes // ANALYSIS_BYTES_PER_ROW)
+
+    def run(self, transactions: List[Transaction]) -> Dict:
+        return self.run_chunks([transactions])
+
+    def run_csv(self, file_path: str, timezone: str = "UTC") -> Dict:
+        partitions = self.partitions or _clamp(
+            math.ceil(os.path.getsize(file_path) / CSV_BYTES_PER_ROW / self._partition_rows)
+        )
+
+        chunks = iter_csv(file_path, timezone=timezone, chunk_size=self._buffer_rows)
+        return self._run(chunks, partitions)
+
+    def run_chunks(self, chunks: Iterable[List[Transaction]]) -> Dict:
+        return self._run(chunks, self.partitions or DEFAULT_PARTITIONS)
+
+    def _run(self, chunks: Iterable[List[Transaction]], partitions: int) -> Dict:
+
+        diagnostics = EngineDiagnostics(self.engine.profile, self.engine.span_hooks)
+
+        try:
+            with tempfile.TemporaryDirectory(dir=self.spill_directory, prefix="vle-spill-") as workdir:
+
+                with diagnostics.span("partition", partitions=partitions) as span:
+                    spill = _Spill(workdir, partitions, self._buffer_rows, self._run_rows)
+                    spill.consume(chunks)
+                    span.output_size = spill.rows
+
+                with diagnostics.span("dataset_hash", spill.rows):
+                    dataset_hash = _merged_hash(spill.hash_runs, workdir)
+
+                cache_key = None
+
+                if self.engine.cache is not None:
+                    with diagnostics.span("cache_lookup") as span:
+                        cache_key = self.engine.cache.key(dataset_hash, self.engine.configuration())
+                        cached = self.engine.cache.get(cache_key)
+                        span.attributes["hit"] = cached is not None
+
+                    if cached is not None:
+                        diagnostics.record_cache("hit", cache_key)
+                        cached["diagnostics"] = diagnostics.to_dict()
+                        return cached
+
+                    diagnostics.record_cache("miss", cache_key)
+
+                shard_results = []
+                verification = None
+
+                if self.engine.enforce_determinism:
+                    verification = {"violations": [], "sampled_vendors": 0}
+
+                with diagnostics.span("partition_analysis", spill.rows) as span:
+                    for path, rows in spill.partitions:
+                        self._analyze_partition(
+                            path, rows, 1, workdir, shard_results, diagnostics, verification
+                        )
+                    span.output_size = len(shard_results)
+
+            detector_results, vendor_behavior_profiles = merge_shard_results(
+                self.engine.detectors,
+                shard_results,
+                spill.vendor_first_seq,
+                diagnostics,
+            )
+
+            all_detections = [
+                detection
+                for results in detector_results if results is not None
+                for detection in results
+            ]
+
+            result = self.engine.assemble_output(
+                dataset_hash,
+                all_detections,
+                vendor_behavior_profiles,
+                spill.total_spend_by_currency,
+                diagnostics,
+            )
+
+            if verification is not None:
+                with diagnostics.span("determinism_verification", spill.rows):
+                    self.engine.determinism_verifier.verify_output_stages(
+                        detector_results,
+                        vendor_behavior_profiles,
+                        spill.total_spend_by_currency,
+                        result,
+                        diagnostics,
+                        verification["violations"],
+                        verification["sampled_vendors"],
+                    )
+
+            if cache_key is not None and not diagnostics.errors:
+                with diagnostics.span("cache_store"):
+                    self.engine.cache.put(cache_key, result)
+
+            result["diagnostics"] = diagnostics.to_dict()
+            return result
+
+        except Exception as e:
+            diagnostics.add_error(str(e))
+            return {
+                "engine_version": ENGINE_VERSION,
+                "diagnostics": diagnostics.to_dict(),
+            }
+
+    def _analyze_partition(
+        self,
+        path: str,
+        rows: int,
+        depth: int,
+        workdir: str,
+        shard_results: List,
+        diagnostics: EngineDiagnostics,
+        verification: Optional[Dict] = None,
+    ):
+        """
+        Analyzes one partition, splitting it first when over budget. With
+        `verification`, sampled vendors are re-executed while the partition
+        is loaded and violations are collected there.
+        """
+
+        if rows == 0:
+            return
+
+        if rows > self._partition_rows and depth <= MAX_SPLIT_DEPTH:
+            parts = _clamp(math.ceil(rows / self._partition_rows))
+            splits = _split_partition(path, parts, depth, workdir)
+
+            if len(splits) > 1 or splits[0][2] > 1:
+                # A part that kept every row is re-split with the next salt
+                os.remove(path)
+                for split_path, split_rows, _ in splits:
+                    self._analyze_partition(
+                        split_path, split_rows, depth + 1, workdir,
+                        shard_results, diagnostics, verification,
+                    )
+                return
+
+            # A single vendor over budget: no hash can split it
+            for split_path, _, _ in splits:
+                os.remove(split_path)
+
+        table = _load_partition(path)
+        os.remove(path)
+
+        if rows > self._partition_rows:
+            if len(table.vendors) == 1:
+                diagnostics.add_warning(
+                    f"Vendor '{table.vendors[0]}' has {rows} rows, over the memory budget; "
+                    f"it was processed whole."
+                )
+            else:
+                diagnostics.add_warning(
+                    f"Partition of {rows} rows still exceeds the memory budget after "
+                    f"{MAX_SPLIT_DEPTH} splits."
+                )
+
+        shard_results.append(analyze_shard(
+            self.engine.detectors,
+            self.engine.behavior_analyzer,
+            table,
+            diagnostics.profile,
+        ))
+
+        outcomes, profiles, spans = shard_results[-1]
+
+        for span in spans:
+            diagnostics.record_span({**span, "partition": len(shard_results) - 1})
+
+        if verification is not None:
+            verification["sampled_vendors"] += self.engine.determinism_verifier.verify_vendor_stages(
+                table,
+                [results for results, _ in outcomes],
+                profiles,
+                verification["violations"],
+            )
+
+
+class _Spill:
+    """
+    Partitioning pass state: buffered rows per partition, sorted
+    fingerprint runs and the streamed aggregates.
+    """
+
+    def __init__(self, workdir: str, partitions: int, buffer_rows: int, run_rows: int):
+        self.workdir = workdir
+        self.partition_count = partitions
+        self.buffer_rows = buffer_rows
+        self.run_rows = run_rows
+
+        self.rows = 0
+        self.total_spend_by_currency: Dict[str, Decimal] = {}
+        self.vendor_first_seq: Dict[str, int] = {}
+        self.hash_runs: List[str] = []
+
+        self._paths = [os.path.join(workdir, f"partition-{i}.spill") for i in range(partitions)]
+        self._row_counts = [0] * partitions
+        self._buffers: List[List[tuple]] = [[] for _ in range(partitions)]
+        self._buffered = 0
+        self._hash_entries: List[Tuple[str, int, bytes]] = []
+
+    @property
+    def partitions(self) -> List[Tuple[str, int]]:
+        return list(zip(self._paths, self._row_counts))
+
+    def consume(self, chunks: Iterable[List[Transaction]]):
+        totals = self.total_spend_by_currency
+        first_seq = self.vendor_first_seq
+
+        for chunk in chunks:
+            for tx in chunk:
+                seq = self.rows
+                self.rows += 1
+
+                vendor = tx.vendor_normalized_name
+                amount = str(tx.amount)
+
+                first_seq.setdefault(vendor, seq)
+                totals.setdefault(tx.currency, Decimal("0"))
+                totals[tx.currency] += tx.amount
+
+                self._hash_entries.append((
+                    tx.transaction_id,
+                    seq,
+                    "".join((
+                        str(tx.transaction_id),
+                        str(tx.date),
+                        str(vendor),
+                        amount,
+                        str(tx.currency),
+                    )).encode(),
+                ))
+
+                partition = vendor_shard(vendor, self.partition_count)
+                self._buffers[partition].append((
+                    tx.transaction_id,
+                    tx.date.isoformat(),
+                    tx.vendor_raw_name,
+                    vendor,
+                    amount,
+                    tx.currency,
+                    tx.category,
+                    tx.description,
+                    tx.payment_method,
+                ))
+                self._row_counts[partition] += 1
+                self._buffered += 1
+
+                if self._buffered >= self.buffer_rows:
+                    self._flush_partitions()
+
+                if len(self._hash_entries) >= self.run_rows:
+                    self._flush_hash_run()
+
+        self._flush_partitions()
+        self._flush_hash_run()
+
+    def _flush_partitions(self):
+        for path, buffer in zip(self._paths, self._buffers):
+            if buffer:
+                with open(path, "ab") as handle:
+                    pickle.dump(buffer, handle, protocol=pickle.HIGHEST_PROTOCOL)
+                buffer.clear()
+
+        self._buffered = 0
+
+    def _flush_hash_run(self):
+        if not self._hash_entries:
+            return
+
+        self._hash_entries.sort(key=lambda entry: (entry[0], entry[1]))
+        path = os.path.join(self.workdir, f"hash-run-{len(self.hash_runs)}.spill")
+        _write_blocks(path, self._hash_entries)
+
+        self.hash_runs.append(path)
+        self._hash_entries = []
+
+
+def _split_partition(path: str, parts: int, salt: int, workdir: str) -> List[Tuple[str, int, int]]:
+    """
+    Re-partitions a spill file by a salted vendor hash. Returns the
+    non-empty parts as (path, rows, vendors).
+    """
+
+    base = os.path.splitext(path)[0]
+    paths = [f"{base}.{salt}-{part}.spill" for part in range(parts)]
+    counts = [0] * parts
+    vendors: List[set] = [set() for _ in range(parts)]
+
+    for rows in _read_blocks(path):
+        buffers: List[List[tuple]] = [[] for _ in range(parts)]
+
+        for row in rows:
+            part = vendor_shard(row[3], parts, salt)
+            buffers[part].append(row)
+            vendors[part].add(row[3])
+
+        for part, buffer in enumerate(buffers):
+            if buffer:
+                with open(paths[part], "ab") as handle:
+                    pickle.dump(buffer, handle, protocol=pickle.HIGHEST_PROTOCOL)
+                counts[part] += len(buffer)
+
+    return [
+        (split_path, count, len(part_vendors))
+        for split_path, count, part_vendors in zip(paths, counts, vendors)
+        if count
+    ]
+
+
+def _load_partition(path: str) -> TransactionTable:
+    builder = TransactionTableBuilder()
+
+    for rows in _read_blocks(path):
+        for (
+            transaction_id, date, vendor_raw_name, vendor, amount,
+            currency, category, description, payment_method,
+        ) in rows:
+            builder.append(
+                transaction_id=transaction_id,
+                date=datetime.fromisoformat(date),
+                vendor_raw_name=vendor_raw_name,
+                vendor_normalized_name=vendor,
+                amount=Decimal(amount),
+                currency=currency,
+                category=category,
+                description=description,
+                payment_method=payment_method,
+            )
+
+    return builder.build()
+
+
+def _merged_hash(runs: List[str], workdir: str) -> str:
+    """
+    Same digest as `generate_dataset_hash`: entries are merged in
+    (transaction_id, position) order, i.e. a stable sort by id.
+    """
+
+    generation = 0
+
+    while len(runs) > MAX_MERGE_FANIN:
+        merged_runs = []
+
+        for start in range(0, len(runs), MAX_MERGE_FANIN):
+            group = runs[start:start + MAX_MERGE_FANIN]
+            path = os.path.join(workdir, f"hash-merge-{generation}-{start}.spill")
+            _write_blocks(path, _merge_runs(group))
+            for run in group:
+                os.remove(run)
+            merged_runs.append(path)
+
+        runs = merged_runs
+        generation += 1
+
+    hasher = hashlib.sha256()
+
+    for _, _, material in _merge_runs(runs):
+        hasher.update(material)
+
+    return hasher.hexdigest()
+
+
+def _merge_runs(runs: List[str]) -> Iterator[Tuple[str, int, bytes]]:
+    return heapq.merge(
+        *(_iter_entries(run) for run in runs),
+        key=lambda entry: (entry[0], entry[1]),
+    )
+
+
+def _iter_entries(path: str) -> Iterator:
+    for block in _read_blocks(path):
+        yield from block
+
+
+def _write_blocks(path: str, entries: Iterable):
+    with open(path, "wb") as handle:
+        block = []
+
+        for entry in entries:
+            block.append(entry)
+            if len(block) >= _BLOCK_ROWS:
+                pickle.dump(block, handle, protocol=pickle.HIGHEST_PROTOCOL)
+                block = []
+
+        if block:
+            pickle.dump(block, handle, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _read_blocks(path: str) -> Iterator[list]:
+    with open(path, "rb") as handle:
+        while True:
+            try:
+                yield pickle.load(handle)
+            except EOFError:
+                return
+
+
+def _clamp(partitions: int) -> int:
+    return max(1, min(MAX_PARTITIONS, partitions))
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+
+class BaseResultCache(ABC):
+    """
+    Contract for engine result caches.
+
+    Entries are keyed by the dataset fingerprint together with the full
+    engine configuration (engine and component versions plus parameters),
+    so any change that could alter output produces a different key.
+    """
+
+    VERSION = "1.0.0"
+
+    def key(self, dataset_hash: str, configuration: Dict) -> str:
+        payload = json.dumps(
+            {
+                "cache_version": self.VERSION,
+                "dataset_hash": dataset_hash,
+                "configuration": configuration,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict]:
+        pass
+
+    @abstractmethod
+    def put(self, key: str, result: Dict):
+        pass
+
+
+class DiskResultCache(BaseResultCache):
+    """
+    Stores one pickled result per key in `directory`.
+
+    Hits refresh the entry's modification time; after each write the least
+    recently used entries are evicted until the cache fits in `max_bytes`.
+    """
+
+    SUFFIX = ".result"
+
+    def __init__(self, directory: str, max_bytes: int = 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+
+        try:
+            with open(path, "rb") as handle:
+                result = pickle.load(handle)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self._remove(path)
+            return None
+
+        os.utime(path)
+        return result
+
+    def put(self, key: str, result: Dict):
+        handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(handle, "wb") as temp_file:
+                pickle.dump(result, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            self._remove(temp_path)
+            raise
+
+        self._evict()
+
+    def _evict(self):
+        entries = []
+
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, entry.name, stat.st_size, entry.path))
+
+        total_bytes = sum(size for _, _, size, _ in entries)
+
+        for _, _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
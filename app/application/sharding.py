@@ -0,0 +1,145 @@
+import hashlib
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.models.detection_result import DetectionResult
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.diagnostics.engine_diagnostics import EngineDiagnostics
+
+
+def vendor_shard(vendor: str, shard_count: int, salt: int = 0) -> int:
+    """
+    Stable vendor -> shard assignment (independent of PYTHONHASHSEED).
+
+    A non-zero `salt` yields an independent assignment, used to split a
+    shard further. It needs a keyed hash: CRC32 is affine in its seed, so
+    re-seeding it keeps same-length vendors of one shard together.
+    """
+
+    if not salt:
+        return zlib.crc32(vendor.encode("utf-8")) % shard_count
+
+    digest = hashlib.blake2b(
+        vendor.encode("utf-8"), digest_size=8, salt=salt.to_bytes(16, "big")
+    ).digest()
+
+    return int.from_bytes(digest, "big") % shard_count
+
+
+def shard_table_by_vendor(table: TransactionTable, shard_count: int) -> List[TransactionTable]:
+    """
+    Splits the table into at most `shard_count` tables so that every vendor
+    lands in exactly one shard. Rows keep their relative ingestion order.
+    Empty shards are omitted.
+    """
+
+    shard_of_vendor = [vendor_shard(vendor, shard_count) for vendor in table.vendors]
+
+    shard_rows: List[List[int]] = [[] for _ in range(shard_count)]
+
+    for row, vendor_code in enumerate(table.vendor_codes):
+        shard_rows[shard_of_vendor[vendor_code]].append(row)
+
+    return [table.take(rows) for rows in shard_rows if rows]
+
+
+def vendor_first_occurrence(table: TransactionTable) -> Dict[str, int]:
+    """
+    Rank of each vendor by first appearance, the order serial stages emit.
+    """
+    return {
+        table.vendors[vendor_code]: rank
+        for rank, vendor_code in enumerate(dict.fromkeys(table.vendor_codes))
+    }
+
+
+def analyze_shard(
+    detectors: List,
+    behavior_analyzer,
+    table: TransactionTable,
+    profile: bool = False,
+) -> Tuple[List[Tuple[Optional[List[DetectionResult]], Optional[str]]], Dict, List[Dict]]:
+    """
+    Runs every detector and the behavior analyzer over one vendor shard.
+
+    Detector failures are captured per detector as (None, message) so the
+    caller can reproduce serial error semantics; analyzer failures raise.
+    Detectors that are not vendor-local are skipped with an empty outcome;
+    the caller runs them over the whole table.
+    When `profile` is set, the shard's stage spans are returned as well.
+    """
+
+    diagnostics = EngineDiagnostics(profile=profile)
+
+    rows = len(table)
+
+    with diagnostics.span("transaction_index", rows) as span:
+        index = TransactionIndex.build(table)
+        span.output_size = len(index.vendor_rows)
+
+    outcomes = []
+
+    for detector in detectors:
+        if not detector.VENDOR_LOCAL:
+            outcomes.append(([], None))
+            continue
+
+        try:
+            with diagnostics.span(f"detector:{detector.__class__.__name__}", rows) as span:
+                results = detector.detect_index(index)
+                span.output_size = len(results)
+            outcomes.append((results, None))
+        except Exception as e:
+            outcomes.append((None, str(e)))
+
+    with diagnostics.span("behavior_analysis", rows) as span:
+        profiles = behavior_analyzer.analyze_index(index)
+        span.output_size = len(profiles)
+
+    return outcomes, profiles, diagnostics.spans
+
+
+def merge_shard_results(
+    detectors: List,
+    shard_results: List[Tuple[List, Dict, List[Dict]]],
+    vendor_rank: Dict[str, int],
+    diagnostics: EngineDiagnostics,
+) -> Tuple[List[Optional[List[DetectionResult]]], Dict]:
+    """
+    Merges `analyze_shard` results in serial order: detector by detector,
+    vendors by `vendor_rank` (first occurrence). A detector failing on any
+    shard is dropped entirely, as it would be in a serial run. Results of
+    detectors that are not vendor-local keep their own order.
+    """
+
+    detector_results = []
+
+    for position, detector in enumerate(detectors):
+        outcomes = [detector_outcomes[position] for detector_outcomes, _, _ in shard_results]
+
+        error = next((message for _, message in outcomes if message is not None), None)
+
+        if error is not None:
+            diagnostics.add_error(f"{detector.__class__.__name__} failed: {error}")
+            detector_results.append(None)
+            continue
+
+        results = [detection for detections, _ in outcomes for detection in detections]
+
+        if detector.VENDOR_LOCAL:
+            results.sort(key=lambda d: vendor_rank.get(d.supporting_evidence.get("vendor"), -1))
+
+        detector_results.append(results)
+
+    vendor_behavior_profiles = {}
+
+    for _, profiles, _ in shard_results:
+        vendor_behavior_profiles.update(profiles)
+
+    vendor_behavior_profiles = dict(sorted(
+        vendor_behavior_profiles.items(),
+        key=lambda item: vendor_rank[item[0]],
+    ))
+
+    return detector_results, vendor_behavior_profiles
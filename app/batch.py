@@ -0,0 +1,38 @@
+import sys
+import argparse
+import json
+
+from app.application.batch_runner import BatchRunner, jobs_from_directory, load_manifest
+from app.reporting.result_writer import OUTPUT_FORMATS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.batch")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--manifest", help="JSON manifest of tenants, paths, timezones and engine options")
+    source.add_argument("--directory", help="Analyze every *.csv file in this directory")
+    parser.add_argument("--output-dir", required=True, help="Per-tenant results and batch_report.json")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (reused across files)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="compact")
+    parser.add_argument("--timezone", default="UTC", help="Timezone for --directory ledgers")
+    args = parser.parse_args(argv)
+
+    if args.manifest:
+        jobs = load_manifest(args.manifest)
+    else:
+        jobs = jobs_from_directory(args.directory, args.timezone)
+
+    runner = BatchRunner(args.output_dir, workers=args.workers, output_format=args.format)
+    report = runner.run(jobs)
+
+    print(json.dumps(
+        {key: value for key, value in report.items() if key != "results"},
+        indent=2,
+    ))
+
+    if report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,131 @@
 import sys
-import json
-from decimal import Decimal
+import argparse
 
-from app.ingestion.csv_loader import load_csv
+from app.ingestion.csv_loader import load_csv_table
+from app.ingestion.snapshot import is_snapshot, open_snapshot, write_snapshot
+from app.domain.detection.duplicate_detector import MODES as DUPLICATE_MODES
+from app.domain.detection.anomaly_detector import AnomalyDetector
+from app.domain.detection.near_duplicate_detector import NearDuplicateDetector
+from app.domain.detection.recurring_detector import MODES as RECURRING_MODES
+from app.domain.detection.price_drift_detector import PriceDriftDetector
+from app.domain.normalization.vendor_resolver import VendorResolver
 from app.application.engine import VendorLeakEngine
+from app.application.out_of_core import OutOfCoreVendorLeakEngine
+from app.reporting.result_writer import OUTPUT_FORMATS, write_result
 
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python -m app.cli <path_to_csv>")
-        sys.exit(1)
+OUTPUT_BUFFER_SIZE = 1024 * 1024
 
-    file_path = sys.argv[1]
 
-    transactions = load_csv(file_path)
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    parser.add_argument("file_path", help="Path to the transactions CSV or a snapshot")
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="pretty",
+        help="pretty (indented JSON), compact (single-line JSON) or ndjson (one record per line)",
+    )
+    parser.add_argument("--output", default=None, help="Write to this file instead of stdout")
+    parser.add_argument("--parse-workers", type=int, default=1, help="Processes used to parse the CSV")
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=None,
+        help="Stream the CSV through vendor partitions spilled to disk, keeping working memory near this budget",
+    )
+    parser.add_argument(
+        "--write-snapshot",
+        default=None,
+        help="Also save the parsed dataset as a snapshot for fast re-runs",
+    )
+    parser.add_argument(
+        "--duplicate-mode",
+        choices=DUPLICATE_MODES,
+        default="pairwise",
+        help="pairwise (one detection per linked pair) or clustered (one per duplicate cluster)",
+    )
+    parser.add_argument(
+        "--recurring-mode",
+        choices=RECURRING_MODES,
+        default="consistent",
+        help="consistent (whole amount group on one interval) or histogram (period sub-series, gaps tolerated)",
+    )
+    parser.add_argument(
+        "--near-duplicates",
+        action="store_true",
+        help="Also flag near-duplicates (amount tolerance, similar vendor names)",
+    )
+    parser.add_argument(
+        "--price-drift",
+        action="store_true",
+        help="Also flag sustained upward price drift per vendor and category",
+    )
+    parser.add_argument(
+        "--anomalies",
+        action="store_true",
+        help="Also flag amount and timing outliers against each vendor's robust distribution",
+    )
+    parser.add_argument(
+        "--resolve-vendors",
+        action="store_true",
+        help="Merge near-identical vendor names into canonical vendors before detection",
+    )
+    args = parser.parse_args(argv)
 
-    engine = VendorLeakEngine()
+    extra_detectors = []
 
-    results = engine.run(transactions)
+    if args.near_duplicates:
+        extra_detectors.append(NearDuplicateDetector())
 
-    # Convert Decimal objects to string for JSON serialization
-    def decimal_serializer(obj):
-        if isinstance(obj, Decimal):
-            return str(obj)
-        raise TypeError
+    if args.price_drift:
+        extra_detectors.append(PriceDriftDetector())
 
-    print(json.dumps(results, default=decimal_serializer, indent=2))
+    if args.anomalies:
+        extra_detectors.append(AnomalyDetector())
+
+    engine = VendorLeakEngine(
+        duplicate_mode=args.duplicate_mode,
+        recurring_mode=args.recurring_mode,
+        extra_detectors=extra_detectors,
+        vendor_resolver=VendorResolver() if args.resolve_vendors else None,
+    )
+
+    if args.memory_budget_mb is not None:
+        if is_snapshot(args.file_path) or args.write_snapshot:
+            parser.error("--memory-budget-mb reads CSV input only and cannot be combined with snapshots")
+
+        try:
+            out_of_core = OutOfCoreVendorLeakEngine(
+                engine, memory_budget_bytes=args.memory_budget_mb * 1024 ** 2
+            )
+        except ValueError as exc:
+            parser.error(f"--memory-budget-mb: {exc}")
+
+        _write(out_of_core.run_csv(args.file_path), args)
+        return
+
+    if is_snapshot(args.file_path):
+        snapshot = open_snapshot(args.file_path)
+        table, dataset_hash = snapshot.table, snapshot.dataset_hash
+    else:
+        table = load_csv_table(args.file_path, workers=args.parse_workers)
+        dataset_hash = None
+
+    if args.write_snapshot:
+        dataset_hash = write_snapshot(table, args.write_snapshot, dataset_hash)
+
+    _write(engine.run_table(table, dataset_hash), args)
+
+
+def _write(results, args):
+
+    if args.output is None:
+        write_result(results, sys.stdout, args.format)
+        return
+
+    with open(args.output, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE) as handle:
+        write_result(results, handle, args.format)
 
 
 if __name__ == "__main__":
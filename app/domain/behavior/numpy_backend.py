@@ -0,0 +1,216 @@
+from decimal import Decimal
+from itertools import chain
+from typing import List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.models.transaction_table import MICROSECONDS_PER_DAY
+
+
+# Documented agreement with the Decimal reference for the float-based
+# metrics (amount volatility, interval stability): relative 1e-9, or
+# absolute 1e-12 for values near zero. Counts and count ratios are exact.
+RELATIVE_TOLERANCE = 1e-9
+ABSOLUTE_TOLERANCE = 1e-12
+
+_INT64_MAX = 2 ** 63 - 1
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def vendor_metrics(index: TransactionIndex) -> List[Tuple[int, int, Decimal, Decimal, Decimal, Decimal]]:
+    """
+    Computes, for every vendor of `index` at once, (vendor code, count,
+    volatility, interval stability, duplicate density, recurring ratio).
+
+    Rows are laid out vendor by vendor in date order (the index's
+    vendor_rows), so each metric is a segment-wise reduction over one
+    array, keyed by the vendor start offsets.
+    """
+
+    table = index.table
+    vendor_codes = list(index.vendor_rows)
+
+    if not vendor_codes:
+        return []
+
+    counts = np.fromiter(
+        (len(rows) for rows in index.vendor_rows.values()),
+        dtype=np.int64,
+        count=len(vendor_codes),
+    )
+    starts = np.zeros(len(counts), dtype=np.int64)
+    np.cumsum(counts[:-1], out=starts[1:])
+
+    order = np.fromiter(
+        chain.from_iterable(index.vendor_rows.values()),
+        dtype=np.int64,
+        count=int(counts.sum()),
+    )
+
+    segment = np.repeat(np.arange(len(counts)), counts)
+
+    currency_codes = np.asarray(table.currency_codes, dtype=np.int64)[order]
+    minor = _minor_column(table)[order]
+
+    # Amount volatility: sample standard deviation per vendor (two-pass).
+    # Amounts are shifted by each vendor's first amount in exact integer
+    # minor units before going to float, so large amounts with small
+    # spreads keep their precision.
+    amounts = _vendor_offsets(table, order, starts, segment, currency_codes, minor)
+
+    means = np.add.reduceat(amounts, starts) / counts
+    deviations = amounts - means[segment]
+    squares = np.add.reduceat(deviations * deviations, starts)
+
+    volatility = np.zeros(len(counts))
+    multi = counts > 1
+    volatility[multi] = np.sqrt(squares[multi] / (counts[multi] - 1))
+
+    # Intervals in whole days; the first row of each vendor has none
+    timestamps = np.asarray(table.timestamps, dtype=np.int64)[order]
+
+    days = np.empty(len(order), dtype=np.int64)
+    days[0] = 0
+    np.floor_divide(np.diff(timestamps), MICROSECONDS_PER_DAY, out=days[1:])
+    days[starts] = 0
+
+    has_interval = np.ones(len(order), dtype=bool)
+    has_interval[starts] = False
+
+    interval_counts = counts - 1
+
+    interval_sums = np.add.reduceat(days, starts)
+    interval_means = np.divide(
+        interval_sums, interval_counts,
+        out=np.zeros(len(counts)), where=interval_counts > 0,
+    )
+    interval_deviations = np.where(has_interval, days - interval_means[segment], 0.0)
+    interval_squares = np.add.reduceat(interval_deviations * interval_deviations, starts)
+
+    stability = np.ones(len(counts))
+    stable = interval_counts > 1
+    stability[stable] = 1.0 / (1.0 + interval_squares[stable] / (interval_counts[stable] - 1))
+
+    monthly_like = np.add.reduceat(
+        (has_interval & (np.abs(days - 30) <= 5)).astype(np.int64), starts
+    )
+
+    unique_counts = _unique_amount_counts(index, table, segment, currency_codes, minor)
+
+    results = []
+
+    for position, vendor_code in enumerate(vendor_codes):
+        count = int(counts[position])
+        intervals = count - 1
+
+        results.append((
+            vendor_code,
+            count,
+            Decimal(repr(float(volatility[position]))) if count > 1 else Decimal("0"),
+            Decimal(repr(float(stability[position]))) if intervals > 1 else Decimal("1"),
+            Decimal("1") - (Decimal(int(unique_counts[position])) / Decimal(count)),
+            Decimal(int(monthly_like[position])) / Decimal(intervals) if intervals else Decimal("0"),
+        ))
+
+    return results
+
+
+def _minor_column(table) -> "np.ndarray":
+    try:
+        return np.asarray(table.amount_minor, dtype=np.int64)
+    except OverflowError:
+        return np.asarray([float(value) for value in table.amount_minor])
+
+
+def _normalized_minor(table, currency_codes, minor):
+    """
+    Amounts as int64 integers at the widest currency scale, or None when
+    that would overflow int64.
+    """
+
+    scales = table.currency_scales
+    widest = max(scales, default=0)
+    factors = [10 ** (widest - scale) for scale in scales]
+
+    if minor.dtype != np.int64 or not len(minor):
+        return None
+
+    if int(np.abs(minor).max()) * max(factors) > _INT64_MAX:
+        return None
+
+    return minor * np.asarray(factors, dtype=np.int64)[currency_codes]
+
+
+def _vendor_offsets(table, order, starts, segment, currency_codes, minor) -> "np.ndarray":
+    """
+    Each amount minus its vendor's first amount, in major units. The
+    subtraction is exact (int64, or Python ints when int64 would
+    overflow); only the offsets are rounded to float.
+    """
+
+    widest = max(table.currency_scales, default=0)
+    normalized = _normalized_minor(table, currency_codes, minor)
+
+    if normalized is not None and int(np.abs(normalized).max()) <= _INT64_MAX // 2:
+        offsets = normalized - normalized[starts][segment]
+        return offsets.astype(np.float64) / 10.0 ** widest
+
+    scales = table.currency_scales
+    amount_minor = table.amount_minor
+    codes = table.currency_codes
+
+    values = [
+        amount_minor[row] * 10 ** (widest - scales[codes[row]])
+        for row in order.tolist()
+    ]
+    references = [values[start] for start in starts.tolist()]
+
+    return np.asarray(
+        [value - references[vendor] for value, vendor in zip(values, segment.tolist())],
+        dtype=np.float64,
+    ) / 10.0 ** widest
+
+
+def _unique_amount_counts(index, table, segment, currency_codes, minor) -> "np.ndarray":
+    """
+    Distinct amount values per vendor, exact: amounts are compared as
+    integers at the widest currency scale. Falls back to the index's
+    amount groups when that would overflow int64.
+    """
+
+    scales = table.currency_scales
+    widest = max(scales, default=0)
+    factors = [10 ** (widest - scale) for scale in scales]
+
+    normalized = _normalized_minor(table, currency_codes, minor)
+
+    if normalized is not None:
+        ordering = np.lexsort((normalized, segment))
+
+        sorted_segment = segment[ordering]
+        sorted_values = normalized[ordering]
+
+        new_value = np.ones(len(ordering), dtype=bool)
+        new_value[1:] = (sorted_segment[1:] != sorted_segment[:-1]) | (
+            sorted_values[1:] != sorted_values[:-1]
+        )
+
+        return np.bincount(sorted_segment[new_value], minlength=len(index.vendor_rows))
+
+    counts = []
+
+    for currency_groups in index.groups.values():
+        distinct = set()
+        for currency_code, amount_groups in currency_groups.items():
+            factor = factors[currency_code]
+            distinct.update(value * factor for value in amount_groups)
+        counts.append(len(distinct))
+
+    return np.asarray(counts, dtype=np.int64)
@@ -1,42 +1,105 @@
 from decimal import Decimal, getcontext
-from typing import List, Dict
-from collections import defaultdict
+from typing import List, Dict, Optional
 
 from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable, MICROSECONDS_PER_DAY
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.utils.fixed_point import fixed_point_sum
+from app.domain.behavior import numpy_backend
+
+
+BACKENDS = ("decimal", "numpy")
 
 
 class VendorBehaviorAnalyzer:
 
     VERSION = "1.2.0"
 
+    def __init__(self, backend: str = "decimal"):
+        """
+        `backend` selects the implementation:
+        - "decimal": reference, exact Decimal arithmetic per vendor
+        - "numpy": all vendors at once over columnar arrays; counts and
+          count ratios are exact, volatility and interval stability match
+          the reference within numpy_backend.RELATIVE_TOLERANCE
+          (ABSOLUTE_TOLERANCE near zero)
+        """
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported behavior backend '{backend}'.")
+
+        if backend == "numpy" and not numpy_backend.numpy_available():
+            raise ImportError("The numpy behavior backend requires numpy to be installed.")
+
+        self.backend = backend
+
     def analyze(self, transactions: List[Transaction]) -> Dict:
+        return self.analyze_table(TransactionTable.from_transactions(transactions))
+
+    def analyze_table(self, table: TransactionTable) -> Dict:
+        return self.analyze_index(TransactionIndex.build(table))
+
+    def analyze_index(self, index: TransactionIndex) -> Dict:
+
+        if self.backend == "numpy":
+            return self._analyze_index_numpy(index)
 
-        vendor_groups = defaultdict(list)
+        table = index.table
+        timestamps = table.timestamps
+        exponents = table.amount_exponents
+        scales = table.currency_scales
 
-        for tx in transactions:
-            vendor_groups[tx.vendor_normalized_name].append(tx)
+        decimal_amounts: Dict[tuple, Decimal] = {}
 
         vendor_profiles = {}
 
-        for vendor, tx_list in vendor_groups.items():
-            tx_list.sort(key=lambda t: t.date)
+        for vendor_code, rows in index.vendor_rows.items():
 
-            amounts = [tx.amount for tx in tx_list]
-            dates = [tx.date for tx in tx_list]
+            currency_groups = index.groups[vendor_code]
+
+            # Fixed-point aggregates over the vendor's amount groups
+            common_scale = max(scales[currency_code] for currency_code in currency_groups)
+
+            minor_total = 0
+            minor_abs_total = 0
+            distinct_amounts = set()
+
+            for currency_code, amount_groups in currency_groups.items():
+                factor = 10 ** (common_scale - scales[currency_code])
+
+                for minor, amount_rows in amount_groups.items():
+                    normalized = minor * factor
+                    minor_total += normalized * len(amount_rows)
+                    minor_abs_total += abs(normalized) * len(amount_rows)
+                    distinct_amounts.add(normalized)
+
+            amount_total = fixed_point_sum(
+                minor_total,
+                minor_abs_total,
+                common_scale,
+                min(map(exponents.__getitem__, rows)),
+            )
+
+            amounts = [
+                _cached_amount(table, row, decimal_amounts)
+                for row in rows
+            ] if len(rows) > 1 else []
 
             interval_days = [
-                (dates[i + 1] - dates[i]).days
-                for i in range(len(dates) - 1)
+                (timestamps[rows[i + 1]] - timestamps[rows[i]]) // MICROSECONDS_PER_DAY
+                for i in range(len(rows) - 1)
             ]
 
-            volatility_score = self._compute_decimal_volatility(amounts)
+            volatility_score = self._compute_decimal_volatility(amounts, amount_total)
             interval_stability = self._compute_interval_stability(interval_days)
-            duplicate_density = self._compute_duplicate_density(amounts)
+            duplicate_density = self._compute_duplicate_density_from_counts(
+                len(distinct_amounts), len(rows)
+            )
             recurring_ratio = self._compute_recurring_ratio(interval_days)
 
-            vendor_profiles[vendor] = {
+            vendor_profiles[table.vendors[vendor_code]] = {
                 "behavior_version": self.VERSION,
-                "transaction_count": len(tx_list),
+                "transaction_count": len(rows),
                 "amount_volatility_score": volatility_score,
                 "interval_stability_score": interval_stability,
                 "duplicate_density_rate": duplicate_density,
@@ -45,11 +108,42 @@ class VendorBehaviorAnalyzer:
 
         return vendor_profiles
 
-    def _compute_decimal_volatility(self, amounts: List[Decimal]) -> Decimal:
+    def _analyze_index_numpy(self, index: TransactionIndex) -> Dict:
+
+        vendors = index.table.vendors
+
+        return {
+            vendors[vendor_code]: {
+                "behavior_version": self.VERSION,
+                "transaction_count": count,
+                "amount_volatility_score": volatility_score,
+                "interval_stability_score": interval_stability,
+                "duplicate_density_rate": duplicate_density,
+                "recurring_dependency_ratio": recurring_ratio,
+            }
+            for (
+                vendor_code, count, volatility_score, interval_stability,
+                duplicate_density, recurring_ratio,
+            ) in numpy_backend.vendor_metrics(index)
+        }
+
+    def _compute_decimal_volatility(
+        self,
+        amounts: List[Decimal],
+        total: Optional[Decimal] = None,
+    ) -> Decimal:
+        """
+        `total`, when given, must equal `sum(amounts)` (e.g. from the
+        fixed-point path) and saves one Decimal pass.
+        """
+
         if len(amounts) < 2:
             return Decimal("0")
 
-        mean_val = sum(amounts) / Decimal(len(amounts))
+        if total is None:
+            total = sum(amounts)
+
+        mean_val = total / Decimal(len(amounts))
 
         variance = sum(
             (a - mean_val) ** 2 for a in amounts
@@ -73,8 +167,13 @@ class VendorBehaviorAnalyzer:
         if not amounts:
             return Decimal("0")
 
-        unique_count = len(set(amounts))
-        return Decimal("1") - (Decimal(unique_count) / Decimal(len(amounts)))
+        return self._compute_duplicate_density_from_counts(len(set(amounts)), len(amounts))
+
+    def _compute_duplicate_density_from_counts(self, unique_count: int, count: int) -> Decimal:
+        if not count:
+            return Decimal("0")
+
+        return Decimal("1") - (Decimal(unique_count) / Decimal(count))
 
     def _compute_recurring_ratio(self, intervals: List[int]) -> Decimal:
         if not intervals:
@@ -83,3 +182,24 @@ class VendorBehaviorAnalyzer:
         monthly_like = [i for i in intervals if abs(i - 30) <= 5]
 
         return Decimal(len(monthly_like)) / Decimal(len(intervals))
+
+
+def _cached_amount(table: TransactionTable, row: int, cache: Dict[tuple, Decimal]) -> Decimal:
+    """
+    Decimal amount of `row`, built once per distinct (currency, minor
+    units, exponent) so repeated amounts share one object.
+    """
+
+    minor = table.amount_minor[row]
+    key = (
+        table.currency_codes[row],
+        minor,
+        table.amount_exponents[row],
+        minor == 0 and row in table.negative_zero_rows,
+    )
+
+    amount = cache.get(key)
+    if amount is None:
+        amount = cache[key] = table.amount(row)
+
+    return amount
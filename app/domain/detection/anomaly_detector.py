@@ -0,0 +1,230 @@
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.detection.base_detector import BaseDetector
+from app.domain.detection import anomaly_numpy_backend
+from app.domain.detection.anomaly_numpy_backend import MAD_FACTOR, MEAN_AD_FACTOR, ScoredRow
+from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable, MICROSECONDS_PER_DAY
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.models.detection_result import DetectionResult
+from app.domain.enums import DetectionType, RiskSeverity
+
+
+BACKENDS = ("python", "numpy")
+
+
+class AnomalyDetector(BaseDetector):
+    """
+    Scores every charge against its vendor's robust distribution, per
+    currency: a median/MAD z-score on the amount and on the interval
+    since the vendor's previous charge. Flags amounts scoring above
+    `threshold` (overcharges) and intervals scoring below -`threshold`
+    (a charge arriving much sooner than usual). When a segment's MAD is
+    zero the mean absolute deviation is used instead.
+
+    Only positive amounts are scored, and only in segments with at least
+    `min_segment_size` charges.
+    """
+
+    VERSION = "1.0.0"
+
+    def __init__(
+        self,
+        threshold: float = 3.5,
+        min_segment_size: int = 8,
+        backend: Optional[str] = None,
+    ):
+        """
+        `backend` selects the implementation:
+        - "python": reference, one segment at a time
+        - "numpy": all segments at once over columnar arrays, with
+          identical results (integer medians, the same float operations)
+        - None: numpy when installed, otherwise python
+        """
+
+        if threshold <= 0:
+            raise ValueError("threshold must be positive.")
+
+        if min_segment_size < 3:
+            raise ValueError("min_segment_size must be at least 3.")
+
+        if backend is None:
+            backend = "numpy" if anomaly_numpy_backend.numpy_available() else "python"
+
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported anomaly backend '{backend}'.")
+
+        if backend == "numpy" and not anomaly_numpy_backend.numpy_available():
+            raise ImportError("The numpy anomaly backend requires numpy to be installed.")
+
+        self.threshold = threshold
+        self.min_segment_size = min_segment_size
+        self.backend = backend
+
+    def detect(self, transactions: List[Transaction]) -> List[DetectionResult]:
+        return self.detect_table(TransactionTable.from_transactions(transactions))
+
+    def detect_table(self, table: TransactionTable) -> List[DetectionResult]:
+        return self.detect_index(TransactionIndex.build(table))
+
+    def detect_index(self, index: TransactionIndex) -> List[DetectionResult]:
+
+        scored = None
+
+        if self.backend == "numpy":
+            scored = anomaly_numpy_backend.flagged_rows(
+                index, self.threshold, self.min_segment_size
+            )
+
+        if scored is None:
+            scored = self._flagged_rows(index)
+
+        return [self._detection(index.table, *entry) for entry in scored]
+
+    def _flagged_rows(self, index: TransactionIndex) -> List[ScoredRow]:
+        """
+        Reference implementation of anomaly_numpy_backend.flagged_rows.
+        """
+
+        table = index.table
+        amount_minor = table.amount_minor
+        currency_codes = table.currency_codes
+        timestamps = table.timestamps
+
+        flagged: List[ScoredRow] = []
+
+        for rows in index.vendor_rows.values():
+
+            segments: Dict[int, List[int]] = {}
+
+            for row in rows:
+                if amount_minor[row] > 0:
+                    segments.setdefault(currency_codes[row], []).append(row)
+
+            for currency_code in sorted(segments):
+                segment = segments[currency_code]
+
+                if len(segment) < self.min_segment_size:
+                    continue
+
+                amount_median, amount_scores = _robust_scores(
+                    [amount_minor[row] for row in segment]
+                )
+
+                intervals = [
+                    timestamps[row] - timestamps[previous]
+                    for previous, row in zip(segment, segment[1:])
+                ]
+                interval_median, interval_scores = _robust_scores(intervals)
+
+                for position, row in enumerate(segment):
+                    amount_score = amount_scores[position]
+
+                    if position:
+                        interval = intervals[position - 1]
+                        interval_score = interval_scores[position - 1]
+                    else:
+                        interval = interval_score = None
+
+                    if amount_score > self.threshold or (
+                        interval_score is not None and interval_score < -self.threshold
+                    ):
+                        flagged.append((
+                            row,
+                            amount_median,
+                            amount_score,
+                            interval,
+                            interval_median if position else None,
+                            interval_score,
+                        ))
+
+        return flagged
+
+    def _detection(
+        self,
+        table: TransactionTable,
+        row: int,
+        amount_median: int,
+        amount_score: float,
+        interval: Optional[int],
+        interval_median: Optional[int],
+        interval_score: Optional[float],
+    ) -> DetectionResult:
+
+        amount = table.amount(row)
+        median = Decimal(amount_median).scaleb(-table.currency_scales[table.currency_codes[row]]) / 2
+
+        amount_outlier = amount_score > self.threshold
+        interval_outlier = interval_score is not None and interval_score < -self.threshold
+
+        if amount_outlier and interval_outlier:
+            rule = "robust_amount_and_interval_outlier"
+        elif amount_outlier:
+            rule = "robust_amount_outlier"
+        else:
+            rule = "robust_interval_outlier"
+
+        # Overcharges cost the excess over the typical amount; an early
+        # charge at a typical amount may be an extra charge altogether
+        impact = amount - median if amount_outlier else amount
+
+        evidence = {
+            "vendor": table.vendor(row),
+            "amount": str(amount),
+            "median_amount": str(median),
+            "amount_score": round(amount_score, 4),
+            "threshold": self.threshold,
+            "detector_class": self.__class__.__name__,
+            "detector_version": self.VERSION,
+        }
+
+        if interval is not None:
+            evidence["interval_days"] = round(interval / MICROSECONDS_PER_DAY, 4)
+            evidence["median_interval_days"] = round(interval_median / 2 / MICROSECONDS_PER_DAY, 4)
+            evidence["interval_score"] = round(interval_score, 4)
+
+        return DetectionResult.create(
+            detection_type=DetectionType.ANOMALY,
+            related_transaction_ids=[table.transaction_ids[row]],
+            rule_triggered=rule,
+            supporting_evidence=evidence,
+            financial_impact_estimate=impact,
+            confidence_score=0.75 if amount_outlier and interval_outlier else 0.6,
+            risk_severity=self._determine_severity(impact),
+            currency=table.currency(row),
+        )
+
+    def _determine_severity(self, impact: Decimal) -> RiskSeverity:
+        if impact >= Decimal("10000"):
+            return RiskSeverity.HIGH
+        elif impact >= Decimal("1000"):
+            return RiskSeverity.MEDIUM
+        return RiskSeverity.LOW
+
+
+def _robust_scores(values: List[int]) -> Tuple[int, List[float]]:
+    """
+    Doubled median and robust z-score per value, with the float operations
+    of anomaly_numpy_backend so both backends agree exactly.
+    """
+
+    count = len(values)
+    low, high = (count - 1) // 2, count // 2
+
+    ordered = sorted(values)
+    median = ordered[low] + ordered[high]
+
+    deviations = [2 * value - median for value in values]
+    absolute = sorted(abs(deviation) for deviation in deviations)
+
+    mad = absolute[low] + absolute[high]
+    mean_scale = MEAN_AD_FACTOR * float(sum(absolute))
+
+    if mad:
+        return median, [MAD_FACTOR * deviation / mad for deviation in deviations]
+
+    if mean_scale:
+        return median, [float(deviation) * count / mean_scale for deviation in deviations]
+
+    return median, [0.0] * count
@@ -0,0 +1,219 @@
+from itertools import chain
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from app.domain.indexing.transaction_index import TransactionIndex
+
+
+# Robust z-score constants (Iglewicz and Hoaglin). Scores are computed from
+# doubled integer medians so that both backends perform the same float
+# operations and agree bit for bit:
+#   MAD > 0:      z = MAD_FACTOR * (2x - 2median) / (4 MAD)
+#   MAD == 0:     z = (2x - 2median) * n / (MEAN_AD_FACTOR * 2 sum|x - median|)
+MAD_FACTOR = 1.349
+MEAN_AD_FACTOR = 1.253314
+
+# Integer intermediates must stay below this for the vectorized path
+_SAFE_LIMIT = float(2 ** 62)
+
+# (row, doubled amount median, amount score,
+#  interval, doubled interval median, interval score); interval fields are
+#  None for the first charge of a segment
+ScoredRow = Tuple[int, int, float, Optional[int], Optional[int], Optional[float]]
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+def flagged_rows(
+    index: TransactionIndex,
+    threshold: float,
+    min_segment_size: int,
+) -> Optional[List[ScoredRow]]:
+    """
+    Scores every positive charge against its (vendor, currency) segment
+    at once and returns the flagged rows, segment by segment (vendors in
+    index order, currencies by code) and in date order within a segment.
+
+    Rows are laid out vendor by vendor in date order (the index's
+    vendor_rows) and stably regrouped by currency; medians and MADs come
+    from one lexsort per statistic, keyed by segment start offsets.
+
+    Returns None when amounts or timestamps are too large for exact int64
+    intermediates; the caller then uses the reference implementation.
+    """
+
+    table = index.table
+
+    if not index.vendor_rows:
+        return []
+
+    counts = np.fromiter(
+        (len(rows) for rows in index.vendor_rows.values()),
+        dtype=np.int64,
+        count=len(index.vendor_rows),
+    )
+
+    order = np.fromiter(
+        chain.from_iterable(index.vendor_rows.values()),
+        dtype=np.int64,
+        count=int(counts.sum()),
+    )
+
+    try:
+        minor = np.asarray(table.amount_minor, dtype=np.int64)[order]
+    except OverflowError:
+        return None
+
+    vendor_positions = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    currency_codes = np.asarray(table.currency_codes, dtype=np.int64)[order]
+
+    positive = minor > 0
+    keys = (vendor_positions * len(table.currencies) + currency_codes)[positive]
+    ordering = np.argsort(keys, kind="stable")
+
+    keys = keys[ordering]
+    rows = order[positive][ordering]
+    values = minor[positive][ordering]
+    timestamps = np.asarray(table.timestamps, dtype=np.int64)[rows]
+
+    if not len(rows):
+        return []
+
+    # Keep only segments large enough to score
+    boundaries = np.flatnonzero(np.diff(keys)) + 1
+    starts = np.concatenate(([0], boundaries))
+    sizes = np.diff(np.append(starts, len(keys)))
+
+    eligible = np.repeat(sizes >= min_segment_size, sizes)
+
+    if not eligible.any():
+        return []
+
+    rows = rows[eligible]
+    values = values[eligible]
+    timestamps = timestamps[eligible]
+    sizes = sizes[sizes >= min_segment_size]
+
+    starts = np.zeros(len(sizes), dtype=np.int64)
+    np.cumsum(sizes[:-1], out=starts[1:])
+    segment = np.repeat(np.arange(len(sizes)), sizes)
+
+    amount_scores = _robust_scores(values, segment, starts, sizes)
+
+    if amount_scores is None:
+        return None
+
+    amount_medians, amount_z = amount_scores
+
+    # Inter-arrival: every row but the first of its segment has a gap
+    has_interval = np.ones(len(rows), dtype=bool)
+    has_interval[starts] = False
+
+    intervals = np.zeros(len(rows), dtype=np.int64)
+    intervals[1:] = np.diff(timestamps)
+
+    interval_sizes = sizes - 1
+    interval_starts = starts - np.arange(len(sizes))
+
+    interval_scores = _robust_scores(
+        intervals[has_interval], segment[has_interval], interval_starts, interval_sizes
+    )
+
+    if interval_scores is None:
+        return None
+
+    interval_medians, interval_partial = interval_scores
+
+    interval_z = np.zeros(len(rows))
+    interval_z[has_interval] = interval_partial
+
+    flagged = (amount_z > threshold) | (has_interval & (interval_z < -threshold))
+
+    positions = np.flatnonzero(flagged)
+    flagged_segments = segment[positions]
+    with_interval = has_interval[positions]
+
+    return list(zip(
+        rows[positions].tolist(),
+        amount_medians[flagged_segments].tolist(),
+        amount_z[positions].tolist(),
+        _or_none(intervals[positions], with_interval),
+        _or_none(interval_medians[flagged_segments], with_interval),
+        _or_none(interval_z[positions], with_interval),
+    ))
+
+
+def _robust_scores(
+    values: "np.ndarray",
+    segment: "np.ndarray",
+    starts: "np.ndarray",
+    sizes: "np.ndarray",
+) -> Optional[Tuple["np.ndarray", "np.ndarray"]]:
+    """
+    Doubled median per segment and robust z-score per value, or None if
+    the integer intermediates could overflow.
+    """
+
+    if float(np.abs(values).max()) * 4.0 >= _SAFE_LIMIT:
+        return None
+
+    low = starts + (sizes - 1) // 2
+    high = starts + sizes // 2
+
+    ordered = _sorted_within(values, segment)
+    medians = ordered[low] + ordered[high]
+
+    deviations = 2 * values - medians[segment]
+    absolute = np.abs(deviations)
+
+    if float(np.add.reduceat(absolute.astype(np.float64), starts).max()) >= _SAFE_LIMIT:
+        return None
+
+    ordered_absolute = _sorted_within(absolute, segment)
+    mads = ordered_absolute[low] + ordered_absolute[high]
+    absolute_sums = np.add.reduceat(absolute, starts)
+
+    mad_scale = mads[segment].astype(np.float64)
+    mean_scale = MEAN_AD_FACTOR * absolute_sums[segment].astype(np.float64)
+
+    scores = np.zeros(len(values))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        by_mad = MAD_FACTOR * deviations / mad_scale
+        by_mean = deviations.astype(np.float64) * sizes[segment] / mean_scale
+
+    use_mad = mad_scale > 0
+    use_mean = ~use_mad & (mean_scale > 0)
+
+    scores[use_mad] = by_mad[use_mad]
+    scores[use_mean] = by_mean[use_mean]
+
+    return medians, scores
+
+
+def _sorted_within(values: "np.ndarray", segment: "np.ndarray") -> "np.ndarray":
+    """
+    `values` sorted within each contiguous segment. A single sort of
+    segment * span + value when that fits in int64, else a lexsort.
+    """
+
+    low = int(values.min())
+    span = int(values.max()) - low + 1
+
+    if span * len(values) < 2 ** 62:
+        return np.sort(segment * span + (values - low)) - segment * span + low
+
+    return values[np.lexsort((values, segment))]
+
+
+def _or_none(values: "np.ndarray", present: "np.ndarray") -> List:
+    """
+    `values` as Python numbers, with None where `present` is False.
+    """
+    return np.where(present, values.astype(object), None).tolist()
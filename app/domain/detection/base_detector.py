@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from typing import List
 
 from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.indexing.transaction_index import TransactionIndex
 from app.domain.models.detection_result import DetectionResult
 
 
@@ -14,14 +16,36 @@ class BaseDetector(ABC):
     - No mutation of input transactions
     - Structured DetectionResult output
     - Version traceability
+
+    Detectors are vendor-local by default: findings for one vendor depend
+    only on that vendor's transactions, so they can run per vendor shard.
+    Detectors whose findings span vendors set VENDOR_LOCAL = False.
     """
 
     VERSION = "1.0.0"
+    VENDOR_LOCAL = True
 
     @abstractmethod
     def detect(self, transactions: List[Transaction]) -> List[DetectionResult]:
         pass
 
+    def detect_table(self, table: TransactionTable) -> List[DetectionResult]:
+        """
+        Columnar entry point used by the engine.
+
+        Detectors without a columnar implementation fall back to `detect`
+        over transactions restored from the table.
+        """
+        return self.detect(table.to_transactions())
+
+    def detect_index(self, index: TransactionIndex) -> List[DetectionResult]:
+        """
+        Entry point receiving the engine's shared grouping index.
+
+        Detectors that do not use the index fall back to `detect_table`.
+        """
+        return self.detect_table(index.table)
+
     def detector_metadata(self) -> dict:
         """
         Returns structured metadata for audit traceability.
@@ -1,94 +1,189 @@
-from datetime import timedelta
 from decimal import Decimal
 from typing import List
-from collections import defaultdict
 
 from app.domain.detection.base_detector import BaseDetector
 from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable, MICROSECONDS_PER_DAY
+from app.domain.indexing.transaction_index import TransactionIndex
 from app.domain.models.detection_result import DetectionResult
 from app.domain.enums import DetectionType, RiskSeverity
 
 
+MODES = ("pairwise", "clustered")
+
+
 class DuplicateDetector(BaseDetector):
 
-    VERSION = "1.4.0"
+    VERSION = "1.5.0"
+
+    def __init__(
+        self,
+        time_window_days: int = 7,
+        min_amount: Decimal = Decimal("0.00"),
+        mode: str = "pairwise",
+    ):
+        """
+        `mode` selects how linked transactions are reported:
+
+        - pairwise (default): one detection per transaction that has an
+          earlier same-amount transaction within the window
+        - clustered: one detection per duplicate cluster, i.e. per connected
+          component of transactions linked through the window, listing
+          every member and the excess amount (all copies but one)
+        """
+
+        if mode not in MODES:
+            raise ValueError(f"Unsupported duplicate mode '{mode}'.")
 
-    def __init__(self, time_window_days: int = 7, min_amount: Decimal = Decimal("0.00")):
         self.time_window_days = time_window_days
         self.min_amount = min_amount
+        self.mode = mode
 
     def detect(self, transactions: List[Transaction]) -> List[DetectionResult]:
+        return self.detect_table(TransactionTable.from_transactions(transactions))
+
+    def detect_table(self, table: TransactionTable) -> List[DetectionResult]:
+        return self.detect_index(TransactionIndex.build(table))
+
+    def detect_index(self, index: TransactionIndex) -> List[DetectionResult]:
 
         results: List[DetectionResult] = []
 
-        # Primary grouping by vendor + currency
-        vendor_currency_groups = defaultdict(list)
+        table = index.table
+        timestamps = table.timestamps
+        window = self.time_window_days * MICROSECONDS_PER_DAY
 
-        for tx in transactions:
-            if tx.amount < self.min_amount:
-                continue
-            key = (tx.vendor_normalized_name, tx.currency)
-            vendor_currency_groups[key].append(tx)
+        min_minor = [
+            self.min_amount.scaleb(scale) for scale in table.currency_scales
+        ]
 
-        for (vendor, currency), tx_list in vendor_currency_groups.items():
+        # Index is pre-grouped by vendor + currency + amount, rows in date order
+        for vendor_code, currency_groups in index.groups.items():
 
-            # Secondary grouping by amount
-            amount_groups = defaultdict(list)
+            vendor = table.vendors[vendor_code]
 
-            for tx in tx_list:
-                amount_groups[tx.amount].append(tx)
+            for currency_code, amount_groups in currency_groups.items():
 
-            for amount, amount_list in amount_groups.items():
+                currency = table.currencies[currency_code]
 
-                if len(amount_list) < 2:
-                    continue
+                for minor, amount_rows in amount_groups.items():
 
-                amount_list.sort(key=lambda t: t.date)
+                    if len(amount_rows) < 2 or minor < min_minor[currency_code]:
+                        continue
 
-                # 🔒 Installment suppression logic
-                if self._is_structured_installment(amount_list):
-                    continue
+                    # 🔒 Installment suppression logic
+                    if self._is_structured_installment(
+                        [timestamps[row] for row in amount_rows]
+                    ):
+                        continue
+
+                    amount = table.amount(min(amount_rows))
+
+                    if self.mode == "clustered":
+                        results.extend(self._cluster_detections(
+                            table, amount_rows, window, vendor, currency, amount
+                        ))
+                        continue
+
+                    window_start = 0
+
+                    for window_end in range(1, len(amount_rows)):
+
+                        while (
+                            timestamps[amount_rows[window_end]]
+                            - timestamps[amount_rows[window_start]]
+                            > window
+                        ):
+                            window_start += 1
+
+                        if window_start != window_end:
+                            current = amount_rows[window_start]
+                            candidate = amount_rows[window_end]
+
+                            result = DetectionResult.create(
+                                detection_type=DetectionType.DUPLICATE,
+                                related_transaction_ids=[
+                                    table.transaction_ids[current],
+                                    table.transaction_ids[candidate],
+                                ],
+                                rule_triggered="indexed_vendor_currency_amount_window",
+                                supporting_evidence={
+                                    "vendor": vendor,
+                                    "amount": str(amount),
+                                    "time_window_days": self.time_window_days,
+                                    "installment_suppressed": False,
+                                    "detector_class": self.__class__.__name__,
+                                    "detector_version": self.VERSION,
+                                },
+                                financial_impact_estimate=amount,
+                                confidence_score=0.85,
+                                risk_severity=self._determine_severity(amount),
+                                currency=currency,
+                            )
+
+                            results.append(result)
 
-                window_start = 0
+        return results
 
-                for window_end in range(1, len(amount_list)):
+    def _cluster_detections(
+        self,
+        table: TransactionTable,
+        amount_rows: List[int],
+        window: int,
+        vendor: str,
+        currency: str,
+        amount: Decimal,
+    ) -> List[DetectionResult]:
+        """
+        Rows are in date order, so two rows are connected exactly when every
+        consecutive gap between them is within the window: the connected
+        components are the maximal runs of such gaps, found in one sweep.
+        """
 
-                    while (
-                        amount_list[window_end].date - amount_list[window_start].date
-                        > timedelta(days=self.time_window_days)
-                    ):
-                        window_start += 1
-
-                    if window_start != window_end:
-                        current = amount_list[window_start]
-                        candidate = amount_list[window_end]
-
-                        result = DetectionResult.create(
-                            detection_type=DetectionType.DUPLICATE,
-                            related_transaction_ids=[
-                                current.transaction_id,
-                                candidate.transaction_id,
-                            ],
-                            rule_triggered="indexed_vendor_currency_amount_window",
-                            supporting_evidence={
-                                "vendor": vendor,
-                                "amount": str(amount),
-                                "time_window_days": self.time_window_days,
-                                "installment_suppressed": False,
-                                "detector_class": self.__class__.__name__,
-                                "detector_version": self.VERSION,
-                            },
-                            financial_impact_estimate=amount,
-                            confidence_score=0.85,
-                            risk_severity=self._determine_severity(amount),
-                            currency=currency,
-                        )
-
-                        results.append(result)
+        timestamps = table.timestamps
+        results: List[DetectionResult] = []
+
+        cluster_start = 0
+
+        for position in range(1, len(amount_rows) + 1):
+
+            if (
+                position < len(amount_rows)
+                and timestamps[amount_rows[position]] - timestamps[amount_rows[position - 1]] <= window
+            ):
+                continue
+
+            members = amount_rows[cluster_start:position]
+            cluster_start = position
+
+            if len(members) < 2:
+                continue
+
+            excess = amount * (len(members) - 1)
+
+            results.append(DetectionResult.create(
+                detection_type=DetectionType.DUPLICATE,
+                related_transaction_ids=[table.transaction_ids[row] for row in members],
+                rule_triggered="indexed_vendor_currency_amount_cluster",
+                supporting_evidence={
+                    "vendor": vendor,
+                    "amount": str(amount),
+                    "cluster_size": len(members),
+                    "excess_amount": str(excess),
+                    "time_window_days": self.time_window_days,
+                    "installment_suppressed": False,
+                    "detector_class": self.__class__.__name__,
+                    "detector_version": self.VERSION,
+                },
+                financial_impact_estimate=excess,
+                confidence_score=0.85,
+                risk_severity=self._determine_severity(excess),
+                currency=currency,
+            ))
 
         return results
 
-    def _is_structured_installment(self, tx_list: List[Transaction]) -> bool:
+    def _is_structured_installment(self, timestamps: List[int]) -> bool:
         """
         Detect structured installment payments to avoid false duplicate flags.
 
@@ -98,12 +193,12 @@ class DuplicateDetector(BaseDetector):
         - Stable amount (already grouped)
         """
 
-        if len(tx_list) < 3:
+        if len(timestamps) < 3:
             return False
 
         intervals = [
-            (tx_list[i + 1].date - tx_list[i].date).days
-            for i in range(len(tx_list) - 1)
+            (timestamps[i + 1] - timestamps[i]) // MICROSECONDS_PER_DAY
+            for i in range(len(timestamps) - 1)
         ]
 
         if not intervals:
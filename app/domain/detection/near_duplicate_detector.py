@@ -0,0 +1,270 @@
+import heapq
+from bisect import bisect_left, insort
+from collections import deque
+from decimal import Decimal, ROUND_FLOOR
+from typing import List, Optional, Tuple
+
+from app.domain.detection.base_detector import BaseDetector
+from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable, MICROSECONDS_PER_DAY
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.models.detection_result import DetectionResult
+from app.domain.normalization.vendor_similarity import MinHashBlocker, VendorSimilarityIndex
+from app.domain.enums import DetectionType, RiskSeverity
+
+
+class NearDuplicateDetector(BaseDetector):
+    """
+    Flags charges that nearly repeat an earlier one: same currency, within
+    the time window, amounts within `amount_tolerance` (relative) and
+    vendors whose canonical names match or are similar (n-gram Jaccard of
+    at least `vendor_similarity`). Exact repeats at the same vendor are
+    left to DuplicateDetector.
+
+    - Vendors are blocked by MinHash over `VendorNormalizer.normalize`
+      output, so only vendors in the same block are ever compared.
+    - Within a block and currency, rows are swept in date order while an
+      amount-sorted list holds the rows of the current window. Each row
+      queries it with bisect for the tolerance range and reports its
+      closest earlier match, so work per row is logarithmic plus the
+      candidates in range (capped by `max_candidates`).
+
+    Not vendor-local: findings can span vendors, so the engine runs it on
+    the whole table rather than per vendor shard.
+    """
+
+    VERSION = "1.0.0"
+    VENDOR_LOCAL = False
+
+    def __init__(
+        self,
+        time_window_days: int = 7,
+        amount_tolerance: Decimal = Decimal("0.005"),
+        vendor_similarity: float = 0.7,
+        min_amount: Decimal = Decimal("0.00"),
+        max_candidates: int = 64,
+        minhash_permutations: int = 32,
+        minhash_bands: int = 8,
+    ):
+        if amount_tolerance < 0:
+            raise ValueError("amount_tolerance must not be negative.")
+
+        if not 0 < vendor_similarity <= 1:
+            raise ValueError("vendor_similarity must be in (0, 1].")
+
+        self.time_window_days = time_window_days
+        self.amount_tolerance = amount_tolerance
+        self.vendor_similarity = vendor_similarity
+        self.min_amount = min_amount
+        self.max_candidates = max_candidates
+        self.minhash_permutations = minhash_permutations
+        self.minhash_bands = minhash_bands
+
+    def detect(self, transactions: List[Transaction]) -> List[DetectionResult]:
+        return self.detect_table(TransactionTable.from_transactions(transactions))
+
+    def detect_table(self, table: TransactionTable) -> List[DetectionResult]:
+        return self.detect_index(TransactionIndex.build(table))
+
+    def detect_index(self, index: TransactionIndex) -> List[DetectionResult]:
+
+        results: List[DetectionResult] = []
+
+        table = index.table
+        window = self.time_window_days * MICROSECONDS_PER_DAY
+
+        similarity = VendorSimilarityIndex(
+            table.vendors,
+            self.vendor_similarity,
+            MinHashBlocker(self.minhash_permutations, self.minhash_bands),
+        )
+
+        min_minor = [
+            self.min_amount.scaleb(scale) for scale in table.currency_scales
+        ]
+
+        for block in similarity.blocks():
+
+            vendor_codes = [code for code in block if code in index.vendor_rows]
+
+            for currency_code in self._block_currencies(index, vendor_codes):
+
+                rows = self._block_rows(index, vendor_codes, currency_code)
+
+                for candidate, row in self._sweep(
+                    table, rows, window, min_minor[currency_code], similarity
+                ):
+                    results.append(self._detection(table, candidate, row, similarity))
+
+        return results
+
+    def _block_currencies(self, index: TransactionIndex, vendor_codes: List[int]) -> List[int]:
+        return list(dict.fromkeys(
+            currency_code
+            for vendor_code in vendor_codes
+            for currency_code in index.groups[vendor_code]
+        ))
+
+    def _block_rows(
+        self,
+        index: TransactionIndex,
+        vendor_codes: List[int],
+        currency_code: int,
+    ) -> List[int]:
+        """
+        Rows of the block in one currency, in the index's date order.
+        """
+
+        table = index.table
+        currency_codes = table.currency_codes
+        timestamps = table.timestamps
+
+        per_vendor = [
+            [row for row in index.vendor_rows[vendor_code] if currency_codes[row] == currency_code]
+            for vendor_code in vendor_codes
+        ]
+
+        if len(per_vendor) == 1:
+            return per_vendor[0]
+
+        return list(heapq.merge(*per_vendor, key=lambda row: (timestamps[row], row)))
+
+    def _sweep(
+        self,
+        table: TransactionTable,
+        rows: List[int],
+        window: int,
+        min_minor: Decimal,
+        similarity: VendorSimilarityIndex,
+    ):
+        """
+        Yields (earlier row, row) for every row with a near match in the
+        window before it.
+        """
+
+        timestamps = table.timestamps
+        amount_minor = table.amount_minor
+        vendor_codes = table.vendor_codes
+
+        active: List[Tuple[int, int]] = []  # (minor, row), amount order
+        expiry = deque()  # rows, date order
+
+        for row in rows:
+            minor = amount_minor[row]
+
+            if minor < min_minor:
+                continue
+
+            timestamp = timestamps[row]
+
+            while expiry and timestamp - timestamps[expiry[0]] > window:
+                expired = expiry.popleft()
+                del active[bisect_left(active, (amount_minor[expired], expired))]
+
+            tolerance = int((abs(minor) * self.amount_tolerance).to_integral_value(ROUND_FLOOR))
+
+            match = self._closest_match(
+                active, minor, tolerance, vendor_codes[row], vendor_codes, similarity
+            )
+
+            if match is not None:
+                yield match, row
+
+            insort(active, (minor, row))
+            expiry.append(row)
+
+    def _closest_match(
+        self,
+        active: List[Tuple[int, int]],
+        minor: int,
+        tolerance: int,
+        vendor_code: int,
+        vendor_codes,
+        similarity: VendorSimilarityIndex,
+    ) -> Optional[int]:
+        """
+        Walks outward from `minor` in order of amount distance and returns
+        the first acceptable row: within tolerance, not an exact repeat at
+        the same vendor, and at a similar vendor.
+        """
+
+        below = bisect_left(active, (minor, -1)) - 1
+        above = below + 1
+        examined = 0
+
+        while examined < self.max_candidates:
+            below_distance = minor - active[below][0] if below >= 0 else None
+            above_distance = active[above][0] - minor if above < len(active) else None
+
+            if below_distance is not None and below_distance > tolerance:
+                below_distance = None
+            if above_distance is not None and above_distance > tolerance:
+                above_distance = None
+
+            if below_distance is None and above_distance is None:
+                return None
+
+            if above_distance is None or (below_distance is not None and below_distance < above_distance):
+                candidate_minor, candidate = active[below]
+                below -= 1
+            else:
+                candidate_minor, candidate = active[above]
+                above += 1
+
+            examined += 1
+
+            candidate_vendor = vendor_codes[candidate]
+
+            if candidate_vendor == vendor_code:
+                if candidate_minor != minor:
+                    return candidate
+            elif similarity.similarity(candidate_vendor, vendor_code) > 0:
+                return candidate
+
+        return None
+
+    def _detection(
+        self,
+        table: TransactionTable,
+        earlier: int,
+        later: int,
+        similarity: VendorSimilarityIndex,
+    ) -> DetectionResult:
+
+        amount = table.amount(later)
+        matched_amount = table.amount(earlier)
+
+        vendor_score = similarity.similarity(
+            table.vendor_codes[earlier], table.vendor_codes[later]
+        )
+
+        return DetectionResult.create(
+            detection_type=DetectionType.DUPLICATE,
+            related_transaction_ids=[
+                table.transaction_ids[earlier],
+                table.transaction_ids[later],
+            ],
+            rule_triggered="near_duplicate_amount_vendor_window",
+            supporting_evidence={
+                "vendor": table.vendor(later),
+                "matched_vendor": table.vendor(earlier),
+                "amount": str(amount),
+                "matched_amount": str(matched_amount),
+                "amount_difference": str(amount - matched_amount),
+                "vendor_similarity": round(vendor_score, 4),
+                "time_window_days": self.time_window_days,
+                "detector_class": self.__class__.__name__,
+                "detector_version": self.VERSION,
+            },
+            financial_impact_estimate=amount,
+            confidence_score=0.7 if vendor_score == 1.0 else 0.6,
+            risk_severity=self._determine_severity(amount),
+            currency=table.currency(later),
+        )
+
+    def _determine_severity(self, impact: Decimal) -> RiskSeverity:
+        if impact >= Decimal("10000"):
+            return RiskSeverity.HIGH
+        elif impact >= Decimal("1000"):
+            return RiskSeverity.MEDIUM
+        return RiskSeverity.LOW
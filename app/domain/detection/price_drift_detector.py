@@ -0,0 +1,323 @@
+import math
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Dict, List, Optional, Tuple
+
+from app.domain.detection.streaming_detector import StreamingDetector
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.models.detection_result import DetectionResult
+from app.domain.enums import DetectionType, RiskSeverity
+
+
+class DriftEpisode:
+    """
+    A run of consecutive charges in an upward trend: their transaction
+    ids, amounts and the long-run baseline each was compared against.
+    """
+
+    def __init__(self):
+        self.transaction_ids: List[str] = []
+        self.amounts: List[Decimal] = []
+        self.baselines: List[Decimal] = []
+
+    def __len__(self) -> int:
+        return len(self.transaction_ids)
+
+    def add(self, transaction_id: str, amount: Decimal, baseline: Decimal):
+        self.transaction_ids.append(transaction_id)
+        self.amounts.append(amount)
+        self.baselines.append(baseline)
+
+
+class PriceDriftTracker:
+    """
+    Streaming trend test for one (vendor, currency, category) series.
+
+    Works on log prices, so drift is relative and multiplicative noise is
+    symmetric. Keeps a fast and a slow EWMA and an EWMA of the absolute
+    one-step residual (price - fast EWMA), which estimates the noise
+    level. A charge is in an upward trend when:
+
+    - fast - slow exceeds `significance` standard deviations of that gap
+      under stationary noise, and at least log(1 + `drift_threshold`);
+    - the charge itself is above the slow EWMA by log(1 + `drift_threshold`),
+      so a single spike cannot carry a trend on its own.
+
+    Every charge updates both averages, so a one-time step ends its
+    episode once the slow EWMA catches up. Each observation is O(1) and
+    trackers pickle, so they can be kept between ingestion batches.
+    """
+
+    def __init__(
+        self,
+        fast_smoothing: float,
+        slow_smoothing: float,
+        drift_threshold: float,
+        significance: float,
+        min_history: int,
+        min_consecutive: int,
+    ):
+        self.fast_smoothing = fast_smoothing
+        self.slow_smoothing = slow_smoothing
+        self.margin = math.log1p(drift_threshold)
+        self.significance = significance
+        self.min_history = min_history
+        self.min_consecutive = min_consecutive
+
+        self.noise_factor = _gap_noise_factor(fast_smoothing, slow_smoothing)
+
+        self.observations = 0
+        self.fast = 0.0
+        self.slow = 0.0
+        self.deviation = 0.0
+        self.episode = DriftEpisode()
+
+    def observe(self, transaction_id: str, amount: Decimal) -> Optional[DriftEpisode]:
+        """
+        Adds one positive charge in date order. Returns a finished episode
+        when this charge ends one that lasted at least `min_consecutive`
+        charges.
+        """
+
+        price = math.log(amount)
+        self.observations += 1
+
+        if self.observations == 1:
+            self.fast = self.slow = price
+            return None
+
+        # Early weights of 1/n make both averages start as running means
+        residual = price - self.fast
+        self.fast += max(self.fast_smoothing, 1 / self.observations) * residual
+
+        finished = None
+
+        if self.observations > self.min_history:
+            gap = self.fast - self.slow
+            limit = max(self.significance * self.noise_factor * self.deviation, self.margin)
+
+            if gap > limit and price - self.slow > self.margin:
+                self.episode.add(transaction_id, amount, _baseline(self.slow, amount))
+            else:
+                finished = self._close_episode()
+
+        weight = max(self.slow_smoothing, 1 / self.observations)
+        self.slow += weight * (price - self.slow)
+        self.deviation += weight * (abs(residual) - self.deviation)
+
+        return finished
+
+    def pending(self) -> Optional[DriftEpisode]:
+        """
+        The episode in progress, if already long enough to report. The
+        tracker is left unchanged, so more charges can follow.
+        """
+        return self.episode if len(self.episode) >= self.min_consecutive else None
+
+    def _close_episode(self) -> Optional[DriftEpisode]:
+        episode = self.episode
+
+        if not len(episode):
+            return None
+
+        self.episode = DriftEpisode()
+
+        return episode if len(episode) >= self.min_consecutive else None
+
+
+class PriceDriftState:
+    """
+    Drift state of one vendor: a tracker per (currency, category), the
+    findings of finished episodes and the last timestamp consumed.
+    """
+
+    def __init__(self):
+        self.vendor: Optional[str] = None
+        self.trackers: Dict[Tuple[str, str], PriceDriftTracker] = {}
+        self.findings: List[DetectionResult] = []
+        self.last_timestamp: Optional[int] = None
+
+
+class PriceDriftDetector(StreamingDetector):
+    """
+    Flags sustained upward price trends per vendor, currency and category.
+
+    Each series is read once in date order through a PriceDriftTracker
+    (fast vs. slow EWMA of log prices against a noise-scaled limit), and
+    `min_consecutive` or more trending charges in a row form one finding.
+    The impact estimate is the total paid above the slow EWMA during the
+    episode. Refunds and zero amounts are ignored.
+    """
+
+    VERSION = "1.0.0"
+
+    def __init__(
+        self,
+        fast_smoothing: float = 0.3,
+        slow_smoothing: float = 0.05,
+        drift_threshold: float = 0.05,
+        significance: float = 4.0,
+        min_history: int = 5,
+        min_consecutive: int = 4,
+    ):
+        if not 0 < slow_smoothing < fast_smoothing <= 1:
+            raise ValueError("Smoothing weights must satisfy 0 < slow_smoothing < fast_smoothing <= 1.")
+
+        if drift_threshold < 0:
+            raise ValueError("drift_threshold must not be negative.")
+
+        if significance < 0:
+            raise ValueError("significance must not be negative.")
+
+        if min_history < 2:
+            raise ValueError("min_history must be at least 2.")
+
+        if min_consecutive < 1:
+            raise ValueError("min_consecutive must be a positive integer.")
+
+        self.fast_smoothing = fast_smoothing
+        self.slow_smoothing = slow_smoothing
+        self.drift_threshold = drift_threshold
+        self.significance = significance
+        self.min_history = min_history
+        self.min_consecutive = min_consecutive
+
+    def tracker(self) -> PriceDriftTracker:
+        return PriceDriftTracker(
+            self.fast_smoothing,
+            self.slow_smoothing,
+            self.drift_threshold,
+            self.significance,
+            self.min_history,
+            self.min_consecutive,
+        )
+
+    def new_state(self) -> PriceDriftState:
+        return PriceDriftState()
+
+    def advance(self, state: PriceDriftState, table: TransactionTable, rows: List[int]):
+
+        if not rows:
+            return
+
+        transaction_ids = table.transaction_ids
+        currency_codes = table.currency_codes
+        category_codes = table.category_codes
+
+        state.vendor = table.vendor(rows[0])
+
+        for row in rows:
+            amount = table.amount(row)
+
+            if amount <= 0:
+                continue
+
+            key = (table.currencies[currency_codes[row]], table.categories[category_codes[row]])
+            tracker = state.trackers.get(key)
+
+            if tracker is None:
+                tracker = state.trackers[key] = self.tracker()
+
+            episode = tracker.observe(transaction_ids[row], amount)
+
+            if episode is not None:
+                state.findings.append(self._detection(state.vendor, key, episode))
+
+        state.last_timestamp = table.timestamps[rows[-1]]
+
+    def accepts(self, state: PriceDriftState, table: TransactionTable, rows: List[int]) -> bool:
+        return (
+            state.last_timestamp is None
+            or not rows
+            or table.timestamps[rows[0]] >= state.last_timestamp
+        )
+
+    def results(self, state: PriceDriftState) -> List[DetectionResult]:
+
+        results = list(state.findings)
+
+        for key, tracker in state.trackers.items():
+            episode = tracker.pending()
+
+            if episode is not None:
+                results.append(self._detection(state.vendor, key, episode))
+
+        return results
+
+    def _detection(
+        self,
+        vendor: str,
+        key: Tuple[str, str],
+        episode: DriftEpisode,
+    ) -> DetectionResult:
+
+        currency, category = key
+
+        quantum = Decimal(1).scaleb(min(
+            amount.as_tuple().exponent for amount in episode.amounts
+        ))
+
+        excess = sum(
+            (amount - baseline for amount, baseline in zip(episode.amounts, episode.baselines)),
+            Decimal("0"),
+        ).quantize(quantum, rounding=ROUND_HALF_EVEN)
+
+        baseline = episode.baselines[0]
+        latest = episode.amounts[-1]
+
+        return DetectionResult.create(
+            detection_type=DetectionType.PRICE_DRIFT,
+            related_transaction_ids=list(episode.transaction_ids),
+            rule_triggered="ewma_crossover_upward_trend",
+            supporting_evidence={
+                "vendor": vendor,
+                "category": category,
+                "baseline_amount": str(baseline),
+                "latest_amount": str(latest),
+                "drift_ratio": round(float(latest / baseline) - 1, 4),
+                "episode_length": len(episode),
+                "fast_smoothing": self.fast_smoothing,
+                "slow_smoothing": self.slow_smoothing,
+                "drift_threshold": self.drift_threshold,
+                "significance": self.significance,
+                "detector_class": self.__class__.__name__,
+                "detector_version": self.VERSION,
+            },
+            financial_impact_estimate=excess,
+            confidence_score=min(0.9, 0.5 + 0.1 * len(episode)),
+            risk_severity=self._determine_severity(excess),
+            currency=currency,
+        )
+
+    def _determine_severity(self, impact: Decimal) -> RiskSeverity:
+        if impact >= Decimal("10000"):
+            return RiskSeverity.HIGH
+        elif impact >= Decimal("1000"):
+            return RiskSeverity.MEDIUM
+        return RiskSeverity.LOW
+
+
+def _gap_noise_factor(fast_smoothing: float, slow_smoothing: float) -> float:
+    """
+    Ratio of the standard deviation of (fast - slow) to the mean absolute
+    one-step residual (price - fast EWMA), for stationary Gaussian noise.
+    """
+
+    residual_variance = 2 / (2 - fast_smoothing)
+
+    gap_variance = (
+        fast_smoothing / (2 - fast_smoothing)
+        + slow_smoothing / (2 - slow_smoothing)
+        - 2 * fast_smoothing * slow_smoothing
+        / (fast_smoothing + slow_smoothing - fast_smoothing * slow_smoothing)
+    )
+
+    return math.sqrt(math.pi / 2 * gap_variance / residual_variance)
+
+
+def _baseline(log_price: float, amount: Decimal) -> Decimal:
+    """
+    exp(log_price) at the precision of `amount`.
+    """
+    return Decimal(math.exp(log_price)).quantize(
+        Decimal(1).scaleb(amount.as_tuple().exponent), rounding=ROUND_HALF_EVEN
+    )
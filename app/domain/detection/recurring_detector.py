@@ -1,41 +1,85 @@
-from datetime import timedelta
+import math
 from decimal import Decimal
-from typing import List
-from collections import defaultdict
+from typing import Callable, List, Optional, Tuple
 
 from app.domain.detection.base_detector import BaseDetector
 from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable, MICROSECONDS_PER_DAY
+from app.domain.indexing.transaction_index import TransactionIndex
 from app.domain.models.detection_result import DetectionResult
 from app.domain.enums import DetectionType, RiskSeverity
 
 
+MODES = ("consistent", "histogram")
+
+# Candidate billing periods for histogram mode: (name, days, charges per year)
+PERIODS = (
+    ("weekly", 7, 52),
+    ("biweekly", 14, 26),
+    ("monthly", 30, 12),
+    ("quarterly", 91, 4),
+    ("annual", 365, 1),
+)
+
+# Highest chance probability accepted for a histogram-mode chain, after a
+# Bonferroni correction for the periods and heads that could produce it
+CHAIN_SIGNIFICANCE = 0.05
+
+
 class RecurringDetector(BaseDetector):
 
-    VERSION = "1.0.1"
+    VERSION = "1.1.0"
+
+    def __init__(self, interval_tolerance_days: int = 3, mode: str = "consistent"):
+        """
+        `mode` selects how a (vendor, currency, amount) group qualifies:
+
+        - consistent (default): every interval in the group is within
+          tolerance of the mean interval; one detection per group
+        - histogram: dominant billing periods are found from a histogram
+          of period-matching links, and each chain of charges one period
+          apart (one missed charge allowed) is its own detection, so
+          extra charges, gaps and parallel subscriptions do not hide a
+          subscription
+        """
+
+        if mode not in MODES:
+            raise ValueError(f"Unsupported recurring mode '{mode}'.")
 
-    def __init__(self, interval_tolerance_days: int = 3):
         self.interval_tolerance_days = interval_tolerance_days
+        self.mode = mode
 
     def detect(self, transactions: List[Transaction]) -> List[DetectionResult]:
-        results: List[DetectionResult] = []
+        return self.detect_table(TransactionTable.from_transactions(transactions))
 
-        grouped = defaultdict(list)
+    def detect_table(self, table: TransactionTable) -> List[DetectionResult]:
+        return self.detect_index(TransactionIndex.build(table))
 
-        # Group by vendor + currency + amount
-        for tx in transactions:
-            key = (tx.vendor_normalized_name, tx.currency, tx.amount)
-            grouped[key].append(tx)
+    def detect_index(self, index: TransactionIndex) -> List[DetectionResult]:
+        results: List[DetectionResult] = []
+
+        table = index.table
+        timestamps = table.timestamps
 
-        for (vendor, currency, amount), tx_list in grouped.items():
+        # Index is pre-grouped by vendor + currency + amount, rows in date order
+        for vendor_code, currency_code, rows in _amount_groups(index):
 
-            if len(tx_list) < 3:
+            if len(rows) < 3:
                 continue  # Require at least 3 occurrences to qualify as recurring
 
-            tx_list.sort(key=lambda t: t.date)
+            vendor = table.vendors[vendor_code]
+            currency = table.currencies[currency_code]
+            amount = table.amount(min(rows))
+
+            if self.mode == "histogram":
+                results.extend(self._histogram_detections(
+                    table, rows, vendor, currency, amount
+                ))
+                continue
 
             intervals = [
-                (tx_list[i + 1].date - tx_list[i].date).days
-                for i in range(len(tx_list) - 1)
+                (timestamps[rows[i + 1]] - timestamps[rows[i]]) // MICROSECONDS_PER_DAY
+                for i in range(len(rows) - 1)
             ]
 
             if self._is_consistent_interval(intervals):
@@ -45,7 +89,7 @@ class RecurringDetector(BaseDetector):
                 result = DetectionResult.create(
                     detection_type=DetectionType.RECURRING,
                     related_transaction_ids=[
-                        t.transaction_id for t in tx_list
+                        table.transaction_ids[row] for row in rows
                     ],
                     rule_triggered="consistent_interval_recurring_pattern",
                     supporting_evidence={
@@ -77,9 +121,444 @@ class RecurringDetector(BaseDetector):
 
         return True
 
+    def _histogram_detections(
+        self,
+        table: TransactionTable,
+        rows: List[int],
+        vendor: str,
+        currency: str,
+        amount: Decimal,
+    ) -> List[DetectionResult]:
+        """
+        Histogram step: for every candidate period, count the rows that
+        have a later row one period ahead (within tolerance), with a
+        sliding window over the date-ordered days, O(n) per period.
+        Extraction step: periods with enough links, most links first, are
+        chained over the rows not yet claimed.
+        """
+
+        results: List[DetectionResult] = []
+
+        timestamps = table.timestamps
+        days = [timestamps[row] // MICROSECONDS_PER_DAY for row in rows]
+        claimed = [False] * len(rows)
+
+        histogram = [
+            (self._link_count(days, period_days, self._tolerance(period_days)), position)
+            for position, (_, period_days, _) in enumerate(PERIODS)
+        ]
+        histogram.sort(key=lambda entry: (-entry[0], entry[1]))
+
+        for links, position in histogram:
+
+            if links < 2:
+                break
+
+            name, period_days, per_year = PERIODS[position]
+            tolerance = self._tolerance(period_days)
+
+            for chain in self._chains(days, period_days, tolerance, claimed):
+
+                intervals = [days[b] - days[a] for a, b in zip(chain, chain[1:])]
+                missed = sum(
+                    1 for interval in intervals
+                    if abs(interval - period_days) > tolerance
+                )
+
+                annualized_estimate = amount * Decimal(per_year)
+
+                results.append(DetectionResult.create(
+                    detection_type=DetectionType.RECURRING,
+                    related_transaction_ids=[
+                        table.transaction_ids[rows[i]] for i in chain
+                    ],
+                    rule_triggered="interval_histogram_recurring_pattern",
+                    supporting_evidence={
+                        "vendor": vendor,
+                        "amount": str(amount),
+                        "period": name,
+                        "period_days": period_days,
+                        "intervals_detected": intervals,
+                        "missed_charges": missed,
+                        "detector_class": self.__class__.__name__,
+                        "detector_version": self.VERSION,
+                    },
+                    financial_impact_estimate=annualized_estimate,
+                    confidence_score=0.9 if not missed else 0.8,
+                    risk_severity=self._determine_severity(annualized_estimate),
+                    currency=currency,
+                ))
+
+        return results
+
+    def _tolerance(self, period_days: int) -> int:
+        """
+        Tolerance for one period: interval_tolerance_days, narrowed for
+        short periods so that a weekly window and its missed-charge window
+        do not together accept almost any gap.
+        """
+        return min(self.interval_tolerance_days, max(1, period_days // 10))
+
+    def _link_count(self, days: List[int], period_days: int, tolerance: int) -> int:
+        """
+        Rows with a later row period_days ahead (within tolerance). Both
+        window edges only move forward, so the sweep is linear.
+        """
+
+        count = len(days)
+        end = 0
+        links = 0
+
+        for i, day in enumerate(days):
+            end = max(end, i + 1)
+
+            while end < count and days[end] <= day + period_days + tolerance:
+                end += 1
+
+            # The window's last row is the latest within reach
+            if end - 1 > i and days[end - 1] >= day + period_days - tolerance:
+                links += 1
+
+        return links
+
+    def _chains(
+        self,
+        days: List[int],
+        period_days: int,
+        tolerance: int,
+        claimed: List[bool],
+    ) -> List[List[int]]:
+        """
+        Chains of at least 3 unclaimed rows, each followed by the unclaimed
+        row nearest to one period later, or two periods later when a charge
+        was missed. Accepted chains claim their rows.
+
+        When the unclaimed rows split cleanly into such chains (every link
+        window holds a single candidate, no row is left over), all of them
+        are accepted, as consistent mode would accept a lone series. Other
+        groups contain spending that could form links by chance: heads are
+        then tried in date order and each chain must pass the chance test.
+        """
+
+        count = len(days)
+
+        # (lag, window start, first row on or after the exact target day,
+        #  first row after the window)
+        windows = [
+            (
+                lag,
+                _window_starts(days, lag * period_days - tolerance),
+                _window_starts(days, lag * period_days),
+                _window_starts(days, lag * period_days + tolerance + 1),
+            )
+            for lag in (1, 2)
+        ]
+
+        unclaimed = _UnclaimedCounts(claimed)
+
+        # -2: not computed yet, -1: no successor; a successor stays valid
+        # until it is claimed, since claiming only removes candidates
+        successors = [-2] * count
+        bridges = [False] * count
+
+        def successor(row: int) -> int:
+            cached = successors[row]
+
+            if cached == -1 or (cached >= 0 and not claimed[cached]):
+                return cached
+
+            successors[row] = -1
+
+            for lag, starts, targets, _ in windows:
+                match = _nearest_match(
+                    days, starts[row], targets[row], days[row] + lag * period_days, tolerance, claimed
+                )
+                if match is not None:
+                    successors[row], bridges[row] = match, lag == 2
+                    break
+
+            return successors[row]
+
+        chains = self._clean_cover(count, windows, unclaimed, successor, bridges, claimed)
+
+        if chains is None:
+            chains = self._significant_chains(
+                days, tolerance, unclaimed, successor, successors, bridges, claimed
+            )
+
+        return chains
+
+    def _clean_cover(
+        self,
+        count: int,
+        windows: List[Tuple[int, List[int], List[int], List[int]]],
+        unclaimed: "_UnclaimedCounts",
+        successor: Callable[[int], int],
+        bridges: List[bool],
+        claimed: List[bool],
+    ) -> Optional[List[List[int]]]:
+        """
+        The chains when the unclaimed rows form disjoint paths of at least
+        3 rows and every link window (both windows for a missed charge)
+        holds exactly one candidate; None otherwise. One pass over the rows.
+        """
+
+        predecessors = [0] * count
+
+        for row in range(count):
+            if claimed[row]:
+                continue
+
+            following = successor(row)
+
+            if following < 0:
+                continue
+
+            predecessors[following] += 1
+
+            if predecessors[following] > 1:
+                return None
+
+            for lag, starts, _, ends in windows[:2 if bridges[row] else 1]:
+                expected = 0 if bridges[row] and lag == 1 else 1
+
+                if unclaimed.between(starts[row], ends[row] - 1) != expected:
+                    return None
+
+        chains = []
+
+        for row in range(count):
+            if claimed[row] or predecessors[row]:
+                continue
+
+            chain = [row]
+            while successor(chain[-1]) >= 0:
+                chain.append(successor(chain[-1]))
+
+            if len(chain) < 3:
+                return None
+
+            chains.append(chain)
+
+        for chain in chains:
+            for row in chain:
+                claimed[row] = True
+
+        return chains
+
+    def _significant_chains(
+        self,
+        days: List[int],
+        tolerance: int,
+        unclaimed: "_UnclaimedCounts",
+        successor: Callable[[int], int],
+        successors: List[int],
+        bridges: List[bool],
+        claimed: List[bool],
+    ) -> List[List[int]]:
+        """
+        Heads in date order; the chain from a head is accepted when it has
+        at least 3 rows and passes the chance test.
+
+        Every row has at most one successor, so the chain from a head is a
+        path. Path lengths, ends and bridged links are memoized and shared
+        by every head whose path joins an already walked one; only an
+        accepted chain, which may redirect paths through its rows, starts a
+        new memo generation.
+        """
+
+        count = len(days)
+        chains: List[List[int]] = []
+
+        generations = [-1] * count
+        lengths = [0] * count
+        lasts = [0] * count
+        bridged = [0] * count
+        generation = 0
+
+        for head in range(count):
+
+            if claimed[head]:
+                continue
+
+            # Walk forward to the first row already known in this generation
+            path = []
+            row = head
+
+            while row >= 0 and generations[row] != generation:
+                path.append(row)
+                row = successor(row)
+
+            for row in reversed(path):
+                following = successors[row]
+                generations[row] = generation
+
+                if following < 0:
+                    lengths[row], lasts[row], bridged[row] = 1, row, 0
+                else:
+                    lengths[row] = lengths[following] + 1
+                    lasts[row] = lasts[following]
+                    bridged[row] = bridged[following] + bridges[row]
+
+            if lengths[head] < 3:
+                continue
+
+            last = lasts[head]
+
+            if not self._is_significant(
+                days[last] - days[head],
+                lengths[head] - 1,
+                bridged[head],
+                unclaimed.between(head, last),
+                tolerance,
+            ):
+                continue
+
+            chain = [head]
+            while successors[chain[-1]] >= 0:
+                chain.append(successors[chain[-1]])
+
+            for row in chain:
+                claimed[row] = True
+                unclaimed.claim(row)
+
+            chains.append(chain)
+            generation += 1
+
+        return chains
+
+    def _is_significant(
+        self,
+        span_days: int,
+        links: int,
+        bridged_links: int,
+        charges: int,
+        tolerance: int,
+    ) -> bool:
+        """
+        Chance test for one chain: if the `charges` unclaimed charges in its
+        span arrived at random at their observed rate, a link window would
+        be hit with probability p. A link costs p, and a link bridging a
+        missed charge costs a miss and a hit, (1 - p) * p. The chance of a
+        chain with `links` links and at most `bridged_links` of them bridged
+        (wherever they fall) is then multiplied by the number of chains
+        that could have produced it (Bonferroni): one per period and per
+        charge in the span that could have been its head. It must not
+        exceed CHAIN_SIGNIFICANCE. The correction depends on the chain's own
+        span, not on the size of the group.
+        """
+
+        rate = (charges - 1) / max(span_days, 1)
+        hit = 1 - math.exp(-rate * (2 * tolerance + 1))
+
+        chance = sum(
+            math.comb(links, bridges) * hit ** (links - bridges) * ((1 - hit) * hit) ** bridges
+            for bridges in range(bridged_links + 1)
+        )
+
+        return chance * len(PERIODS) * charges <= CHAIN_SIGNIFICANCE
+
     def _determine_severity(self, impact: Decimal) -> RiskSeverity:
         if impact >= Decimal("20000"):
             return RiskSeverity.HIGH
         elif impact >= Decimal("5000"):
             return RiskSeverity.MEDIUM
         return RiskSeverity.LOW
+
+
+def _amount_groups(index: TransactionIndex):
+    for vendor_code, currency_groups in index.groups.items():
+        for currency_code, amount_groups in currency_groups.items():
+            for rows in amount_groups.values():
+                yield vendor_code, currency_code, rows
+
+
+class _UnclaimedCounts:
+    """
+    Unclaimed rows in a range of the group, kept in a Fenwick tree so that
+    both queries and claims cost O(log n).
+    """
+
+    def __init__(self, claimed: List[bool]):
+        self.tree = [0] * (len(claimed) + 1)
+
+        for position, flag in enumerate(claimed, start=1):
+            self.tree[position] += not flag
+            parent = position + (position & -position)
+
+            if parent <= len(claimed):
+                self.tree[parent] += self.tree[position]
+
+    def claim(self, row: int):
+        position = row + 1
+
+        while position < len(self.tree):
+            self.tree[position] -= 1
+            position += position & -position
+
+    def between(self, first: int, last: int) -> int:
+        return self._prefix(last + 1) - self._prefix(first)
+
+    def _prefix(self, position: int) -> int:
+        total = 0
+
+        while position > 0:
+            total += self.tree[position]
+            position -= position & -position
+
+        return total
+
+
+def _window_starts(days: List[int], offset: int) -> List[int]:
+    """
+    For every row, the first later row on or after its day + offset; one
+    forward sweep over the date-ordered days.
+    """
+
+    starts = []
+    start = 0
+
+    for i, day in enumerate(days):
+        start = max(start, i + 1)
+
+        while start < len(days) and days[start] < day + offset:
+            start += 1
+
+        starts.append(start)
+
+    return starts
+
+
+def _nearest_match(
+    days: List[int],
+    start: int,
+    target_row: int,
+    target: int,
+    tolerance: int,
+    claimed: List[bool],
+) -> Optional[int]:
+    """
+    The unclaimed row closest to day `target`, within `tolerance` and not
+    before row `start` (the earliest on a tie), or None. `target_row` is
+    the first row on or after the target day; the search walks outwards
+    from it and only steps over claimed rows.
+    """
+
+    before = target_row - 1
+    while before >= start and claimed[before]:
+        before -= 1
+
+    after = target_row
+    while after < len(days) and days[after] <= target + tolerance and claimed[after]:
+        after += 1
+
+    if after >= len(days) or days[after] > target + tolerance:
+        after = None
+
+    if before < start:
+        return after
+
+    if after is None or target - days[before] <= days[after] - target:
+        return before
+
+    return after
@@ -0,0 +1,62 @@
+from abc import abstractmethod
+from typing import Any, List
+
+from app.domain.detection.base_detector import BaseDetector
+from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.models.detection_result import DetectionResult
+
+
+class StreamingDetector(BaseDetector):
+    """
+    Vendor-local detector that reads each vendor's charges once, in date
+    order, through a per-vendor state object.
+
+    States pickle, so they can be kept between ingestion batches: the
+    incremental engine persists one per vendor and passes only newly
+    appended rows to `advance`, as long as `accepts` confirms they do not
+    predate the rows already consumed. Otherwise the vendor is replayed
+    from a fresh state. Either way the findings equal a full run.
+    """
+
+    @abstractmethod
+    def new_state(self) -> Any:
+        pass
+
+    @abstractmethod
+    def advance(self, state: Any, table: TransactionTable, rows: List[int]):
+        """
+        Feeds one vendor's rows, in date order, into `state`.
+        """
+
+    @abstractmethod
+    def accepts(self, state: Any, table: TransactionTable, rows: List[int]) -> bool:
+        """
+        Whether `rows` (one vendor, date order) can continue `state`
+        without changing the order a full run would read them in.
+        """
+
+    @abstractmethod
+    def results(self, state: Any) -> List[DetectionResult]:
+        """
+        Every finding so far, including those still in progress. Does
+        not modify `state`.
+        """
+
+    def detect(self, transactions: List[Transaction]) -> List[DetectionResult]:
+        return self.detect_table(TransactionTable.from_transactions(transactions))
+
+    def detect_table(self, table: TransactionTable) -> List[DetectionResult]:
+        return self.detect_index(TransactionIndex.build(table))
+
+    def detect_index(self, index: TransactionIndex) -> List[DetectionResult]:
+
+        results: List[DetectionResult] = []
+
+        for rows in index.vendor_rows.values():
+            state = self.new_state()
+            self.advance(state, index.table, rows)
+            results.extend(self.results(state))
+
+        return results
@@ -1,13 +1,20 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+from app.domain.diagnostics.stage_span import BaseSpanHook, StageSpan, DISABLED_SPAN
 
 
 class EngineDiagnostics:
 
     VERSION = "1.0.0"
 
-    def __init__(self):
+    def __init__(self, profile: bool = False, hooks: Optional[List[BaseSpanHook]] = None):
         self.warnings = []
         self.errors = []
+        self.cache = None
+        self.determinism = None
+        self.profile = profile
+        self.hooks = hooks or []
+        self.spans = []
 
     def add_warning(self, message: str):
         self.warnings.append(message)
@@ -15,9 +22,51 @@ class EngineDiagnostics:
     def add_error(self, message: str):
         self.errors.append(message)
 
+    def record_cache(self, status: str, key: str):
+        self.cache = {"status": status, "key": key}
+
+    def record_determinism(self, report: Dict[str, Any]):
+        self.determinism = report
+
+    def span(
+        self,
+        name: str,
+        input_size: Optional[int] = None,
+        **attributes,
+    ):
+        """
+        Context manager measuring one stage. Returns a shared no-op span
+        when profiling is disabled.
+        """
+
+        if not self.profile:
+            return DISABLED_SPAN
+
+        return StageSpan(self, name, input_size, attributes)
+
+    def record_span(self, span: Dict[str, Any]):
+        self.spans.append(span)
+
+        for hook in self.hooks:
+            try:
+                hook.on_span(span)
+            except Exception as e:
+                self.add_warning(f"{hook.__class__.__name__} failed: {str(e)}")
+
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        result = {
             "diagnostics_version": self.VERSION,
             "warnings": self.warnings,
             "errors": self.errors,
         }
+
+        if self.cache is not None:
+            result["cache"] = self.cache
+
+        if self.determinism is not None:
+            result["determinism"] = self.determinism
+
+        if self.profile:
+            result["spans"] = self.spans
+
+        return result
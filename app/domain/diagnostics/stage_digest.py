@@ -0,0 +1,63 @@
+import hashlib
+import json
+from collections import defaultdict
+from typing import Any, Dict, Iterable
+
+from pydantic import BaseModel
+
+
+class StageDigest:
+    """
+    Streamed SHA-256 over the canonical form of a stage's output.
+
+    Items are hashed one at a time in emission order, so order changes are
+    detected and no serialized copy of the full output is ever built.
+    """
+
+    def __init__(self):
+        self._hasher = hashlib.sha256()
+
+    def update(self, item: Any) -> "StageDigest":
+        self._hasher.update(canonical_bytes(item))
+        self._hasher.update(b"\n")
+        return self
+
+    def update_all(self, items: Iterable[Any]) -> "StageDigest":
+        for item in items:
+            self.update(item)
+        return self
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+
+def canonical_bytes(item: Any) -> bytes:
+    return json.dumps(
+        item,
+        sort_keys=True,
+        separators=(",", ":"),
+        default=_canonical_default,
+    ).encode()
+
+
+def digest_items(items: Iterable[Any]) -> str:
+    return StageDigest().update_all(items).hexdigest()
+
+
+def digest_by_vendor(detections: Iterable) -> Dict[str, str]:
+    """
+    Per-vendor digests of detections, keyed by their evidence vendor.
+    """
+
+    digests: Dict[str, StageDigest] = defaultdict(StageDigest)
+
+    for detection in detections:
+        digests[detection.supporting_evidence.get("vendor", "unknown")].update(detection)
+
+    return {vendor: digest.hexdigest() for vendor, digest in digests.items()}
+
+
+def _canonical_default(value: Any):
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return str(value)
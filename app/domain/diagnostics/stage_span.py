@@ -0,0 +1,127 @@
+import time
+import tracemalloc
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+
+class StageSpan:
+    """
+    Timing and memory measurement of one engine stage.
+
+    Used as a context manager; the owning diagnostics records the span when
+    the block exits. Recorded fields:
+    - wall_seconds / cpu_seconds: perf_counter and process_time deltas
+    - max_rss_kb / rss_growth_kb: process peak RSS after the stage and how
+      much the stage raised it (POSIX only)
+    - traced_bytes_delta / traced_peak_bytes: only while tracemalloc is
+      tracing (the engine never starts it)
+    - input_size / output_size: stage cardinalities
+    - status: "ok" or "error"
+    """
+
+    def __init__(
+        self,
+        diagnostics,
+        name: str,
+        input_size: Optional[int] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self._diagnostics = diagnostics
+        self.name = name
+        self.input_size = input_size
+        self.output_size: Optional[int] = None
+        self.attributes = attributes or {}
+        self.result: Dict[str, Any] = {}
+
+    def __enter__(self) -> "StageSpan":
+        self._tracing = tracemalloc.is_tracing()
+
+        if self._tracing:
+            self._traced_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+
+        self._rss_start = _max_rss_kb()
+        self._cpu_start = time.process_time()
+        self._wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        wall_seconds = time.perf_counter() - self._wall_start
+        cpu_seconds = time.process_time() - self._cpu_start
+
+        result = {
+            "stage": self.name,
+            "status": "ok" if exc_type is None else "error",
+            "wall_seconds": round(wall_seconds, 6),
+            "cpu_seconds": round(cpu_seconds, 6),
+            "input_size": self.input_size,
+            "output_size": self.output_size,
+        }
+
+        rss_end = _max_rss_kb()
+        if rss_end is not None:
+            result["max_rss_kb"] = rss_end
+            result["rss_growth_kb"] = rss_end - self._rss_start
+
+        if self._tracing and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            result["traced_bytes_delta"] = current - self._traced_start
+            result["traced_peak_bytes"] = peak - self._traced_start
+
+        result.update(self.attributes)
+
+        self.result = result
+        self._diagnostics.record_span(result)
+        return False
+
+
+class _DisabledSpan:
+    """
+    Shared no-op stand-in returned while profiling is off.
+    """
+
+    input_size = None
+    output_size = None
+
+    @property
+    def attributes(self) -> Dict[str, Any]:
+        return {}
+
+    @property
+    def result(self) -> Dict[str, Any]:
+        return {}
+
+    def __enter__(self) -> "_DisabledSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> bool:
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+DISABLED_SPAN = _DisabledSpan()
+
+
+class BaseSpanHook(ABC):
+    """
+    Receives every completed stage span, e.g. to forward it to a metrics
+    pipeline. Hook failures are reported as diagnostics warnings and never
+    affect the run.
+    """
+
+    @abstractmethod
+    def on_span(self, span: Dict[str, Any]):
+        pass
+
+
+def _max_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -0,0 +1,63 @@
+from typing import Dict, List
+
+from app.domain.models.transaction_table import TransactionTable
+
+
+class TransactionIndex:
+    """
+    Shared grouping index built once per run and reused by every stage.
+
+    - vendor_rows: vendor code -> rows in date order
+    - groups: vendor code -> currency code -> minor-unit amount -> rows in date order
+
+    Keys appear in ingestion (first occurrence) order and rows with equal
+    timestamps keep ingestion order, matching a stable per-group sort.
+    """
+
+    def __init__(
+        self,
+        table: TransactionTable,
+        vendor_rows: Dict[int, List[int]],
+        groups: Dict[int, Dict[int, Dict[int, List[int]]]],
+    ):
+        self.table = table
+        self.vendor_rows = vendor_rows
+        self.groups = groups
+
+    @classmethod
+    def build(cls, table: TransactionTable) -> "TransactionIndex":
+
+        vendor_codes = table.vendor_codes
+        currency_codes = table.currency_codes
+        amount_minor = table.amount_minor
+
+        vendor_rows: Dict[int, List[int]] = {}
+        groups: Dict[int, Dict[int, Dict[int, List[int]]]] = {}
+
+        # First pass: register keys in ingestion order
+        for vendor_code, currency_code, minor in zip(
+            vendor_codes, currency_codes, amount_minor
+        ):
+            currency_groups = groups.get(vendor_code)
+
+            if currency_groups is None:
+                currency_groups = groups[vendor_code] = {}
+                vendor_rows[vendor_code] = []
+
+            amount_groups = currency_groups.get(currency_code)
+
+            if amount_groups is None:
+                amount_groups = currency_groups[currency_code] = {}
+
+            if minor not in amount_groups:
+                amount_groups[minor] = []
+
+        # Second pass: fill groups from a single global date ordering
+        order = sorted(range(len(table)), key=table.timestamps.__getitem__)
+
+        for row in order:
+            vendor_code = vendor_codes[row]
+            vendor_rows[vendor_code].append(row)
+            groups[vendor_code][currency_codes[row]][amount_minor[row]].append(row)
+
+        return cls(table, vendor_rows, groups)
@@ -1,11 +1,15 @@
 from pydantic import BaseModel, field_validator
 from decimal import Decimal
 from typing import List, Dict, Any
-from uuid import uuid4
+import json
+from uuid import NAMESPACE_URL, uuid5
 
 from app.domain.enums import DetectionType, RiskSeverity
 
 
+DETECTION_ID_NAMESPACE = uuid5(NAMESPACE_URL, "vendor-intel-engine/detection")
+
+
 class DetectionResult(BaseModel):
     detection_id: str
     detection_type: DetectionType
@@ -37,7 +41,15 @@ class DetectionResult(BaseModel):
         currency: str,
     ) -> "DetectionResult":
         return cls(
-            detection_id=str(uuid4()),
+            detection_id=cls.stable_id(
+                detection_type,
+                rule_triggered,
+                supporting_evidence.get("vendor", "unknown"),
+                currency,
+                related_transaction_ids,
+                supporting_evidence,
+                financial_impact_estimate,
+            ),
             detection_type=detection_type,
             related_transaction_ids=related_transaction_ids,
             rule_triggered=rule_triggered,
@@ -47,3 +59,46 @@ class DetectionResult(BaseModel):
             risk_severity=risk_severity,
             currency=currency,
         )
+
+    @staticmethod
+    def stable_id(
+        detection_type: DetectionType,
+        rule_triggered: str,
+        vendor: str,
+        currency: str,
+        related_transaction_ids: List[str],
+        supporting_evidence: Dict[str, Any],
+        financial_impact_estimate: Decimal,
+    ) -> str:
+        """
+        Content-derived identifier: the same finding on the same
+        transactions gets the same id in every run.
+
+        Transaction ids alone are not unique (a ledger may repeat them), so
+        the evidence and impact are hashed too: two detections share an id
+        only if their content is identical, which keeps the sort on
+        detection_id deterministic. The detector version is left out so
+        that ids survive version bumps that do not change the evidence.
+        """
+
+        evidence = {
+            key: value for key, value in supporting_evidence.items()
+            if key != "detector_version"
+        }
+
+        name = json.dumps(
+            [
+                DetectionType(detection_type).value,
+                rule_triggered,
+                vendor,
+                currency,
+                list(related_transaction_ids),
+                evidence,
+                str(financial_impact_estimate),
+            ],
+            separators=(",", ":"),
+            sort_keys=True,
+            default=str,
+        )
+
+        return str(uuid5(DETECTION_ID_NAMESPACE, name))
@@ -0,0 +1,483 @@
+from array import array
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from app.domain.models.transaction import Transaction, ISO_CURRENCY_PATTERN
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class TransactionTable:
+    """
+    Columnar, read-only representation of a validated transaction dataset.
+
+    Column layout (one entry per row, in ingestion order):
+    - transaction_ids: original identifiers
+    - timestamps: UTC epoch microseconds
+    - offset_codes: index into `offsets`, the source UTC offset of each row
+    - vendor_codes / raw_vendor_codes / currency_codes / category_codes /
+      payment_method_codes / description_codes: dictionary-encoded strings
+    - amount_minor: integer amount at the per-currency scale in `currency_scales`
+    - amount_exponents: original Decimal exponent, so amounts round-trip exactly
+
+    Rows restore to values equal to the Transaction they were built from,
+    which keeps every detector and fingerprint result unchanged.
+    """
+
+    def __init__(
+        self,
+        transaction_ids: Sequence[str],
+        timestamps: Sequence[int],
+        offset_codes: Sequence[int],
+        offsets: List[timedelta],
+        vendor_codes: Sequence[int],
+        vendors: List[str],
+        raw_vendor_codes: Sequence[int],
+        raw_vendors: List[str],
+        currency_codes: Sequence[int],
+        currencies: List[str],
+        currency_scales: List[int],
+        amount_minor: Sequence[int],
+        amount_exponents: Sequence[int],
+        category_codes: Sequence[int],
+        categories: List[Optional[str]],
+        payment_method_codes: Sequence[int],
+        payment_methods: List[Optional[str]],
+        description_codes: Sequence[int],
+        descriptions: List[Optional[str]],
+        negative_zero_rows: frozenset = frozenset(),
+    ):
+        self.transaction_ids = transaction_ids
+        self.timestamps = timestamps
+        self.offset_codes = offset_codes
+        self.offsets = offsets
+        self.vendor_codes = vendor_codes
+        self.vendors = vendors
+        self.raw_vendor_codes = raw_vendor_codes
+        self.raw_vendors = raw_vendors
+        self.currency_codes = currency_codes
+        self.currencies = currencies
+        self.currency_scales = currency_scales
+        self.amount_minor = amount_minor
+        self.amount_exponents = amount_exponents
+        self.category_codes = category_codes
+        self.categories = categories
+        self.payment_method_codes = payment_method_codes
+        self.payment_methods = payment_methods
+        self.description_codes = description_codes
+        self.descriptions = descriptions
+        self.negative_zero_rows = negative_zero_rows
+
+        self._timezones = [timezone(offset) for offset in offsets]
+
+    def __len__(self) -> int:
+        return len(self.transaction_ids)
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Transaction]) -> "TransactionTable":
+        builder = TransactionTableBuilder()
+
+        for tx in transactions:
+            builder.append_transaction(tx)
+
+        return builder.build()
+
+    @classmethod
+    def concat(cls, tables: Sequence["TransactionTable"]) -> "TransactionTable":
+        """
+        Concatenates tables row-wise. Dictionaries are merged in first
+        occurrence order and amounts rescaled to the widest per-currency
+        scale, so the result equals one table built from all rows in order.
+        """
+
+        if len(tables) == 1:
+            return tables[0]
+
+        offsets: Dict[timedelta, int] = {}
+        vendors: Dict[str, int] = {}
+        raw_vendors: Dict[str, int] = {}
+        currencies: Dict[str, int] = {}
+        categories: Dict[Optional[str], int] = {}
+        payment_methods: Dict[Optional[str], int] = {}
+        descriptions: Dict[Optional[str], int] = {}
+
+        currency_remaps = [
+            _code_remap(table.currency_codes, table.currencies, currencies)
+            for table in tables
+        ]
+
+        currency_scales = [0] * len(currencies)
+        for table, remap in zip(tables, currency_remaps):
+            for code, scale in zip(remap, table.currency_scales):
+                if code is not None:
+                    currency_scales[code] = max(currency_scales[code], scale)
+
+        transaction_ids: List[str] = []
+        timestamps = array("q")
+        offset_codes = array("H")
+        vendor_codes = array("I")
+        raw_vendor_codes = array("I")
+        currency_codes = array("H")
+        amount_minor: List[int] = []
+        amount_exponents = array("i")
+        category_codes = array("I")
+        payment_method_codes = array("I")
+        description_codes = array("I")
+        negative_zero_rows = set()
+
+        for table, currency_remap in zip(tables, currency_remaps):
+            base = len(transaction_ids)
+
+            transaction_ids.extend(table.transaction_ids)
+            timestamps.extend(table.timestamps)
+            amount_exponents.extend(table.amount_exponents)
+            negative_zero_rows.update(base + row for row in table.negative_zero_rows)
+
+            offset_codes.extend(_remap(table.offset_codes, table.offsets, offsets))
+            vendor_codes.extend(_remap(table.vendor_codes, table.vendors, vendors))
+            raw_vendor_codes.extend(_remap(table.raw_vendor_codes, table.raw_vendors, raw_vendors))
+            category_codes.extend(_remap(table.category_codes, table.categories, categories))
+            payment_method_codes.extend(
+                _remap(table.payment_method_codes, table.payment_methods, payment_methods)
+            )
+            description_codes.extend(
+                _remap(table.description_codes, table.descriptions, descriptions)
+            )
+            currency_codes.extend(currency_remap[code] for code in table.currency_codes)
+
+            factors = [
+                10 ** (currency_scales[code] - scale) if code is not None else 1
+                for code, scale in zip(currency_remap, table.currency_scales)
+            ]
+
+            if all(factor == 1 for factor in factors):
+                amount_minor.extend(table.amount_minor)
+            else:
+                amount_minor.extend(
+                    minor * factors[code]
+                    for minor, code in zip(table.amount_minor, table.currency_codes)
+                )
+
+        return cls(
+            transaction_ids=transaction_ids,
+            timestamps=timestamps,
+            offset_codes=offset_codes,
+            offsets=list(offsets),
+            vendor_codes=vendor_codes,
+            vendors=list(vendors),
+            raw_vendor_codes=raw_vendor_codes,
+            raw_vendors=list(raw_vendors),
+            currency_codes=currency_codes,
+            currencies=list(currencies),
+            currency_scales=currency_scales,
+            amount_minor=_int_column(amount_minor),
+            amount_exponents=amount_exponents,
+            category_codes=category_codes,
+            categories=list(categories),
+            payment_method_codes=payment_method_codes,
+            payment_methods=list(payment_methods),
+            description_codes=description_codes,
+            descriptions=list(descriptions),
+            negative_zero_rows=frozenset(negative_zero_rows),
+        )
+
+    def vendor(self, row: int) -> str:
+        return self.vendors[self.vendor_codes[row]]
+
+    def currency(self, row: int) -> str:
+        return self.currencies[self.currency_codes[row]]
+
+    def amount(self, row: int) -> Decimal:
+        exponent = self.amount_exponents[row]
+        scale = self.currency_scales[self.currency_codes[row]]
+        units = self.amount_minor[row] // 10 ** (scale + exponent)
+
+        if units == 0 and row in self.negative_zero_rows:
+            return Decimal(f"-0E{exponent}")
+
+        return Decimal(f"{units}E{exponent}")
+
+    def date(self, row: int) -> datetime:
+        instant = EPOCH + timedelta(microseconds=self.timestamps[row])
+        return instant.astimezone(self._timezones[self.offset_codes[row]])
+
+    def transaction(self, row: int) -> Transaction:
+        return Transaction.model_construct(
+            transaction_id=self.transaction_ids[row],
+            date=self.date(row),
+            vendor_raw_name=self.raw_vendors[self.raw_vendor_codes[row]],
+            vendor_normalized_name=self.vendors[self.vendor_codes[row]],
+            amount=self.amount(row),
+            currency=self.currencies[self.currency_codes[row]],
+            category=self.categories[self.category_codes[row]],
+            description=self.descriptions[self.description_codes[row]],
+            payment_method=self.payment_methods[self.payment_method_codes[row]],
+        )
+
+    def to_transactions(self) -> List[Transaction]:
+        return [self.transaction(row) for row in range(len(self))]
+
+    def take(self, rows: Sequence[int]) -> "TransactionTable":
+        """
+        Returns a table holding only `rows`, in the given order.
+
+        Dictionaries and currency scales are shared with this table, so
+        codes and minor-unit amounts stay comparable across both.
+        """
+
+        transaction_ids = self.transaction_ids
+
+        return TransactionTable(
+            transaction_ids=[transaction_ids[row] for row in rows],
+            timestamps=_take(self.timestamps, rows),
+            offset_codes=_take(self.offset_codes, rows),
+            offsets=self.offsets,
+            vendor_codes=_take(self.vendor_codes, rows),
+            vendors=self.vendors,
+            raw_vendor_codes=_take(self.raw_vendor_codes, rows),
+            raw_vendors=self.raw_vendors,
+            currency_codes=_take(self.currency_codes, rows),
+            currencies=self.currencies,
+            currency_scales=self.currency_scales,
+            amount_minor=_take(self.amount_minor, rows),
+            amount_exponents=_take(self.amount_exponents, rows),
+            category_codes=_take(self.category_codes, rows),
+            categories=self.categories,
+            payment_method_codes=_take(self.payment_method_codes, rows),
+            payment_methods=self.payment_methods,
+            description_codes=_take(self.description_codes, rows),
+            descriptions=self.descriptions,
+            negative_zero_rows=frozenset(
+                position
+                for position, row in enumerate(rows)
+                if row in self.negative_zero_rows
+            ) if self.negative_zero_rows else frozenset(),
+        )
+
+    def rename_vendors(self, names: Sequence[str]) -> "TransactionTable":
+        """
+        Returns a table whose vendor i is renamed to `names[i]`. Vendors
+        renamed alike merge into one dictionary entry, in first-occurrence
+        order. Only the vendor column changes; other columns are shared.
+        """
+
+        vendors: Dict[str, int] = {}
+        vendor_codes = array("I", _remap(self.vendor_codes, list(names), vendors))
+
+        return TransactionTable(
+            transaction_ids=self.transaction_ids,
+            timestamps=self.timestamps,
+            offset_codes=self.offset_codes,
+            offsets=self.offsets,
+            vendor_codes=vendor_codes,
+            vendors=list(vendors),
+            raw_vendor_codes=self.raw_vendor_codes,
+            raw_vendors=self.raw_vendors,
+            currency_codes=self.currency_codes,
+            currencies=self.currencies,
+            currency_scales=self.currency_scales,
+            amount_minor=self.amount_minor,
+            amount_exponents=self.amount_exponents,
+            category_codes=self.category_codes,
+            categories=self.categories,
+            payment_method_codes=self.payment_method_codes,
+            payment_methods=self.payment_methods,
+            description_codes=self.description_codes,
+            descriptions=self.descriptions,
+            negative_zero_rows=self.negative_zero_rows,
+        )
+
+
+class TransactionTableBuilder:
+    """
+    Accumulates rows into a TransactionTable.
+
+    Validation mirrors the Transaction model but runs per column: currency
+    codes are checked once per distinct value and strings are interned.
+    A row that fails validation raises before any column is modified.
+    """
+
+    def __init__(self):
+        self._transaction_ids: List[str] = []
+        self._timestamps = array("q")
+        self._offset_codes = array("H")
+        self._vendor_codes = array("I")
+        self._raw_vendor_codes = array("I")
+        self._currency_codes = array("H")
+        self._amount_units: List[int] = []
+        self._amount_exponents = array("i")
+        self._category_codes = array("I")
+        self._payment_method_codes = array("I")
+        self._description_codes = array("I")
+        self._negative_zero_rows = set()
+
+        self._offsets: Dict[timedelta, int] = {}
+        self._vendors: Dict[str, int] = {}
+        self._raw_vendors: Dict[str, int] = {}
+        self._currencies: Dict[str, int] = {}
+        self._currency_scales: List[int] = []
+        self._categories: Dict[Optional[str], int] = {}
+        self._payment_methods: Dict[Optional[str], int] = {}
+        self._descriptions: Dict[Optional[str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self._transaction_ids)
+
+    def append_transaction(self, tx: Transaction):
+        self.append(
+            transaction_id=tx.transaction_id,
+            date=tx.date,
+            vendor_raw_name=tx.vendor_raw_name,
+            vendor_normalized_name=tx.vendor_normalized_name,
+            amount=tx.amount,
+            currency=tx.currency,
+            category=tx.category,
+            description=tx.description,
+            payment_method=tx.payment_method,
+        )
+
+    def append(
+        self,
+        transaction_id: str,
+        date: datetime,
+        vendor_raw_name: str,
+        vendor_normalized_name: str,
+        amount: Decimal,
+        currency: str,
+        category: Optional[str] = None,
+        description: Optional[str] = None,
+        payment_method: Optional[str] = None,
+    ):
+        if not isinstance(transaction_id, str):
+            raise TypeError("Transaction id must be a string.")
+
+        if not isinstance(amount, Decimal):
+            raise TypeError("Amount must be a Decimal.")
+
+        if not amount.is_finite():
+            raise ValueError("Amount must be a finite Decimal.")
+
+        offset = date.utcoffset() if date.tzinfo is not None else None
+        if offset is None:
+            raise ValueError("Datetime must be timezone-aware.")
+
+        currency_code = self._currencies.get(currency)
+        if currency_code is None:
+            if not isinstance(currency, str) or not ISO_CURRENCY_PATTERN.match(currency):
+                raise ValueError("Currency must be a valid ISO 4217 code (e.g., 'USD').")
+            currency_code = len(self._currency_scales)
+            self._currencies[currency] = currency_code
+            self._currency_scales.append(0)
+
+        sign, digits, exponent = amount.as_tuple()
+        units = int("".join(map(str, digits)))
+        if sign:
+            units = -units
+            if units == 0:
+                self._negative_zero_rows.add(len(self._transaction_ids))
+
+        if -exponent > self._currency_scales[currency_code]:
+            self._currency_scales[currency_code] = -exponent
+
+        self._transaction_ids.append(transaction_id)
+        self._timestamps.append((date - EPOCH) // _ONE_MICROSECOND)
+        self._offset_codes.append(_intern(self._offsets, offset))
+        self._vendor_codes.append(_intern(self._vendors, vendor_normalized_name))
+        self._raw_vendor_codes.append(_intern(self._raw_vendors, vendor_raw_name))
+        self._currency_codes.append(currency_code)
+        self._amount_units.append(units)
+        self._amount_exponents.append(exponent)
+        self._category_codes.append(_intern(self._categories, category))
+        self._payment_method_codes.append(_intern(self._payment_methods, payment_method))
+        self._description_codes.append(_intern(self._descriptions, description))
+
+    def build(self) -> TransactionTable:
+        scales = self._currency_scales
+        currency_codes = self._currency_codes
+        exponents = self._amount_exponents
+
+        amount_minor = _int_column(
+            units * 10 ** (scales[currency_codes[row]] + exponents[row])
+            for row, units in enumerate(self._amount_units)
+        )
+
+        return TransactionTable(
+            transaction_ids=self._transaction_ids,
+            timestamps=self._timestamps,
+            offset_codes=self._offset_codes,
+            offsets=list(self._offsets),
+            vendor_codes=self._vendor_codes,
+            vendors=list(self._vendors),
+            raw_vendor_codes=self._raw_vendor_codes,
+            raw_vendors=list(self._raw_vendors),
+            currency_codes=currency_codes,
+            currencies=list(self._currencies),
+            currency_scales=list(scales),
+            amount_minor=amount_minor,
+            amount_exponents=exponents,
+            category_codes=self._category_codes,
+            categories=list(self._categories),
+            payment_method_codes=self._payment_method_codes,
+            payment_methods=list(self._payment_methods),
+            description_codes=self._description_codes,
+            descriptions=list(self._descriptions),
+            negative_zero_rows=frozenset(self._negative_zero_rows),
+        )
+
+
+def _intern(dictionary: Dict, value) -> int:
+    code = dictionary.get(value)
+    if code is None:
+        code = len(dictionary)
+        dictionary[value] = code
+    return code
+
+
+def _code_remap(codes: Sequence[int], values: List, dictionary: Dict) -> List[Optional[int]]:
+    """
+    Maps a table's codes into `dictionary`, interning values in the order
+    they first occur in `codes` (unused dictionary entries map to None).
+    """
+
+    remap: List[Optional[int]] = [None] * len(values)
+
+    for code in dict.fromkeys(codes):
+        remap[code] = _intern(dictionary, values[code])
+
+    return remap
+
+
+def _remap(codes: Sequence[int], values: List, dictionary: Dict) -> List[int]:
+    remap = _code_remap(codes, values, dictionary)
+    return [remap[code] for code in codes]
+
+
+def _take(column: Sequence[int], rows: Sequence[int]) -> Sequence[int]:
+    values = [column[row] for row in rows]
+
+    if isinstance(column, array):
+        return array(column.typecode, values)
+
+    if isinstance(column, memoryview):
+        return array(column.format, values)
+
+    return values
+
+
+def _int_column(values: Iterable[int]) -> Sequence[int]:
+    """
+    Packs integers into a signed 64-bit array, keeping a plain list when
+    an amount exceeds that range so no value is ever truncated.
+    """
+
+    values = list(values)
+
+    try:
+        return array("q", values)
+    except OverflowError:
+        return values
@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 
 
 COMMON_SUFFIXES = [
@@ -11,25 +12,31 @@ COMMON_SUFFIXES = [
     "corporation",
 ]
 
+CACHE_SIZE = 1 << 16
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SUFFIXES = frozenset(COMMON_SUFFIXES)
+
 
 class VendorNormalizer:
 
     @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
     def normalize(name: str) -> str:
+        """
+        Memoized: ledgers repeat a small set of raw names many times, so
+        each distinct name is normalized once.
+        """
+
         if not name:
             raise ValueError("Vendor name cannot be empty.")
 
         normalized = name.lower()
 
         # Remove punctuation
-        normalized = re.sub(r"[^\w\s]", "", normalized)
-
-        # Remove common corporate suffixes
-        tokens = normalized.split()
-        tokens = [t for t in tokens if t not in COMMON_SUFFIXES]
+        normalized = _PUNCTUATION.sub("", normalized)
 
-        # Collapse spaces
-        normalized = " ".join(tokens)
-        normalized = re.sub(r"\s+", " ", normalized)
+        # Remove common corporate suffixes; split() also collapses spaces
+        tokens = [t for t in normalized.split() if t not in _SUFFIXES]
 
-        return normalized.strip()
+        return " ".join(tokens)
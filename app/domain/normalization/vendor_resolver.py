@@ -0,0 +1,71 @@
+from typing import Dict, List, Sequence
+
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.normalization.vendor_similarity import MinHashBlocker, VendorSimilarityIndex
+
+
+class VendorResolver:
+    """
+    Entity resolution: maps vendor names to canonical vendor ids before
+    detection, so "Acme Corp", "ACME Corporation" and "Acme, Inc." are
+    analyzed as one vendor.
+
+    Work is per distinct name, never per row: names are canonicalized by
+    the memoized `VendorNormalizer.normalize`, candidate pairs come from
+    the MinHash blocking index and are verified against
+    `similarity_threshold`. Clustering is greedy in first-occurrence
+    order: a name joins the cluster of the earliest similar name whose
+    representative it is also similar to, so clusters never chain through
+    intermediate names. The canonical id is the representative's
+    canonical name.
+    """
+
+    VERSION = "1.0.0"
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.85,
+        minhash_permutations: int = 32,
+        minhash_bands: int = 8,
+    ):
+        if not 0 < similarity_threshold <= 1:
+            raise ValueError("similarity_threshold must be in (0, 1].")
+
+        self.similarity_threshold = similarity_threshold
+        self.minhash_permutations = minhash_permutations
+        self.minhash_bands = minhash_bands
+
+    def resolve(self, vendors: Sequence[str]) -> List[str]:
+        """
+        Canonical vendor id for each of `vendors`.
+        """
+
+        index = VendorSimilarityIndex(
+            vendors,
+            self.similarity_threshold,
+            MinHashBlocker(self.minhash_permutations, self.minhash_bands),
+        )
+
+        neighbours: Dict[int, List[int]] = {}
+
+        for left, right in index.name_pairs:
+            neighbours.setdefault(right, []).append(left)
+
+        representatives = list(range(len(index.names)))
+
+        for name in range(len(index.names)):
+            for earlier in sorted(neighbours.get(name, ())):
+                representative = representatives[earlier]
+
+                if index.name_similarity(name, representative) >= self.similarity_threshold:
+                    representatives[name] = representative
+                    break
+
+        return [index.names[representatives[name]] for name in index.vendor_names]
+
+    def resolve_table(self, table: TransactionTable) -> TransactionTable:
+        """
+        The table with its vendor column rewritten to canonical ids.
+        Raw vendor names are kept.
+        """
+        return table.rename_vendors(self.resolve(table.vendors))
@@ -0,0 +1,219 @@
+import re
+import zlib
+from typing import Dict, FrozenSet, Hashable, List, Optional, Sequence, Set, Tuple
+
+from app.domain.normalization.vendor_normalizer import VendorNormalizer
+
+
+NGRAM_SIZE = 3
+
+_DIGITS = re.compile(r"\d+")
+
+# Universal hashing over a Mersenne prime; coefficients are fixed so
+# signatures (and therefore blocks) are identical in every run.
+_PRIME = (1 << 61) - 1
+_SEED = 0x5EED
+
+
+def canonical_vendor(name: str) -> str:
+    """
+    `VendorNormalizer.normalize`, or the name itself when nothing is left
+    after normalization (e.g. a name made of punctuation only).
+    """
+
+    try:
+        return VendorNormalizer.normalize(name) or name
+    except ValueError:
+        return name
+
+
+def vendor_ngrams(name: str, size: int = NGRAM_SIZE) -> FrozenSet[str]:
+    padded = f" {name} "
+
+    if len(padded) <= size:
+        return frozenset([padded])
+
+    return frozenset(padded[i:i + size] for i in range(len(padded) - size + 1))
+
+
+def numeric_tokens(name: str) -> Tuple[str, ...]:
+    """
+    Digit runs of a name (store numbers, account suffixes). Names that
+    differ in them are distinct payees however similar the rest is.
+    """
+    return tuple(_DIGITS.findall(name))
+
+
+def jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+class MinHashBlocker:
+    """
+    Locality-sensitive blocking of names by n-gram MinHash signatures.
+
+    Signatures of `permutations` values are cut into `bands`; names that
+    agree on a whole band share a bucket and become candidate pairs. A pair
+    with Jaccard similarity s is a candidate with probability
+    1 - (1 - s ** rows) ** bands, so only a small fraction of all pairs is
+    ever compared.
+
+    Buckets larger than `max_bucket_size` are skipped: they stem from
+    n-grams shared by a large part of the names and carry no signal.
+    """
+
+    def __init__(self, permutations: int = 32, bands: int = 8, max_bucket_size: int = 100):
+        if permutations < 1 or bands < 1 or permutations % bands:
+            raise ValueError("permutations must be a positive multiple of bands.")
+
+        self.permutations = permutations
+        self.bands = bands
+        self.rows = permutations // bands
+        self.max_bucket_size = max_bucket_size
+
+        self._coefficients = [
+            (
+                zlib.crc32(f"a{i}".encode(), _SEED) | 1,
+                zlib.crc32(f"b{i}".encode(), _SEED),
+            )
+            for i in range(permutations)
+        ]
+
+        # n-gram -> its hash under every permutation; names share most
+        # n-grams, so each is hashed once per blocker
+        self._ngram_hashes: Dict[str, Tuple[int, ...]] = {}
+
+    def signature(self, ngrams: FrozenSet[str]) -> Tuple[int, ...]:
+        return tuple(map(min, zip(*map(self._hashes, ngrams))))
+
+    def _hashes(self, ngram: str) -> Tuple[int, ...]:
+        hashes = self._ngram_hashes.get(ngram)
+
+        if hashes is None:
+            value = zlib.crc32(ngram.encode("utf-8"))
+            hashes = self._ngram_hashes[ngram] = tuple(
+                (a * value + b) % _PRIME for a, b in self._coefficients
+            )
+
+        return hashes
+
+    def candidate_pairs(
+        self,
+        ngram_sets: Sequence[FrozenSet[str]],
+        partitions: Optional[Sequence[Hashable]] = None,
+    ) -> Set[Tuple[int, int]]:
+        """
+        Position pairs (i < j) sharing at least one band bucket. When
+        `partitions` is given, only positions with equal partition keys
+        can share a bucket.
+        """
+
+        buckets: Dict[Tuple, List[int]] = {}
+
+        for position, ngrams in enumerate(ngram_sets):
+            signature = self.signature(ngrams)
+            partition = partitions[position] if partitions is not None else None
+
+            for band in range(self.bands):
+                key = (partition, band, signature[band * self.rows:(band + 1) * self.rows])
+                buckets.setdefault(key, []).append(position)
+
+        pairs = set()
+
+        for members in buckets.values():
+            if len(members) > self.max_bucket_size:
+                continue
+
+            for i, left in enumerate(members):
+                for right in members[i + 1:]:
+                    pairs.add((left, right))
+
+        return pairs
+
+
+class VendorSimilarityIndex:
+    """
+    Which vendors of `vendors` are similar enough to be treated as one
+    payee: identical canonical names, or canonical names with the same
+    numeric tokens whose n-gram Jaccard similarity is at least `threshold`.
+    Candidate name pairs come from MinHash blocking (partitioned by numeric
+    tokens) and are verified exactly, so no pair of dissimilar names is
+    ever reported, and all-pairs comparison is avoided.
+    """
+
+    def __init__(
+        self,
+        vendors: Sequence[str],
+        threshold: float,
+        blocker: MinHashBlocker,
+    ):
+        name_ids: Dict[str, int] = {}
+        self.vendor_names = [
+            name_ids.setdefault(canonical_vendor(vendor), len(name_ids))
+            for vendor in vendors
+        ]
+        self.names = list(name_ids)
+
+        ngram_sets = [vendor_ngrams(name) for name in self.names]
+        partitions = [numeric_tokens(name) for name in self.names]
+
+        self.name_pairs: Dict[Tuple[int, int], float] = {}
+
+        for left, right in sorted(blocker.candidate_pairs(ngram_sets, partitions)):
+            similarity = jaccard(ngram_sets[left], ngram_sets[right])
+
+            if similarity >= threshold:
+                self.name_pairs[(left, right)] = similarity
+
+    def similarity(self, left: int, right: int) -> float:
+        """
+        Similarity of two vendor positions, 0.0 when not similar.
+        """
+
+        return self.name_similarity(self.vendor_names[left], self.vendor_names[right])
+
+    def name_similarity(self, left: int, right: int) -> float:
+        """
+        Similarity of two canonical name ids, 0.0 when not similar.
+        """
+
+        if left == right:
+            return 1.0
+
+        return self.name_pairs.get((min(left, right), max(left, right)), 0.0)
+
+    def blocks(self) -> List[List[int]]:
+        """
+        Vendor positions grouped into connected components of similar
+        names, in first-occurrence order. Similarity is not transitive,
+        so callers still check `similarity` for each pair in a block.
+        """
+
+        parent = list(range(len(self.vendor_names)))
+
+        def find(position: int) -> int:
+            while parent[position] != position:
+                parent[position] = parent[parent[position]]
+                position = parent[position]
+            return position
+
+        name_roots: Dict[int, int] = {}
+
+        for position, name in enumerate(self.vendor_names):
+            root = name_roots.setdefault(name, position)
+            parent[find(position)] = find(root)
+
+        for left_name, right_name in self.name_pairs:
+            left = find(name_roots[left_name])
+            right = find(name_roots[right_name])
+            if left != right:
+                parent[max(left, right)] = min(left, right)
+
+        blocks: Dict[int, List[int]] = {}
+
+        for position in range(len(self.vendor_names)):
+            blocks.setdefault(find(position), []).append(position)
+
+        return list(blocks.values())
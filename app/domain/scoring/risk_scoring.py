@@ -1,5 +1,5 @@
 from decimal import Decimal
-from typing import List, Dict
+from typing import Dict, List, Optional, Sequence, Set
 from collections import defaultdict
 
 from app.domain.models.detection_result import DetectionResult
@@ -26,49 +26,131 @@ class RiskScoringEngine:
         total_spend_by_currency: Dict[str, Decimal],
     ) -> Dict:
 
-        vendor_totals = defaultdict(lambda: defaultdict(Decimal))
-        currency_totals = defaultdict(Decimal)
-        updated_detections = []
+        scored = self.score_columns(
+            vendors=[d.supporting_evidence.get("vendor") for d in detections],
+            currencies=[d.currency for d in detections],
+            impacts=[d.financial_impact_estimate for d in detections],
+            total_spend_by_currency=total_spend_by_currency,
+        )
 
-        total_company_spend = sum(total_spend_by_currency.values())
+        # Each retained detection is copied exactly once, with its final severity
+        updated_detections = [
+            detections[position].model_copy(update={"risk_severity": severity})
+            for position, severity in zip(scored["positions"], scored["severities"])
+        ]
 
-        # First pass: apply base severity + aggregate vendor totals
-        for detection in detections:
+        return {
+            "scoring_version": self.VERSION,
+            "updated_detections": updated_detections,
+            "vendor_totals": scored["vendor_totals"],
+            "currency_totals": scored["currency_totals"],
+            "summary": scored["summary"],
+        }
 
-            impact = detection.financial_impact_estimate
+    def score_columns(
+        self,
+        vendors: Sequence[Optional[str]],
+        currencies: Sequence[str],
+        impacts: Sequence[Decimal],
+        total_spend_by_currency: Dict[str, Decimal],
+    ) -> Dict:
+        """
+        Batch scoring over detections in columnar form.
+
+        Returns the positions of retained detections (positive impact) with
+        their final severities, plus vendor/currency aggregates and summary.
+        No DetectionResult objects are created or copied.
+        """
+
+        vendor_totals = defaultdict(lambda: defaultdict(Decimal))
+        vendor_positions = defaultdict(list)
+
+        positions = []
+        severities = []
+
+        # First pass: base severity + vendor -> detection index + aggregates
+        for position, (vendor, currency, impact) in enumerate(
+            zip(vendors, currencies, impacts)
+        ):
 
             if impact <= Decimal("0"):
                 continue
 
-            currency = detection.currency
+            if vendor is not None:
+                vendor_positions[vendor].append(len(positions))
 
-            base_severity = self._determine_severity(impact)
+            positions.append(position)
+            severities.append(self._determine_severity(impact))
 
-            normalized = detection.model_copy(
-                update={"risk_severity": base_severity}
-            )
+            vendor_key = vendor if vendor is not None else "unknown"
 
-            updated_detections.append(normalized)
+            vendor_totals[vendor_key][currency] += impact
 
-            vendor = normalized.supporting_evidence.get("vendor", "unknown")
+        # Second pass: vendor-level materiality escalation via the index
+        for vendor in self.escalated_vendors(vendor_totals, total_spend_by_currency):
+            for index in vendor_positions.get(vendor, ()):
+                severities[index] = RiskSeverity.HIGH
 
-            vendor_totals[vendor][currency] += impact
-            currency_totals[currency] += impact
+        return {
+            "scoring_version": self.VERSION,
+            "positions": positions,
+            "severities": severities,
+            **self.summarize(vendor_totals, total_spend_by_currency),
+        }
+
+    def escalated_vendors(
+        self,
+        vendor_totals: Dict[str, Dict[str, Decimal]],
+        total_spend_by_currency: Dict[str, Decimal],
+    ) -> Set[str]:
+        """
+        Vendors whose flagged total reaches the materiality threshold of
+        total company spend; all their detections are HIGH severity.
+        """
+
+        total_company_spend = sum(total_spend_by_currency.values())
+
+        if total_company_spend <= Decimal("0"):
+            return set()
 
-        # Second pass: vendor-level materiality escalation
-        if total_company_spend > Decimal("0"):
-            for vendor, currency_map in vendor_totals.items():
+        return {
+            vendor
+            for vendor, currency_map in vendor_totals.items()
+            if sum(currency_map.values()) / total_company_spend
+            >= self.materiality_escalation_threshold
+        }
 
-                vendor_total_flagged = sum(currency_map.values())
-                vendor_ratio = vendor_total_flagged / total_company_spend
+    def score_vendor(self, detections: List[DetectionResult], escalated: bool) -> List[DetectionResult]:
+        """
+        One vendor's retained detections (positive impact) with their final
+        severities, as `score` assigns them. Used by the incremental engine
+        to rescore a single vendor.
+        """
+
+        return [
+            detection.model_copy(update={
+                "risk_severity": RiskSeverity.HIGH if escalated
+                else self._determine_severity(detection.financial_impact_estimate)
+            })
+            for detection in detections
+            if detection.financial_impact_estimate > Decimal("0")
+        ]
+
+    def summarize(
+        self,
+        vendor_totals: Dict[str, Dict[str, Decimal]],
+        total_spend_by_currency: Dict[str, Decimal],
+    ) -> Dict:
+        """
+        Sorted vendor and currency flagged totals and the per-currency
+        summary, from per-vendor flagged totals alone.
+        """
 
-                if vendor_ratio >= self.materiality_escalation_threshold:
+        currency_totals = defaultdict(Decimal)
 
-                    for i, detection in enumerate(updated_detections):
-                        if detection.supporting_evidence.get("vendor") == vendor:
-                            updated_detections[i] = detection.model_copy(
-                                update={"risk_severity": RiskSeverity.HIGH}
-                            )
+        for currency_map in vendor_totals.values():
+            for currency, amount in currency_map.items():
+                currency_totals[currency] += amount
 
         # Deterministic ordering of aggregates
         sorted_vendor_totals = {
@@ -84,8 +166,6 @@ class RiskScoringEngine:
         )
 
         return {
-            "scoring_version": self.VERSION,
-            "updated_detections": updated_detections,
             "vendor_totals": sorted_vendor_totals,
             "currency_totals": sorted_currency_totals,
             "summary": summary,
@@ -1,6 +1,7 @@
 import hashlib
 from typing import List
 from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable
 
 
 def generate_dataset_hash(transactions: List[Transaction]) -> str:
@@ -18,3 +19,22 @@ def generate_dataset_hash(transactions: List[Transaction]) -> str:
         hasher.update(str(tx.currency).encode())
 
     return hasher.hexdigest()
+
+
+def generate_table_hash(table: TransactionTable) -> str:
+    """
+    Columnar counterpart of `generate_dataset_hash`; yields the same digest.
+    """
+
+    hasher = hashlib.sha256()
+
+    transaction_ids = table.transaction_ids
+
+    for row in sorted(range(len(table)), key=transaction_ids.__getitem__):
+        hasher.update(str(transaction_ids[row]).encode())
+        hasher.update(str(table.date(row)).encode())
+        hasher.update(str(table.vendor(row)).encode())
+        hasher.update(str(table.amount(row)).encode())
+        hasher.update(str(table.currency(row)).encode())
+
+    return hasher.hexdigest()
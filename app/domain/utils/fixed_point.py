@@ -0,0 +1,71 @@
+from decimal import Decimal, getcontext
+from itertools import compress
+from typing import Optional
+
+from app.domain.models.transaction_table import TransactionTable
+
+
+def fixed_point_sum(
+    minor_total: int,
+    minor_abs_total: int,
+    scale: int,
+    min_exponent: int,
+) -> Optional[Decimal]:
+    """
+    The Decimal that `sum()` (starting from 0) returns over amounts given
+    as integer minor units at `scale`, from their total, absolute total
+    and smallest original exponent.
+
+    Exact Decimal addition yields the smallest exponent of its operands
+    (0 for the starting zero), so the result is the integer total at that
+    exponent. Returns None when an intermediate sum could exceed the
+    context precision, i.e. when Decimal would have rounded; callers then
+    fall back to Decimal arithmetic.
+    """
+
+    exponent = min(0, min_exponent)
+    shift = scale + exponent
+
+    if shift >= 0:
+        units = minor_total // 10 ** shift
+        bound = minor_abs_total // 10 ** shift
+    else:
+        units = minor_total * 10 ** -shift
+        bound = minor_abs_total * 10 ** -shift
+
+    if bound >= 10 ** getcontext().prec:
+        return None
+
+    return Decimal(f"{units}E{exponent}")
+
+
+def currency_total(table: TransactionTable, currency_code: int) -> Decimal:
+    """
+    Exactly `sum(table.amount(row))` over the rows in `currency_code`,
+    computed on the integer minor-unit column.
+    """
+
+    if len(table.currencies) == 1:
+        minor = table.amount_minor
+        exponents = table.amount_exponents
+    else:
+        minor = list(compress(table.amount_minor, map(currency_code.__eq__, table.currency_codes)))
+        exponents = compress(table.amount_exponents, map(currency_code.__eq__, table.currency_codes))
+
+    total = fixed_point_sum(
+        sum(minor),
+        sum(map(abs, minor)),
+        table.currency_scales[currency_code],
+        min(exponents, default=0),
+    )
+
+    if total is not None:
+        return total
+
+    total = Decimal("0")
+
+    for row, code in enumerate(table.currency_codes):
+        if code == currency_code:
+            total += table.amount(row)
+
+    return total
@@ -0,0 +1,259 @@
+import hashlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable
+
+
+FINGERPRINT_VERSION = "1"
+
+_MODULUS = 2 ** 256
+_FIELD_SEPARATOR = "\x1f"
+
+
+def row_digest(
+    transaction_id: str,
+    date: datetime,
+    vendor: str,
+    amount: Decimal,
+    currency: str,
+) -> int:
+    """
+    SHA-256 of the same five fields `generate_dataset_hash` covers, as an
+    integer so digests can be summed.
+    """
+
+    material = _FIELD_SEPARATOR.join((
+        str(transaction_id),
+        str(date),
+        str(vendor),
+        str(amount),
+        str(currency),
+    ))
+
+    return int.from_bytes(hashlib.sha256(material.encode()).digest(), "big")
+
+
+def period_key(date: datetime) -> str:
+    """
+    Calendar month of the transaction's local date, e.g. "2024-03".
+    """
+    return f"{date.year:04d}-{date.month:02d}"
+
+
+class DatasetFingerprint:
+    """
+    Order-independent, streaming dataset fingerprint.
+
+    Each row is hashed once. Row digests are added modulo 2**256 into a
+    leaf per (vendor, calendar month), together with a row count, so rows
+    can arrive in any order, in any number of passes or in parallel
+    ranges (`merge`). Leaves are hashed into a root per vendor, and vendor
+    roots into the dataset root. Only the vendor roots touched since the
+    last read are recomputed.
+
+    Comparing two fingerprints (`diff`) shows which vendors and months
+    differ without rereading either dataset. This fingerprint detects
+    changes; it is not a substitute for `dataset_hash`, which remains the
+    output and cache key.
+    """
+
+    def __init__(self):
+        # vendor -> period -> [row count, digest sum]
+        self._leaves: Dict[str, Dict[str, List[int]]] = {}
+        self._vendor_roots: Dict[str, str] = {}
+        self.rows = 0
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Transaction]) -> "DatasetFingerprint":
+        fingerprint = cls()
+        fingerprint.update(transactions)
+        return fingerprint
+
+    @classmethod
+    def from_table(cls, table: TransactionTable) -> "DatasetFingerprint":
+        fingerprint = cls()
+        fingerprint.update_table(table)
+        return fingerprint
+
+    def add(
+        self,
+        transaction_id: str,
+        date: datetime,
+        vendor: str,
+        amount: Decimal,
+        currency: str,
+    ):
+        self.add_leaf(
+            vendor,
+            period_key(date),
+            1,
+            row_digest(transaction_id, date, vendor, amount, currency),
+        )
+
+    def update(self, transactions: Iterable[Transaction]):
+        for tx in transactions:
+            self.add(tx.transaction_id, tx.date, tx.vendor_normalized_name, tx.amount, tx.currency)
+
+    def update_table(self, table: TransactionTable):
+        transaction_ids = table.transaction_ids
+
+        for row in range(len(table)):
+            self.add(
+                transaction_ids[row],
+                table.date(row),
+                table.vendor(row),
+                table.amount(row),
+                table.currency(row),
+            )
+
+    def merge(self, other: "DatasetFingerprint"):
+        """
+        Adds every row of `other`; used to combine fingerprints computed
+        over separate parts of one dataset.
+        """
+
+        for leaf in other.leaves():
+            self.add_leaf(*leaf)
+
+    def root(self) -> str:
+        hasher = hashlib.sha256(f"vle-fingerprint:{FINGERPRINT_VERSION}".encode())
+
+        for vendor, vendor_root in self.vendor_roots().items():
+            hasher.update(_length_prefixed(vendor))
+            hasher.update(bytes.fromhex(vendor_root))
+
+        return hasher.hexdigest()
+
+    def vendor_roots(self) -> Dict[str, str]:
+        """
+        Root digest per vendor, sorted by vendor.
+        """
+
+        for vendor in self._leaves.keys() - self._vendor_roots.keys():
+            self._vendor_roots[vendor] = self._vendor_root(vendor)
+
+        return {vendor: self._vendor_roots[vendor] for vendor in sorted(self._vendor_roots)}
+
+    def period_digests(self, vendor: str) -> Dict[str, str]:
+        """
+        Leaf digest per calendar month of `vendor`, sorted by month.
+        """
+
+        periods = self._leaves.get(vendor, {})
+
+        return {
+            period: _leaf_digest(period, *periods[period])
+            for period in sorted(periods)
+        }
+
+    def diff(self, other: "DatasetFingerprint") -> Dict:
+        """
+        Vendor partitions that differ from `self` (the baseline) to `other`.
+        For changed vendors, lists the months added, removed or changed.
+        """
+
+        before = self.vendor_roots()
+        after = other.vendor_roots()
+
+        changed_vendors = {}
+
+        for vendor in sorted(before.keys() & after.keys()):
+            if before[vendor] == after[vendor]:
+                continue
+
+            old_periods = self.period_digests(vendor)
+            new_periods = other.period_digests(vendor)
+
+            changed_vendors[vendor] = {
+                "added_periods": sorted(new_periods.keys() - old_periods.keys()),
+                "removed_periods": sorted(old_periods.keys() - new_periods.keys()),
+                "changed_periods": sorted(
+                    period for period in old_periods.keys() & new_periods.keys()
+                    if old_periods[period] != new_periods[period]
+                ),
+            }
+
+        return {
+            "identical": self.root() == other.root(),
+            "added_vendors": sorted(after.keys() - before.keys()),
+            "removed_vendors": sorted(before.keys() - after.keys()),
+            "changed_vendors": changed_vendors,
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "fingerprint_version": FINGERPRINT_VERSION,
+            "root": self.root(),
+            "rows": self.rows,
+            "vendors": {
+                vendor: {
+                    "root": vendor_root,
+                    "periods": {
+                        period: [count, f"{digest_sum:064x}"]
+                        for period, (count, digest_sum) in sorted(self._leaves[vendor].items())
+                    },
+                }
+                for vendor, vendor_root in self.vendor_roots().items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DatasetFingerprint":
+        if data.get("fingerprint_version") != FINGERPRINT_VERSION:
+            raise ValueError("Unsupported fingerprint version.")
+
+        fingerprint = cls()
+
+        for vendor, entry in data["vendors"].items():
+            for period, (count, digest_sum) in entry["periods"].items():
+                fingerprint.add_leaf(vendor, period, count, int(digest_sum, 16))
+
+        return fingerprint
+
+    def leaves(self) -> Iterator[Tuple[str, str, int, int]]:
+        """
+        (vendor, period, row count, digest sum) for every leaf.
+        """
+
+        for vendor, periods in self._leaves.items():
+            for period, (count, digest_sum) in periods.items():
+                yield vendor, period, count, digest_sum
+
+    def add_leaf(self, vendor: str, period: str, count: int, digest_sum: int):
+        periods = self._leaves.get(vendor)
+
+        if periods is None:
+            periods = self._leaves[vendor] = {}
+
+        leaf = periods.get(period)
+
+        if leaf is None:
+            periods[period] = [count, digest_sum % _MODULUS]
+        else:
+            leaf[0] += count
+            leaf[1] = (leaf[1] + digest_sum) % _MODULUS
+
+        self._vendor_roots.pop(vendor, None)
+        self.rows += count
+
+    def _vendor_root(self, vendor: str) -> str:
+        hasher = hashlib.sha256(_length_prefixed(vendor))
+
+        for period, digest in self.period_digests(vendor).items():
+            hasher.update(bytes.fromhex(digest))
+
+        return hasher.hexdigest()
+
+
+def _leaf_digest(period: str, count: int, digest_sum: int) -> str:
+    return hashlib.sha256(
+        f"{period}:{count}:{digest_sum:064x}".encode()
+    ).hexdigest()
+
+
+def _length_prefixed(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return len(encoded).to_bytes(8, "big") + encoded
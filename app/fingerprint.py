@@ -0,0 +1,69 @@
+import sys
+import argparse
+import json
+
+from app.ingestion.csv_loader import iter_csv, load_csv_table
+from app.ingestion.snapshot import is_snapshot, open_snapshot
+from app.domain.utils.merkle_fingerprint import DatasetFingerprint
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.fingerprint")
+    parser.add_argument("file_path", help="Transactions CSV or snapshot")
+    parser.add_argument(
+        "compare_path",
+        nargs="?",
+        default=None,
+        help="Second dataset; prints the vendor partitions that changed",
+    )
+    parser.add_argument("--timezone", default="UTC", help="Timezone for naive CSV dates")
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=1,
+        help="Processes used to parse a CSV; above 1 the parsed table is held in memory",
+    )
+    parser.add_argument(
+        "--vendors",
+        action="store_true",
+        help="Include per-vendor roots and month leaves in the output",
+    )
+    args = parser.parse_args(argv)
+
+    fingerprint = _fingerprint(args.file_path, args.timezone, args.parse_workers)
+
+    if args.compare_path is None:
+        output = fingerprint.to_dict()
+        if not args.vendors:
+            output.pop("vendors")
+    else:
+        other = _fingerprint(args.compare_path, args.timezone, args.parse_workers)
+        output = {
+            "before": fingerprint.root(),
+            "after": other.root(),
+            **fingerprint.diff(other),
+        }
+
+    json.dump(output, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+def _fingerprint(path: str, timezone: str, workers: int) -> DatasetFingerprint:
+    if is_snapshot(path):
+        return DatasetFingerprint.from_table(open_snapshot(path).table)
+
+    fingerprint = DatasetFingerprint()
+
+    if workers > 1:
+        load_csv_table(path, timezone, workers, fingerprint=fingerprint)
+        return fingerprint
+
+    # Rows are added chunk by chunk; only one chunk is alive at a time
+    for _ in iter_csv(path, timezone, fingerprint=fingerprint):
+        pass
+
+    return fingerprint
+
+
+if __name__ == "__main__":
+    main()
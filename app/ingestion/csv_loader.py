@@ -1,10 +1,17 @@
 import csv
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal, InvalidOperation
 from datetime import datetime
-from typing import List
+from itertools import repeat
+from typing import Dict, Iterator, List, Optional, Tuple
 import pytz
 
 from app.domain.models.transaction import Transaction
+from app.domain.models.transaction_table import TransactionTable, TransactionTableBuilder
+from app.domain.utils.merkle_fingerprint import DatasetFingerprint
 
 
 EXPECTED_HEADERS = {
@@ -18,41 +25,360 @@ EXPECTED_HEADERS = {
     "payment_method",
 }
 
+DEFAULT_CHUNK_SIZE = 50_000
+
+DEFAULT_RANGE_BYTES = 32 * 1024 * 1024
+
+MAX_SKIPPED_SAMPLES = 100
+
+_SCAN_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+class IngestionStats:
+    """
+    Row accounting for one load: records read, loaded and skipped, skip
+    counts per error type and the first skipped record numbers (1-based,
+    header excluded). Parallel loads merge per-range stats in file order,
+    so the result equals a serial load.
+    """
+
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_loaded = 0
+        self.rows_skipped = 0
+        self.skip_reasons: Dict[str, int] = {}
+        self.skipped_records: List[int] = []
+        self.byte_ranges = 1
+
+    def record_loaded(self):
+        self.rows_read += 1
+        self.rows_loaded += 1
+
+    def record_skipped(self, error: Exception):
+        self.rows_read += 1
+        self.rows_skipped += 1
+
+        reason = error.__class__.__name__
+        self.skip_reasons[reason] = self.skip_reasons.get(reason, 0) + 1
+
+        if len(self.skipped_records) < MAX_SKIPPED_SAMPLES:
+            self.skipped_records.append(self.rows_read)
+
+    def merge(self, other: "IngestionStats"):
+        room = MAX_SKIPPED_SAMPLES - len(self.skipped_records)
+        self.skipped_records.extend(
+            self.rows_read + record for record in other.skipped_records[:room]
+        )
+
+        self.rows_read += other.rows_read
+        self.rows_loaded += other.rows_loaded
+        self.rows_skipped += other.rows_skipped
+
+        for reason, count in other.skip_reasons.items():
+            self.skip_reasons[reason] = self.skip_reasons.get(reason, 0) + count
+
+    def to_dict(self) -> Dict:
+        return {
+            "rows_read": self.rows_read,
+            "rows_loaded": self.rows_loaded,
+            "rows_skipped": self.rows_skipped,
+            "skip_reasons": dict(sorted(self.skip_reasons.items())),
+            "skipped_records": self.skipped_records,
+            "byte_ranges": self.byte_ranges,
+        }
+
+
+def load_csv(
+    file_path: str,
+    timezone: str = "UTC",
+    workers: int = 1,
+    stats: Optional[IngestionStats] = None,
+) -> List[Transaction]:
+    """
+    With `workers` > 1 the file is parsed in parallel (see
+    `load_csv_table`) and rows are restored from the merged table.
+    """
+
+    if workers > 1:
+        return load_csv_table(file_path, timezone, workers, stats=stats).to_transactions()
 
-def load_csv(file_path: str, timezone: str = "UTC") -> List[Transaction]:
     transactions: List[Transaction] = []
 
+    for chunk in iter_csv(file_path, timezone=timezone, stats=stats):
+        transactions.extend(chunk)
+
+    return transactions
+
+
+def iter_csv(
+    file_path: str,
+    timezone: str = "UTC",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stats: Optional[IngestionStats] = None,
+    fingerprint: Optional[DatasetFingerprint] = None,
+) -> Iterator[List[Transaction]]:
+    """
+    Streams the CSV as consecutive chunks of at most `chunk_size` transactions.
+
+    Rows are yielded in file order and malformed rows are skipped exactly as
+    in `load_csv`, so concatenating the chunks reproduces its result. Loaded
+    rows are added to `fingerprint` when given.
+    """
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer.")
+
     tz = pytz.timezone(timezone)
 
+    if stats is None:
+        stats = IngestionStats()
+
     with open(file_path, newline="", encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
 
         if not EXPECTED_HEADERS.issubset(set(reader.fieldnames or [])):
             raise ValueError("CSV headers do not match expected schema.")
 
+        chunk: List[Transaction] = []
+
         for row in reader:
             try:
-                amount = Decimal(row["amount"])
-
-                parsed_date = datetime.fromisoformat(row["date"])
-                if parsed_date.tzinfo is None:
-                    parsed_date = tz.localize(parsed_date)
-
-                transaction = Transaction(
-                    transaction_id=row["transaction_id"],
-                    date=parsed_date,
-                    vendor_raw_name=row["vendor_name"],
-                    vendor_normalized_name=row["vendor_name"].strip().lower(),
-                    amount=amount,
-                    currency=row["currency"].upper(),
-                    category=row.get("category"),
-                    description=row.get("description"),
-                    payment_method=row.get("payment_method"),
+                transaction = Transaction(**_parse_fields(row, tz))
+            except (InvalidOperation, ValueError, TypeError) as e:
+                stats.record_skipped(e)
+                continue  # Skip malformed rows for now
+
+            stats.record_loaded()
+            chunk.append(transaction)
+
+            if fingerprint is not None:
+                fingerprint.add(
+                    transaction.transaction_id,
+                    transaction.date,
+                    transaction.vendor_normalized_name,
+                    transaction.amount,
+                    transaction.currency,
                 )
 
-                transactions.append(transaction)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
 
-            except (InvalidOperation, ValueError, TypeError):
-                continue  # Skip malformed rows for now
+        if chunk:
+            yield chunk
 
-    return transactions
+
+def load_csv_table(
+    file_path: str,
+    timezone: str = "UTC",
+    workers: int = 1,
+    range_bytes: int = DEFAULT_RANGE_BYTES,
+    stats: Optional[IngestionStats] = None,
+    fingerprint: Optional[DatasetFingerprint] = None,
+) -> TransactionTable:
+    """
+    Loads the CSV straight into a columnar TransactionTable.
+
+    No per-row Transaction objects are created; the builder validates each
+    column instead. Rows accepted and skipped match `load_csv` exactly.
+
+    With `workers` > 1 the data is split into byte ranges of about
+    `range_bytes` at record boundaries, parsed in a process pool and the
+    per-range tables concatenated in file order, so the result is
+    identical to a serial load.
+
+    Loaded rows are added to `fingerprint` when given; parallel loads
+    fingerprint each range in its worker and merge the results.
+    """
+
+    if workers < 1:
+        raise ValueError("workers must be a positive integer.")
+
+    if stats is None:
+        stats = IngestionStats()
+
+    tz = pytz.timezone(timezone)
+
+    with open(file_path, newline="", encoding="utf-8") as csvfile:
+        reader = csv.DictReader(csvfile)
+
+        if not EXPECTED_HEADERS.issubset(set(reader.fieldnames or [])):
+            raise ValueError("CSV headers do not match expected schema.")
+
+        if workers == 1:
+            return _parse_table(reader, tz, stats, fingerprint)
+
+        fieldnames = reader.fieldnames
+
+    ranges = split_record_ranges(file_path, range_bytes)
+
+    if len(ranges) < 2:
+        with open(file_path, newline="", encoding="utf-8") as csvfile:
+            return _parse_table(csv.DictReader(csvfile), tz, stats, fingerprint)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+        results = list(pool.map(
+            _parse_range,
+            repeat(file_path),
+            repeat(fieldnames),
+            repeat(timezone),
+            ranges,
+            repeat(fingerprint is not None),
+        ))
+
+    for _, range_stats, range_fingerprint in results:
+        stats.merge(range_stats)
+
+        if fingerprint is not None:
+            fingerprint.merge(range_fingerprint)
+
+    stats.byte_ranges = len(ranges)
+
+    return TransactionTable.concat([table for table, _, _ in results])
+
+
+def split_record_ranges(file_path: str, range_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Splits the data section (after the header record) into byte ranges of
+    roughly `range_bytes` that start and end on record boundaries.
+
+    A newline ends a record only when the number of quote characters
+    before it is even, so quoted fields with embedded newlines never
+    straddle two ranges (CSV escapes quotes by doubling them, which keeps
+    the parity intact). Quote and newline bytes never occur inside
+    multi-byte UTF-8 sequences, so byte offsets are safe split points.
+    Assumes standard quoting: a bare quote inside an unquoted field can
+    shift the parity and misplace a split.
+    """
+
+    if range_bytes < 1:
+        raise ValueError("range_bytes must be a positive integer.")
+
+    size = os.path.getsize(file_path)
+
+    if size == 0:
+        return []
+
+    with open(file_path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+
+        header_end, odd_quotes = _next_record_end(data, 0, False)
+
+        boundaries = [header_end]
+        position = header_end
+
+        while position < size:
+            target = min(size, boundaries[-1] + range_bytes)
+            odd_quotes ^= _count_quotes(data, position, target) % 2 == 1
+            position, odd_quotes = _next_record_end(data, target, odd_quotes)
+            boundaries.append(position)
+
+    return [
+        (start, end)
+        for start, end in zip(boundaries, boundaries[1:])
+        if end > start
+    ]
+
+
+def _next_record_end(data, position: int, odd_quotes: bool) -> Tuple[int, bool]:
+    """
+    Offset just past the first record-terminating newline at or after
+    `position` (or the end of data), given the quote parity at `position`.
+    """
+
+    size = len(data)
+
+    while position < size:
+        newline = data.find(b"\n", position)
+
+        if newline == -1:
+            return size, odd_quotes
+
+        odd_quotes ^= _count_quotes(data, position, newline) % 2 == 1
+        position = newline + 1
+
+        if not odd_quotes:
+            return position, odd_quotes
+
+    return size, odd_quotes
+
+
+def _count_quotes(data, start: int, end: int) -> int:
+    count = 0
+
+    for block_start in range(start, end, _SCAN_BLOCK_BYTES):
+        count += data[block_start:min(end, block_start + _SCAN_BLOCK_BYTES)].count(b'"')
+
+    return count
+
+
+def _parse_range(
+    file_path: str,
+    fieldnames: List[str],
+    timezone: str,
+    byte_range: Tuple[int, int],
+    with_fingerprint: bool = False,
+) -> Tuple[TransactionTable, IngestionStats, Optional[DatasetFingerprint]]:
+    start, end = byte_range
+
+    with open(file_path, "rb") as handle:
+        handle.seek(start)
+        text = handle.read(end - start).decode("utf-8")
+
+    stats = IngestionStats()
+    fingerprint = DatasetFingerprint() if with_fingerprint else None
+
+    reader = csv.DictReader(io.StringIO(text, newline=""), fieldnames=fieldnames)
+    table = _parse_table(reader, pytz.timezone(timezone), stats, fingerprint)
+
+    return table, stats, fingerprint
+
+
+def _parse_table(
+    reader: csv.DictReader,
+    tz,
+    stats: IngestionStats,
+    fingerprint: Optional[DatasetFingerprint] = None,
+) -> TransactionTable:
+
+    builder = TransactionTableBuilder()
+
+    for row in reader:
+        try:
+            fields = _parse_fields(row, tz)
+            builder.append(**fields)
+        except (InvalidOperation, ValueError, TypeError) as e:
+            stats.record_skipped(e)
+            continue  # Skip malformed rows for now
+
+        stats.record_loaded()
+
+        if fingerprint is not None:
+            fingerprint.add(
+                fields["transaction_id"],
+                fields["date"],
+                fields["vendor_normalized_name"],
+                fields["amount"],
+                fields["currency"],
+            )
+
+    return builder.build()
+
+
+def _parse_fields(row: dict, tz) -> dict:
+    amount = Decimal(row["amount"])
+
+    parsed_date = datetime.fromisoformat(row["date"])
+    if parsed_date.tzinfo is None:
+        parsed_date = tz.localize(parsed_date)
+
+    return {
+        "transaction_id": row["transaction_id"],
+        "date": parsed_date,
+        "vendor_raw_name": row["vendor_name"],
+        "vendor_normalized_name": row["vendor_name"].strip().lower(),
+        "amount": amount,
+        "currency": row["currency"].upper(),
+        "category": row.get("category"),
+        "description": row.get("description"),
+        "payment_method": row.get("payment_method"),
+    }
@@ -0,0 +1,308 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.utils.dataset_fingerprint import generate_table_hash
+
+
+SNAPSHOT_MAGIC = b"VLESNAP1"
+SNAPSHOT_VERSION = "1.0.0"
+
+_HEADER_LENGTH = struct.Struct("<Q")
+_ALIGNMENT = 8
+
+NUMERIC_COLUMNS = {
+    "timestamps": "q",
+    "offset_codes": "H",
+    "vendor_codes": "I",
+    "raw_vendor_codes": "I",
+    "currency_codes": "H",
+    "amount_exponents": "i",
+    "category_codes": "I",
+    "payment_method_codes": "I",
+    "description_codes": "I",
+}
+
+STRING_COLUMNS = (
+    "transaction_ids",
+    "vendors",
+    "raw_vendors",
+    "currencies",
+    "categories",
+    "payment_methods",
+    "descriptions",
+)
+
+
+class StringColumn(Sequence):
+    """
+    Read-only string column over a mapped buffer: an array of n + 1 byte
+    offsets followed by UTF-8 data. Values are decoded on access. Rows
+    listed in `nulls` read as None.
+    """
+
+    def __init__(self, offsets: Sequence[int], data: memoryview, nulls: Sequence[int] = ()):
+        self._offsets = offsets
+        self._data = data
+        self._nulls = frozenset(nulls)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if self._nulls and index in self._nulls:
+            return None
+
+        return str(self._data[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        offsets = self._offsets
+        data = self._data
+
+        for index in range(len(self)):
+            if self._nulls and index in self._nulls:
+                yield None
+            else:
+                yield str(data[offsets[index]:offsets[index + 1]], "utf-8")
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+class Snapshot:
+    """
+    An opened snapshot: the table (columns backed by the mapping) and the
+    dataset fingerprint recorded when it was written.
+    """
+
+    def __init__(self, table: TransactionTable, dataset_hash: str, header: Dict):
+        self.table = table
+        self.dataset_hash = dataset_hash
+        self.header = header
+
+
+def write_snapshot(
+    table: TransactionTable,
+    path: str,
+    dataset_hash: Optional[str] = None,
+) -> str:
+    """
+    Writes `table` to `path` atomically and returns the dataset hash
+    stored with it (computed when not given).
+
+    Layout: magic, little-endian u64 header length, JSON header (column
+    offsets, small metadata), then 8-byte aligned column buffers in
+    native byte order (recorded in the header).
+    """
+
+    if dataset_hash is None:
+        dataset_hash = generate_table_hash(table)
+
+    buffers: List[Tuple[str, bytes]] = []
+
+    for name, typecode in NUMERIC_COLUMNS.items():
+        buffers.append((name, array(typecode, getattr(table, name)).tobytes()))
+
+    try:
+        buffers.append(("amount_minor", array("q", table.amount_minor).tobytes()))
+        amount_overflow = False
+    except OverflowError:
+        amount_overflow = True
+
+    string_nulls: Dict[str, List[int]] = {}
+
+    string_columns = list(STRING_COLUMNS)
+    if amount_overflow:
+        string_columns.append("amount_minor")
+
+    for name in string_columns:
+        values = getattr(table, name)
+        if name == "amount_minor":
+            values = [str(value) for value in values]
+
+        offsets, data, nulls = _encode_strings(values)
+        buffers.append((name + ".offsets", offsets))
+        buffers.append((name + ".data", data))
+        string_nulls[name] = nulls
+
+    columns = {}
+    position = 0
+
+    for name, payload in buffers:
+        columns[name] = {"offset": position, "length": len(payload)}
+        position += _padded(len(payload))
+
+    header = {
+        "snapshot_version": SNAPSHOT_VERSION,
+        "dataset_hash": dataset_hash,
+        "rows": len(table),
+        "byteorder": sys.byteorder,
+        "itemsizes": {typecode: array(typecode).itemsize for typecode in "HIiqQ"},
+        "offsets_microseconds": [offset // timedelta(microseconds=1) for offset in table.offsets],
+        "currency_scales": list(table.currency_scales),
+        "negative_zero_rows": sorted(table.negative_zero_rows),
+        "amount_overflow": amount_overflow,
+        "string_nulls": string_nulls,
+        "columns": columns,
+    }
+
+    header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+    prefix_length = len(SNAPSHOT_MAGIC) + _HEADER_LENGTH.size + len(header_bytes)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+
+    try:
+        with os.fdopen(handle, "wb") as snapshot_file:
+            snapshot_file.write(SNAPSHOT_MAGIC)
+            snapshot_file.write(_HEADER_LENGTH.pack(len(header_bytes)))
+            snapshot_file.write(header_bytes)
+            snapshot_file.write(b"\0" * (_padded(prefix_length) - prefix_length))
+
+            for _, payload in buffers:
+                snapshot_file.write(payload)
+                snapshot_file.write(b"\0" * (_padded(len(payload)) - len(payload)))
+
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    return dataset_hash
+
+
+def open_snapshot(path: str, verify: bool = False) -> Snapshot:
+    """
+    Maps a snapshot read-only. Numeric columns are zero-copy views of the
+    mapping and strings decode on access, so opening costs the header
+    parse only. `verify` recomputes the fingerprint and raises on mismatch.
+    """
+
+    with open(path, "rb") as handle:
+        mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    buffer = memoryview(mapping)
+
+    if bytes(buffer[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+        raise ValueError(f"'{path}' is not a transaction snapshot.")
+
+    header_start = len(SNAPSHOT_MAGIC) + _HEADER_LENGTH.size
+    (header_length,) = _HEADER_LENGTH.unpack(buffer[len(SNAPSHOT_MAGIC):header_start])
+    header = json.loads(bytes(buffer[header_start:header_start + header_length]))
+
+    data_start = _padded(header_start + header_length)
+
+    data_end = max(
+        (column["offset"] + column["length"] for column in header["columns"].values()),
+        default=0,
+    )
+    if len(buffer) < data_start + data_end:
+        raise ValueError(f"Snapshot '{path}' is truncated or corrupt.")
+
+    if any(
+        array(typecode).itemsize != itemsize
+        for typecode, itemsize in header["itemsizes"].items()
+    ):
+        raise ValueError(f"Snapshot '{path}' was written on an incompatible platform.")
+
+    native = header["byteorder"] == sys.byteorder
+
+    def raw(name: str) -> memoryview:
+        column = header["columns"][name]
+        start = data_start + column["offset"]
+        return buffer[start:start + column["length"]]
+
+    def numeric(name: str, typecode: str) -> Sequence[int]:
+        if native:
+            return raw(name).cast(typecode)
+
+        values = array(typecode)
+        values.frombytes(bytes(raw(name)))
+        values.byteswap()
+        return values
+
+    def strings(name: str) -> StringColumn:
+        return StringColumn(
+            numeric(name + ".offsets", "Q"),
+            raw(name + ".data"),
+            header["string_nulls"][name],
+        )
+
+    if header["amount_overflow"]:
+        amount_minor = [int(value) for value in strings("amount_minor")]
+    else:
+        amount_minor = numeric("amount_minor", "q")
+
+    table = TransactionTable(
+        transaction_ids=strings("transaction_ids"),
+        timestamps=numeric("timestamps", "q"),
+        offset_codes=numeric("offset_codes", "H"),
+        offsets=[timedelta(microseconds=value) for value in header["offsets_microseconds"]],
+        vendor_codes=numeric("vendor_codes", "I"),
+        vendors=strings("vendors"),
+        raw_vendor_codes=numeric("raw_vendor_codes", "I"),
+        raw_vendors=strings("raw_vendors"),
+        currency_codes=numeric("currency_codes", "H"),
+        currencies=strings("currencies"),
+        currency_scales=header["currency_scales"],
+        amount_minor=amount_minor,
+        amount_exponents=numeric("amount_exponents", "i"),
+        category_codes=numeric("category_codes", "I"),
+        categories=strings("categories"),
+        payment_method_codes=numeric("payment_method_codes", "I"),
+        payment_methods=strings("payment_methods"),
+        description_codes=numeric("description_codes", "I"),
+        descriptions=strings("descriptions"),
+        negative_zero_rows=frozenset(header["negative_zero_rows"]),
+    )
+
+    if len(table) != header["rows"]:
+        raise ValueError(f"Snapshot '{path}' is truncated or corrupt.")
+
+    if verify and generate_table_hash(table) != header["dataset_hash"]:
+        raise ValueError(f"Snapshot '{path}' does not match its recorded fingerprint.")
+
+    return Snapshot(table, header["dataset_hash"], header)
+
+
+def is_snapshot(path: str) -> bool:
+    with open(path, "rb") as handle:
+        return handle.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def _encode_strings(values: Sequence[Optional[str]]) -> Tuple[bytes, bytes, List[int]]:
+    offsets = array("Q", [0])
+    chunks = []
+    nulls = []
+    position = 0
+
+    for index, value in enumerate(values):
+        if value is None:
+            nulls.append(index)
+        else:
+            encoded = value.encode("utf-8")
+            chunks.append(encoded)
+            position += len(encoded)
+        offsets.append(position)
+
+    return offsets.tobytes(), b"".join(chunks), nulls
+
+
+def _padded(length: int) -> int:
+    return (length + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
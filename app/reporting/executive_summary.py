@@ -13,12 +13,28 @@ class ExecutiveSummaryGenerator:
         summary = engine_output.get("summary", {})
 
         total_flagged = sum(
-            d.get("financial_impact_estimate", Decimal("0"))
+            _field(d, "financial_impact_estimate", Decimal("0"))
             for d in detections
         )
 
         total_annualized_exposure = self._compute_annualized_exposure(detections)
 
+        return self.generate_from_totals(
+            total_flagged, total_annualized_exposure, vendor_ranking, summary
+        )
+
+    def generate_from_totals(
+        self,
+        total_flagged,
+        total_annualized_exposure: Decimal,
+        vendor_ranking: Dict,
+        summary: Dict,
+    ) -> Dict:
+        """
+        Same summary from precomputed totals (flagged amount and recurring
+        exposure) and the ranked vendors, without the detections.
+        """
+
         top_vendors = list(vendor_ranking.keys())[:5]
 
         return {
@@ -34,8 +50,8 @@ class ExecutiveSummaryGenerator:
         total = Decimal("0")
 
         for d in detections:
-            if d.get("detection_type") == "recurring":
-                total += Decimal(str(d.get("financial_impact_estimate", "0")))
+            if _field(d, "detection_type") == "recurring":
+                total += Decimal(str(_field(d, "financial_impact_estimate", "0")))
 
         return total
 
@@ -50,3 +66,12 @@ class ExecutiveSummaryGenerator:
             })
 
         return priority
+
+
+def _field(detection, name: str, default=None):
+    """
+    Reads a detection field from either a DetectionResult or its dict form.
+    """
+    if isinstance(detection, dict):
+        return detection.get(name, default)
+    return getattr(detection, name, default)
@@ -0,0 +1,173 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable, Dict, TextIO
+
+from pydantic import BaseModel
+
+from app.domain.models.detection_result import DetectionResult
+
+
+OUTPUT_FORMATS = ("pretty", "compact", "ndjson")
+
+
+def json_default(obj: Any) -> Any:
+    """
+    `default` hook for the json module: Decimals become their exact string
+    form and detections plain dicts, without a pydantic round-trip.
+    """
+
+    if isinstance(obj, Decimal):
+        return str(obj)
+
+    if isinstance(obj, DetectionResult):
+        return detection_record(obj)
+
+    if isinstance(obj, Enum):
+        return obj.value
+
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+
+    raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
+
+
+def detection_record(detection: DetectionResult) -> Dict[str, Any]:
+    """
+    Same fields and values as `model_dump(mode="json")`.
+    """
+
+    return {
+        "detection_id": detection.detection_id,
+        "detection_type": detection.detection_type.value,
+        "related_transaction_ids": detection.related_transaction_ids,
+        "rule_triggered": detection.rule_triggered,
+        "supporting_evidence": detection.supporting_evidence,
+        "financial_impact_estimate": str(detection.financial_impact_estimate),
+        "confidence_score": detection.confidence_score,
+        "risk_severity": detection.risk_severity.value,
+        "currency": detection.currency,
+    }
+
+
+def write_result(result: Dict, stream: TextIO, output_format: str = "pretty"):
+    """
+    Serializes an engine result to `stream` without building the whole
+    document as one string.
+
+    - pretty: indented JSON, identical to `json.dumps(result, indent=2)`
+    - compact: the same document on one line, written member by member
+    - ndjson: one self-describing record per line (see `iter_records`)
+    """
+
+    if output_format == "pretty":
+        json.dump(result, stream, default=json_default, indent=2)
+        stream.write("\n")
+
+    elif output_format == "compact":
+        encode = json.JSONEncoder(default=json_default, separators=(",", ":")).encode
+        _write_compact(stream, result, encode, depth=2)
+        stream.write("\n")
+
+    elif output_format == "ndjson":
+        encode = json.JSONEncoder(default=json_default, separators=(",", ":")).encode
+        for record in iter_records(result):
+            stream.write(encode(record))
+            stream.write("\n")
+
+    else:
+        raise ValueError(f"Unsupported output format '{output_format}'.")
+
+
+def iter_records(result: Dict):
+    """
+    Flattens an engine result into NDJSON records, each tagged by `record`:
+    run, detection, vendor_totals, currency_totals, currency_summary,
+    vendor_profile, vendor_ranking, executive_summary and diagnostics.
+    Unknown top-level keys are emitted as {"record": key, "value": ...}.
+    """
+
+    yield {
+        "record": "run",
+        "engine_version": result.get("engine_version"),
+        "dataset_hash": result.get("dataset_hash"),
+    }
+
+    for key, value in result.items():
+
+        if key in ("engine_version", "dataset_hash"):
+            continue
+
+        if key == "detections":
+            for detection in value:
+                record = {"record": "detection"}
+                record.update(
+                    detection_record(detection)
+                    if isinstance(detection, DetectionResult) else detection
+                )
+                yield record
+
+        elif key == "vendor_totals":
+            for vendor, totals in value.items():
+                yield {"record": "vendor_totals", "vendor": vendor, "totals": totals}
+
+        elif key == "currency_totals":
+            for currency, total in value.items():
+                yield {"record": "currency_totals", "currency": currency, "flagged_amount": total}
+
+        elif key == "summary":
+            for currency, summary in value.items():
+                yield {"record": "currency_summary", "currency": currency, **summary}
+
+        elif key == "vendor_behavior_profiles":
+            for vendor, profile in value.items():
+                yield {"record": "vendor_profile", "vendor": vendor, **profile}
+
+        elif key == "vendor_ranking":
+            ranking_version = value.get("ranking_version")
+            for rank, (vendor, ranking) in enumerate(value.get("ranked_vendors", {}).items(), 1):
+                yield {
+                    "record": "vendor_ranking",
+                    "ranking_version": ranking_version,
+                    "rank": rank,
+                    "vendor": vendor,
+                    **ranking,
+                }
+
+        elif key in ("executive_summary", "diagnostics"):
+            yield {"record": key, **value}
+
+        else:
+            yield {"record": key, "value": value}
+
+
+def _write_compact(stream: TextIO, value: Any, encode: Callable[[Any], str], depth: int):
+    """
+    Streams containers down to `depth` levels and encodes everything below
+    in one call to the C encoder.
+    """
+
+    if depth and isinstance(value, dict):
+        stream.write("{")
+        for position, (key, item) in enumerate(value.items()):
+            if position:
+                stream.write(",")
+            stream.write(encode(str(key)))
+            stream.write(":")
+            _write_compact(stream, item, encode, depth - 1)
+        stream.write("}")
+
+    elif depth and isinstance(value, list):
+        stream.write("[")
+        for position, item in enumerate(value):
+            if position:
+                stream.write(",")
+            _write_compact(stream, item, encode, depth - 1)
+        stream.write("]")
+
+    else:
+        stream.write(encode(value))
@@ -0,0 +1,80 @@
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+
+METRICS = ("wall_seconds", "peak_traced_bytes", "max_rss_kb")
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> List[Dict]:
+    """
+    Pairs stages by (rows, stage) and reports relative change per metric.
+    A change above `threshold` (e.g. 0.10 for +10%) is a regression.
+    """
+
+    baseline_runs = {run["rows"]: run for run in baseline["runs"]}
+
+    rows = []
+
+    for run in candidate["runs"]:
+        reference = baseline_runs.get(run["rows"])
+
+        if reference is None:
+            continue
+
+        for stage, record in sorted(run["stages"].items()):
+            old_record = reference["stages"].get(stage)
+
+            if old_record is None:
+                continue
+
+            for metric in METRICS:
+                old = old_record.get(metric)
+                new = record.get(metric)
+
+                if not old or new is None:
+                    continue
+
+                change = (new - old) / old
+
+                rows.append({
+                    "rows": run["rows"],
+                    "stage": stage,
+                    "metric": metric,
+                    "baseline": old,
+                    "candidate": new,
+                    "change": change,
+                    "regression": change > threshold,
+                })
+
+    return rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+
+    with open(args.candidate, encoding="utf-8") as handle:
+        candidate = json.load(handle)
+
+    rows = compare(baseline, candidate, args.threshold)
+
+    for row in rows:
+        marker = "REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['rows']:>10} {row['stage']:<34} {row['metric']:<18} "
+            f"{row['baseline']:>14.4f} {row['candidate']:>14.4f} {row['change']:>+8.1%} {marker}"
+        )
+
+    sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from app.application.engine import VendorLeakEngine, ENGINE_VERSION
+from app.domain.indexing.transaction_index import TransactionIndex
+from app.domain.utils.dataset_fingerprint import generate_table_hash
+from app.ingestion.csv_loader import load_csv, load_csv_table
+from benchmarks.synthetic_ledger import SyntheticLedgerConfig, write_csv
+
+
+BENCHMARK_VERSION = "1.0.0"
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+class StageTimer:
+    """
+    Times a stage (wall and CPU) and, optionally, re-runs it under
+    tracemalloc to record its peak Python allocation. Memory is measured
+    in a separate pass so tracing overhead never skews the timings.
+    """
+
+    def __init__(self, track_memory: bool = True):
+        self.track_memory = track_memory
+        self.records: Dict[str, Dict] = {}
+
+    def measure(self, stage: str, fn: Callable, input_size: Optional[int] = None):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        result = fn()
+
+        record = {
+            "wall_seconds": time.perf_counter() - wall_start,
+            "cpu_seconds": time.process_time() - cpu_start,
+            "input_size": input_size,
+            "output_size": _size(result),
+        }
+
+        if self.track_memory:
+            tracemalloc.start()
+            try:
+                fn()
+                record["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        self.records[stage] = record
+        return result
+
+
+def benchmark_size(config: SyntheticLedgerConfig, workdir: str, track_memory: bool, include_cli: bool) -> Dict:
+
+    csv_path = write_csv(os.path.join(workdir, f"ledger_{config.rows}.csv"), config)
+
+    timer = StageTimer(track_memory)
+    engine = VendorLeakEngine()
+
+    timer.measure("load_csv", lambda: load_csv(csv_path))
+    table = timer.measure("load_csv_table", lambda: load_csv_table(csv_path))
+
+    rows = len(table)
+
+    timer.measure("dataset_hash", lambda: generate_table_hash(table), rows)
+    index = timer.measure("transaction_index", lambda: TransactionIndex.build(table), rows)
+
+    detections = []
+
+    for detector in engine.detectors:
+        detections.extend(timer.measure(
+            f"detector:{detector.__class__.__name__}",
+            lambda: detector.detect_index(index),
+            rows,
+        ))
+
+    profiles = timer.measure(
+        "behavior_analyzer", lambda: engine.behavior_analyzer.analyze_index(index), rows
+    )
+
+    total_spend = engine._calculate_total_spend(table)
+
+    scored = timer.measure(
+        "risk_scoring",
+        lambda: engine.scoring_engine.score(detections, total_spend),
+        len(detections),
+    )
+
+    ranking = timer.measure(
+        "vendor_ranking",
+        lambda: engine.vendor_ranker.rank(scored["vendor_totals"], profiles, total_spend),
+        len(scored["vendor_totals"]),
+    )
+
+    core_output = {
+        "detections": scored["updated_detections"],
+        "vendor_ranking": ranking,
+        "summary": scored["summary"],
+    }
+
+    timer.measure(
+        "executive_summary",
+        lambda: engine.summary_generator.generate(core_output),
+        len(core_output["detections"]),
+    )
+
+    timer.measure("engine_run", lambda: engine.run_table(table), rows)
+
+    if include_cli:
+        timer.records["cli"] = _measure_cli(csv_path)
+
+    os.remove(csv_path)
+
+    return {
+        "rows": rows,
+        "detections": len(detections),
+        "vendors": len(profiles),
+        "stages": timer.records,
+    }
+
+
+def _measure_cli(csv_path: str) -> Dict:
+    """
+    Runs the CLI end to end in a child process and reads its own rusage.
+    """
+
+    wall_start = time.perf_counter()
+
+    with open(os.devnull, "wb") as devnull:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "app.cli", csv_path],
+            stdout=devnull,
+        )
+        _, status, usage = os.wait4(process.pid, 0)
+
+    return {
+        "wall_seconds": time.perf_counter() - wall_start,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        "max_rss_kb": usage.ru_maxrss,
+        "exit_status": os.waitstatus_to_exitcode(status),
+    }
+
+
+def _size(result) -> Optional[int]:
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Vendor Intelligence Engine benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--vendors", type=int, default=None,
+                        help="Vendor count (default: rows / 20, at least 50)")
+    parser.add_argument("--duplicate-rate", type=float, default=0.02)
+    parser.add_argument("--recurring-rate", type=float, default=0.10)
+    parser.add_argument("--installment-rate", type=float, default=0.03)
+    parser.add_argument("--currency-mix", default="USD=0.7,EUR=0.2,GBP=0.1")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc pass for each stage")
+    parser.add_argument("--no-cli", action="store_true",
+                        help="Skip the end-to-end CLI run")
+    parser.add_argument("--output", default=None,
+                        help="Write JSON results to this path instead of stdout")
+    args = parser.parse_args(argv)
+
+    currency_mix = {
+        code: float(weight)
+        for code, weight in (item.split("=") for item in args.currency_mix.split(","))
+    }
+
+    runs = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            config = SyntheticLedgerConfig(
+                rows=rows,
+                vendor_count=args.vendors or max(50, rows // 20),
+                duplicate_rate=args.duplicate_rate,
+                recurring_rate=args.recurring_rate,
+                installment_rate=args.installment_rate,
+                currency_mix=currency_mix,
+                seed=args.seed,
+            )
+
+            run = benchmark_size(config, workdir, not args.no_memory, not args.no_cli)
+            run["config"] = config.to_dict()
+            runs.append(run)
+
+    report = {
+        "benchmark_version": BENCHMARK_VERSION,
+        "engine_version": ENGINE_VERSION,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+
+    output = json.dumps(report, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import csv
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+HEADER = [
+    "transaction_id",
+    "date",
+    "vendor_name",
+    "amount",
+    "currency",
+    "category",
+    "description",
+    "payment_method",
+]
+
+CATEGORIES = ["Software", "Office", "Travel", "Logistics", "Consulting", "Utilities"]
+PAYMENT_METHODS = ["Card", "ACH", "Wire", "Check"]
+VENDOR_SUFFIXES = ["", " Inc", " LLC", " Ltd", " Corp"]
+
+
+class SyntheticLedgerConfig:
+    """
+    Parameters of a synthetic AP ledger.
+
+    Rates are per emitted row: a row is a near-term duplicate of a recent
+    row with probability `duplicate_rate`, the next charge of a monthly
+    subscription with `recurring_rate`, the next payment of a bi-weekly
+    installment plan with `installment_rate`, and an independent payment
+    otherwise. The same seed always yields the same ledger.
+    """
+
+    def __init__(
+        self,
+        rows: int = 10_000,
+        vendor_count: int = 500,
+        duplicate_rate: float = 0.02,
+        recurring_rate: float = 0.10,
+        installment_rate: float = 0.03,
+        currency_mix: Optional[Dict[str, float]] = None,
+        span_days: int = 730,
+        start: datetime = datetime(2023, 1, 1),
+        seed: int = 7,
+    ):
+        if duplicate_rate + recurring_rate + installment_rate > 1:
+            raise ValueError("Pattern rates must sum to at most 1.")
+
+        self.rows = rows
+        self.vendor_count = vendor_count
+        self.duplicate_rate = duplicate_rate
+        self.recurring_rate = recurring_rate
+        self.installment_rate = installment_rate
+        self.currency_mix = currency_mix or {"USD": 0.7, "EUR": 0.2, "GBP": 0.1}
+        self.span_days = span_days
+        self.start = start
+        self.seed = seed
+
+    def to_dict(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "vendor_count": self.vendor_count,
+            "duplicate_rate": self.duplicate_rate,
+            "recurring_rate": self.recurring_rate,
+            "installment_rate": self.installment_rate,
+            "currency_mix": self.currency_mix,
+            "span_days": self.span_days,
+            "start": self.start.isoformat(),
+            "seed": self.seed,
+        }
+
+
+class _Series:
+
+    def __init__(self, vendor: str, amount: str, currency: str, next_date: datetime, period_days: int):
+        self.vendor = vendor
+        self.amount = amount
+        self.currency = currency
+        self.next_date = next_date
+        self.period_days = period_days
+
+    def advance(self, rng: random.Random) -> datetime:
+        date = self.next_date
+        self.next_date = date + timedelta(days=self.period_days + rng.randint(-1, 1))
+        return date
+
+
+def generate_rows(config: SyntheticLedgerConfig) -> Iterator[List[str]]:
+    """
+    Streams ledger rows (without header) in constant memory.
+    """
+
+    rng = random.Random(config.seed)
+
+    vendors = [
+        f"Vendor {index:05d}{VENDOR_SUFFIXES[index % len(VENDOR_SUFFIXES)]}"
+        for index in range(config.vendor_count)
+    ]
+
+    currencies = list(config.currency_mix)
+    weights = list(config.currency_mix.values())
+
+    def random_amount() -> str:
+        return f"{rng.lognormvariate(5, 1.5):.2f}"
+
+    def random_date() -> datetime:
+        return config.start + timedelta(
+            days=rng.randrange(config.span_days),
+            seconds=rng.randrange(86_400),
+        )
+
+    def new_series(period_days: int) -> _Series:
+        return _Series(
+            vendor=rng.choice(vendors),
+            amount=random_amount(),
+            currency=rng.choices(currencies, weights)[0],
+            next_date=config.start + timedelta(days=rng.randrange(period_days)),
+            period_days=period_days,
+        )
+
+    expected_charges = max(1, config.span_days // 30)
+    subscriptions = [
+        new_series(30)
+        for _ in range(max(1, int(config.rows * config.recurring_rate / expected_charges)))
+    ]
+    installments = [
+        new_series(14)
+        for _ in range(max(1, int(config.rows * config.installment_rate / (expected_charges * 2))))
+    ]
+
+    recent: List[Tuple[str, datetime, str, str]] = []
+
+    duplicate_cutoff = config.duplicate_rate
+    recurring_cutoff = duplicate_cutoff + config.recurring_rate
+    installment_cutoff = recurring_cutoff + config.installment_rate
+
+    for index in range(config.rows):
+        draw = rng.random()
+
+        if draw < duplicate_cutoff and recent:
+            vendor, date, amount, currency = rng.choice(recent)
+            date = date + timedelta(days=rng.randint(0, 3))
+        elif draw < recurring_cutoff:
+            series = rng.choice(subscriptions)
+            vendor, date, amount, currency = series.vendor, series.advance(rng), series.amount, series.currency
+        elif draw < installment_cutoff:
+            series = rng.choice(installments)
+            vendor, date, amount, currency = series.vendor, series.advance(rng), series.amount, series.currency
+        else:
+            vendor, date, amount, currency = (
+                rng.choice(vendors),
+                random_date(),
+                random_amount(),
+                rng.choices(currencies, weights)[0],
+            )
+
+        if len(recent) < 1024:
+            recent.append((vendor, date, amount, currency))
+        else:
+            recent[rng.randrange(1024)] = (vendor, date, amount, currency)
+
+        yield [
+            f"T{index:09d}",
+            date.isoformat(),
+            vendor,
+            amount,
+            currency,
+            rng.choice(CATEGORIES),
+            f"Invoice {rng.randrange(1_000_000)}",
+            rng.choice(PAYMENT_METHODS),
+        ]
+
+
+def write_csv(path: str, config: SyntheticLedgerConfig) -> str:
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(HEADER)
+        writer.writerows(generate_rows(config))
+
+    return path
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.domain.models.transaction import Transaction
+
+
+START = datetime(2024, 1, 1, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def charges():
+    """
+    Builds same-amount transactions for one vendor from day offsets.
+    """
+
+    def build(days, vendor="acme", amount="49.00", currency="USD", prefix=None):
+        return [
+            Transaction(
+                transaction_id=f"{prefix or vendor}-{position}",
+                date=START + timedelta(days=day),
+                vendor_raw_name=vendor,
+                vendor_normalized_name=vendor,
+                amount=Decimal(amount),
+                currency=currency,
+                category="Software",
+            )
+            for position, day in enumerate(days)
+        ]
+
+    return build
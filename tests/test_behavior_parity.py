@@ -0,0 +1,73 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from app.domain.behavior import numpy_backend
+from app.domain.behavior.vendor_behavior_analyzer import VendorBehaviorAnalyzer
+from app.ingestion.csv_loader import load_csv
+
+pytest.importorskip("numpy")
+
+
+FLOAT_METRICS = ("amount_volatility_score", "interval_stability_score")
+
+
+def assert_parity(transactions):
+    reference = VendorBehaviorAnalyzer(backend="decimal").analyze(transactions)
+    columnar = VendorBehaviorAnalyzer(backend="numpy").analyze(transactions)
+
+    assert columnar.keys() == reference.keys()
+
+    for vendor, expected in reference.items():
+        actual = columnar[vendor]
+
+        for metric, value in expected.items():
+            if metric in FLOAT_METRICS:
+                assert float(actual[metric]) == pytest.approx(
+                    float(value),
+                    rel=numpy_backend.RELATIVE_TOLERANCE,
+                    abs=numpy_backend.ABSOLUTE_TOLERANCE,
+                ), (vendor, metric)
+            else:
+                assert actual[metric] == value, (vendor, metric)
+
+
+def test_sample_matches_decimal_reference():
+    assert_parity(load_csv("examples/sample_transactions.csv"))
+
+
+@pytest.mark.parametrize("base", ["1000000000", "98765432109", "123456789012345678", "0"])
+def test_large_amounts_with_small_spread_keep_precision(charges, base):
+    transactions = []
+    for cents in ("01", "02", "03"):
+        transactions += charges([len(transactions) * 30], amount=f"{base}.{cents}", prefix=cents)
+
+    assert_parity(transactions)
+
+    volatility = VendorBehaviorAnalyzer(backend="numpy").analyze(transactions)["acme"][
+        "amount_volatility_score"
+    ]
+    assert float(volatility) == pytest.approx(0.01, rel=numpy_backend.RELATIVE_TOLERANCE)
+
+
+def test_mixed_scales_and_random_vendors(charges):
+    generator = random.Random(17)
+    transactions = []
+
+    for vendor_number in range(40):
+        vendor = f"vendor-{vendor_number}"
+        base = generator.randrange(10 ** 12)
+
+        for position in range(generator.randint(1, 12)):
+            currency = generator.choice(["USD", "JPY", "BHD"])
+            scale = {"USD": 2, "JPY": 0, "BHD": 3}[currency]
+            minor = base + generator.randrange(-500, 500)
+            amount = Decimal(minor).scaleb(-scale)
+            transaction = charges(
+                [generator.randrange(365)], vendor=vendor, amount=str(amount),
+                currency=currency, prefix=f"{vendor}-{position}",
+            )[0]
+            transactions.append(transaction)
+
+    assert_parity(transactions)
@@ -0,0 +1,60 @@
+from app.application.engine import VendorLeakEngine
+from app.application.incremental_engine import IncrementalVendorLeakEngine
+from app.ingestion.csv_loader import load_csv
+
+
+def comparable(result):
+    result = dict(result)
+    result.pop("diagnostics")
+    return result
+
+
+def test_appends_match_a_full_run(tmp_path):
+    transactions = load_csv("examples/sample_transactions.csv")
+    cuts = [0, len(transactions) // 3, len(transactions) - 2, len(transactions)]
+    state_path = str(tmp_path / "state.db")
+
+    engine = IncrementalVendorLeakEngine(state_path, vendor_batch_size=2)
+
+    for position, (start, end) in enumerate(zip(cuts, cuts[1:])):
+        if position == 1:
+            # A reopened state continues from what was persisted
+            engine.close()
+            engine = IncrementalVendorLeakEngine(state_path, vendor_batch_size=2)
+
+        result = engine.append(transactions[start:end])
+        full = VendorLeakEngine().run(transactions[:end])
+
+        assert result["diagnostics"]["errors"] == []
+        assert comparable(result) == comparable(full)
+
+    engine.close()
+
+
+def test_dataset_hash_matches_a_full_run_with_repeated_ids(tmp_path, charges):
+    transactions = (
+        charges([0, 30, 60, 90], vendor="zeta", prefix="id")
+        + charges([5, 35], vendor="alpha", amount="12.50", prefix="id")
+    )
+    engine = IncrementalVendorLeakEngine(str(tmp_path / "state.db"))
+
+    engine.append(transactions[:3])
+    result = engine.append(transactions[3:])
+
+    assert result["dataset_hash"] == VendorLeakEngine().run(transactions)["dataset_hash"]
+    engine.close()
+
+
+def test_configuration_change_recomputes_to_a_full_run(tmp_path, charges):
+    transactions = charges([0, 30, 61, 91, 120], vendor="adobe") + charges([3, 10], vendor="zoom")
+    state_path = str(tmp_path / "state.db")
+
+    engine = IncrementalVendorLeakEngine(state_path)
+    engine.append(transactions)
+    engine.close()
+
+    histogram = VendorLeakEngine(recurring_mode="histogram")
+    engine = IncrementalVendorLeakEngine(state_path, histogram)
+
+    assert comparable(engine.append([])) == comparable(histogram.run(transactions))
+    engine.close()
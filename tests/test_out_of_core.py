@@ -0,0 +1,58 @@
+from app.application.engine import VendorLeakEngine
+from app.application.out_of_core import OutOfCoreVendorLeakEngine
+from app.application.sharding import vendor_shard
+
+
+def hot_vendors(count, partitions=16):
+    """
+    Same-length vendor names that all hash to partition 0.
+    """
+
+    vendors = []
+    number = 0
+
+    while len(vendors) < count:
+        vendor = f"vendor {number:05d}"
+        if vendor_shard(vendor, partitions) == 0:
+            vendors.append(vendor)
+        number += 1
+
+    return vendors
+
+
+def without_diagnostics(result):
+    return {key: value for key, value in result.items() if key != "diagnostics"}
+
+
+def test_salted_shards_are_independent_of_the_first_level():
+    vendors = hot_vendors(120)
+
+    for salt in range(1, 5):
+        assert len({vendor_shard(vendor, 4, salt) for vendor in vendors}) == 4
+
+
+def test_hot_partition_is_split_within_budget(charges):
+    transactions = []
+    for vendor in hot_vendors(100):
+        transactions += charges(range(0, 150, 10), vendor=vendor, amount="12.50")
+
+    engine = VendorLeakEngine(profile=True)
+    result = OutOfCoreVendorLeakEngine(engine, memory_budget_bytes=1, partitions=16).run(transactions)
+
+    diagnostics = result["diagnostics"]
+    analyzed = {span["partition"] for span in diagnostics["spans"] if "partition" in span}
+
+    assert diagnostics["warnings"] == []
+    assert len(analyzed) >= 2
+    assert without_diagnostics(result) == without_diagnostics(VendorLeakEngine().run(transactions))
+
+
+def test_single_vendor_over_budget_is_processed_whole(charges):
+    transactions = charges(range(1_500), vendor="big vendor", amount="3.00")
+
+    result = OutOfCoreVendorLeakEngine(memory_budget_bytes=1, partitions=4).run(transactions)
+
+    assert result["diagnostics"]["warnings"] == [
+        "Vendor 'big vendor' has 1500 rows, over the memory budget; it was processed whole."
+    ]
+    assert without_diagnostics(result) == without_diagnostics(VendorLeakEngine().run(transactions))
@@ -0,0 +1,119 @@
+import random
+import time
+
+import pytest
+
+from app.domain.detection.recurring_detector import PERIODS, RecurringDetector
+from app.ingestion.csv_loader import load_csv
+
+
+def histogram_chains(transactions):
+    results = RecurringDetector(mode="histogram").detect(transactions)
+    return sorted(
+        (result.supporting_evidence["period"], sorted(result.related_transaction_ids))
+        for result in results
+    )
+
+
+def chain_lengths(transactions):
+    return sorted(len(ids) for _, ids in histogram_chains(transactions))
+
+
+def test_sample_subscriptions_are_found_in_both_modes():
+    transactions = load_csv("examples/sample_transactions.csv")
+
+    for mode in ("consistent", "histogram"):
+        vendors = sorted(
+            result.supporting_evidence["vendor"]
+            for result in RecurringDetector(mode=mode).detect(transactions)
+        )
+        assert vendors == ["adobe", "zoom"]
+
+
+@pytest.mark.parametrize(
+    "days, period",
+    [
+        ([0, 30, 60], "monthly"),
+        ([0, 30, 60, 90], "monthly"),
+        ([0, 7, 14, 21], "weekly"),
+        ([0, 91, 182, 273], "quarterly"),
+        ([0, 365, 730], "annual"),
+    ],
+)
+def test_short_clean_series(charges, days, period):
+    chains = histogram_chains(charges(days))
+
+    assert [name for name, _ in chains] == [period]
+    assert len(chains[0][1]) == len(days)
+
+
+def test_missed_charge_is_bridged(charges):
+    results = RecurringDetector(mode="histogram").detect(charges([0, 30, 60, 120, 150, 180]))
+
+    assert len(results) == 1
+    assert len(results[0].related_transaction_ids) == 6
+    assert results[0].supporting_evidence["missed_charges"] == 1
+
+
+@pytest.mark.parametrize("count", [3, 4, 6])
+def test_parallel_subscriptions_at_the_same_price(charges, count):
+    first = charges([30 * i for i in range(count)], prefix="first")
+    second = charges([30 * i + 10 for i in range(count)], prefix="second")
+
+    chains = histogram_chains(first + second)
+
+    assert [ids for _, ids in chains] == [
+        sorted(tx.transaction_id for tx in first),
+        sorted(tx.transaction_id for tx in second),
+    ]
+
+
+def test_group_size_does_not_weaken_detection(charges):
+    days = [400 * chain + 30 * i for chain in range(800) for i in range(6)]
+
+    assert chain_lengths(charges(days)) == [6] * 800
+
+
+def test_subscription_among_extra_charges(charges):
+    rng = random.Random(3)
+    subscription = [30 * i + rng.randint(-1, 1) for i in range(12)]
+    extra = [rng.randrange(365) for _ in range(12)]
+
+    chains = histogram_chains(charges(sorted(subscription + extra)))
+
+    assert any(name == "monthly" and len(ids) >= 10 for name, ids in chains)
+
+
+@pytest.mark.parametrize("count, span", [(30, 730), (60, 730), (100, 730), (4000, 730)])
+def test_random_spending_rarely_forms_chains(charges, count, span):
+    groups = 20 if count < 1000 else 2
+    flagged = 0
+
+    for seed in range(groups):
+        rng = random.Random(seed)
+        flagged += bool(histogram_chains(charges(sorted(rng.randrange(span) for _ in range(count)))))
+
+    assert flagged <= groups // 10
+
+
+def test_chain_extraction_scales_linearly():
+    detector = RecurringDetector(mode="histogram")
+
+    def extraction_seconds(chains):
+        rng = random.Random(1)
+        days = sorted(
+            [400 * chain + 30 * i + rng.randint(-1, 1) for chain in range(chains) for i in range(12)]
+            + [rng.randrange(400 * chains) for _ in range(chains)]
+        )
+        claimed = [False] * len(days)
+
+        started = time.perf_counter()
+        for _, period_days, _ in PERIODS:
+            detector._chains(days, period_days, detector._tolerance(period_days), claimed)
+        return time.perf_counter() - started
+
+    small = min(extraction_seconds(100) for _ in range(3))
+    large = extraction_seconds(1600)
+
+    # 16x the rows; a quadratic extraction would take ~256x as long
+    assert large < small * 60
@@ -0,0 +1,51 @@
+import pytest
+
+from app.application.engine import VendorLeakEngine
+from app.domain.models.transaction_table import TransactionTable
+from app.domain.utils.dataset_fingerprint import generate_table_hash
+from app.ingestion.csv_loader import load_csv_table
+from app.ingestion.snapshot import is_snapshot, open_snapshot, write_snapshot
+
+
+def comparable(result):
+    result = dict(result)
+    result.pop("diagnostics")
+    return result
+
+
+def test_round_trip_reproduces_table_and_run(tmp_path):
+    table = load_csv_table("examples/sample_transactions.csv")
+    path = str(tmp_path / "sample.snap")
+
+    dataset_hash = write_snapshot(table, path)
+    snapshot = open_snapshot(path, verify=True)
+
+    assert is_snapshot(path)
+    assert not is_snapshot("examples/sample_transactions.csv")
+    assert dataset_hash == snapshot.dataset_hash == generate_table_hash(table)
+    assert snapshot.table.to_transactions() == table.to_transactions()
+
+    engine = VendorLeakEngine()
+    assert comparable(engine.run_snapshot(path)) == comparable(engine.run_table(table))
+
+
+def test_round_trip_keeps_amounts_beyond_int64(tmp_path, charges):
+    transactions = charges([0, 30], amount="123456789012345678901.25") + charges(
+        [5], vendor="yen", amount="1500", currency="JPY"
+    )
+    table = TransactionTable.from_transactions(transactions)
+    path = str(tmp_path / "wide.snap")
+
+    write_snapshot(table, path)
+
+    assert open_snapshot(path, verify=True).table.to_transactions() == table.to_transactions()
+
+
+def test_truncated_snapshot_is_rejected(tmp_path):
+    path = tmp_path / "sample.snap"
+    write_snapshot(load_csv_table("examples/sample_transactions.csv"), str(path))
+
+    path.write_bytes(path.read_bytes()[:-64])
+
+    with pytest.raises(ValueError):
+        open_snapshot(str(path))